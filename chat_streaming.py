@@ -0,0 +1,168 @@
+"""
+Galactic AI — progressive streamed replies for chat bridges.
+
+The web UI renders stream_chunk frames as the model types, but Telegram,
+Discord and WhatsApp used to wait for gateway.speak() to return and only
+then post the answer, so chat users watched a typing indicator for the
+whole generation.
+
+A bridge now wraps its speak() call in `gateway.stream_to(reply)`, where
+reply is a ProgressiveReply. The gateway's StreamCoalescer forwards every
+visible delta for that session to the reply, which:
+
+  - posts a message as soon as there is something worth showing
+  - edits it at most once per `edit_interval` (platform edit rate limits)
+  - rolls over into a new message when the text passes `max_len`
+  - on finish(), replaces the draft with the authoritative final answer
+
+Platforms that cannot edit messages (WhatsApp) pass edit=None and get
+append-only delivery: completed paragraphs are sent as they arrive and
+finish() sends whatever is left.
+"""
+import asyncio
+import time
+
+
+def split_text(text, limit):
+    """Split text into chunks of at most limit chars, preferring paragraph/line/word breaks."""
+    chunks = []
+    while len(text) > limit:
+        split_at = text.rfind("\n\n", 0, limit)
+        if split_at <= 0:
+            split_at = text.rfind("\n", 0, limit)
+        if split_at <= 0:
+            split_at = text.rfind(" ", 0, limit)
+        if split_at <= 0:
+            split_at = limit
+        chunks.append(text[:split_at])
+        text = text[split_at:].lstrip("\n")
+    chunks.append(text)
+    return chunks
+
+
+class ProgressiveReply:
+    """One chat reply that grows while the model streams.
+
+    send(text, final) -> handle   posts a new message
+    edit(handle, text, final)     replaces a posted message (None: append-only)
+    """
+
+    CURSOR = " ▌"
+    EMPTY = "(no response)"    # shown in place of the draft when the final answer is empty
+
+    def __init__(self, send, edit=None, max_len=4096, edit_interval=1.0, min_chars=24,
+                 append_min_chars=600, on_error=None):
+        self.send = send
+        self.edit = edit
+        self.max_len = max_len - len(self.CURSOR)
+        self.edit_interval = edit_interval
+        self.min_chars = min_chars
+        self.append_min_chars = append_min_chars
+        self.on_error = on_error
+        self.draft = ""
+        self.messages = []         # [handle, text currently shown]
+        self.sent_text = ""        # append-only: everything already delivered
+        self.started = False
+        self.first_visible_s = None
+        self.edits = 0
+        self._created = time.monotonic()
+        self._last_render = 0.0
+        self._timer = None
+        self._lock = asyncio.Lock()
+
+    # ── sink interface (called by the gateway's StreamCoalescer) ─────────────
+
+    def reset(self):
+        """A new model call began; its text replaces the previous call's draft."""
+        self.draft = ""
+
+    async def push(self, delta):
+        self.draft += delta
+        if self._timer is None or self._timer.done():
+            delay = max(0.0, self._last_render + self.edit_interval - time.monotonic())
+            self._timer = asyncio.create_task(self._render_later(delay))
+
+    # ── rendering ────────────────────────────────────────────────────────────
+
+    async def _render_later(self, delay):
+        try:
+            await asyncio.sleep(delay)
+            async with self._lock:
+                await self._render()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            await self._report(e)
+
+    async def _render(self):
+        text = self.draft.strip()
+        if len(text) < self.min_chars:
+            return
+        self._last_render = time.monotonic()
+        if self.edit is None:
+            await self._render_append(text)
+        else:
+            await self._render_edit(text, final=False)
+        if self.started and self.first_visible_s is None:
+            self.first_visible_s = round(time.monotonic() - self._created, 3)
+
+    async def _render_edit(self, text, final):
+        segments = split_text(text, self.max_len) if text else [self.EMPTY]
+        for i, seg in enumerate(segments):
+            shown = seg if (final or i < len(segments) - 1) else seg + self.CURSOR
+            if i < len(self.messages):
+                if self.messages[i][1] != shown:
+                    await self.edit(self.messages[i][0], shown, final)
+                    self.messages[i][1] = shown
+                    self.edits += 1
+            else:
+                handle = await self.send(shown, final)
+                self.messages.append([handle, shown])
+                self.started = True
+        if final:
+            # An earlier, longer draft may have spilled into more messages
+            for entry in self.messages[len(segments):]:
+                if entry[1] != "…":
+                    await self.edit(entry[0], "…", True)
+                    entry[1] = "…"
+
+    async def _render_append(self, text):
+        if not text.startswith(self.sent_text):
+            return  # a later model call rewrote the start; wait for finish()
+        pending = text[len(self.sent_text):]
+        cut = pending.rfind("\n\n")
+        if len(pending) > self.max_len:
+            cut = len(split_text(pending, self.max_len)[0])
+        if cut < self.append_min_chars:
+            return
+        chunk = pending[:cut].strip()
+        if chunk:
+            await self.send(chunk, False)
+            self.started = True
+        self.sent_text = text[:len(self.sent_text) + cut]
+
+    async def finish(self, final_text):
+        """Stop streaming and make the chat show exactly final_text."""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        async with self._lock:
+            final_text = (final_text or "").strip()
+            try:
+                if self.edit is not None:
+                    await self._render_edit(final_text, final=True)
+                else:
+                    rest = final_text
+                    if self.sent_text and final_text.startswith(self.sent_text):
+                        rest = final_text[len(self.sent_text):]
+                    for chunk in split_text(rest.strip(), self.max_len):
+                        if chunk.strip():
+                            await self.send(chunk, True)
+            except Exception as e:
+                await self._report(e)
+
+    async def _report(self, e):
+        if self.on_error is not None:
+            try:
+                await self.on_error(e)
+            except Exception:
+                pass
@@ -51,7 +51,7 @@ function connect(token) {
     reconnectDelay = 1000;
     updateStoredStatus();
     /* Send hello so ChromeBridge marks itself as fully connected */
-    wsSend({ type: 'hello', capabilities: ['chrome', 'tabs', 'network', 'console'] });
+    wsSend({ type: 'hello', capabilities: ['chrome', 'tabs', 'network', 'console', 'batch', 'binary'] });
     console.log('[Galactic] WebSocket connected');
   };
 
@@ -74,7 +74,7 @@ function connect(token) {
       try {
         const result = await handleCommand(msg.id, msg.command, msg.args || {});
         /* Use 'data' key — matches what ChromeBridge.handle_ws_message expects */
-        wsSend({ type: 'result', id: msg.id, data: result });
+        sendResult(msg.id, result, msg.binary);
       } catch (err) {
         wsSend({ type: 'result', id: msg.id, data: { status: 'error', message: err.message || String(err) } });
       }
@@ -133,6 +133,55 @@ function wsSend(obj) {
   }
 }
 
+/* Large result fields (screenshots) go out as binary frames instead of base64
+   inside the JSON result: [uint32 header length][header JSON {id, path}][bytes].
+   The JSON result follows and lists the paths it is missing in binary_parts. */
+const BINARY_FIELDS = ['image_b64'];
+
+function b64ToBytes(value) {
+  const b64 = value.startsWith('data:') ? value.split(',', 2)[1] : value;
+  const bin = atob(b64);
+  const bytes = new Uint8Array(bin.length);
+  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+  return bytes;
+}
+
+function sendBinaryPart(id, path, value) {
+  const header = new TextEncoder().encode(JSON.stringify({ id, path }));
+  const payload = b64ToBytes(value);
+  const frame = new Uint8Array(4 + header.length + payload.length);
+  new DataView(frame.buffer).setUint32(0, header.length);
+  frame.set(header, 4);
+  frame.set(payload, 4 + header.length);
+  ws.send(frame);
+}
+
+function extractBinary(id, result, prefix, parts) {
+  if (!result || typeof result !== 'object') return;
+  for (const key of BINARY_FIELDS) {
+    if (typeof result[key] === 'string' && result[key].length > 1024) {
+      sendBinaryPart(id, prefix + key, result[key]);
+      delete result[key];
+      parts.push(prefix + key);
+    }
+  }
+  if (Array.isArray(result.results)) {
+    result.results.forEach((r, i) => extractBinary(id, r, `${prefix}results.${i}.`, parts));
+  }
+}
+
+function sendResult(id, result, binary) {
+  if (binary && ws && ws.readyState === WebSocket.OPEN) {
+    const parts = [];
+    extractBinary(id, result, '', parts);
+    if (parts.length) {
+      wsSend({ type: 'result', id, data: result, binary_parts: parts });
+      return;
+    }
+  }
+  wsSend({ type: 'result', id, data: result });
+}
+
 function updateStoredStatus() {
   chrome.storage.local.set({
     galactic_connected: connected,
@@ -208,10 +257,29 @@ async function handleCommand(id, command, args) {
     case 'triple_click': return await cmdTripleClick(args);
     case 'upload_file': return await cmdUploadFile(args);
     case 'resize_window': return await cmdResizeWindow(args);
+    case 'batch': return await cmdBatch(args);
     default: return { error: `Unknown command: ${command}` };
   }
 }
 
+/* Run an ordered list of {command, args} in one round trip. */
+async function cmdBatch(args) {
+  const actions = Array.isArray(args?.actions) ? args.actions : [];
+  const stopOnError = args?.stop_on_error !== false;
+  const results = [];
+  for (const action of actions) {
+    let result;
+    try {
+      result = await handleCommand(null, action.command, action.args || {});
+    } catch (err) {
+      result = { status: 'error', message: err.message || String(err) };
+    }
+    results.push(result);
+    if (stopOnError && result && (result.error || result.status === 'error')) break;
+  }
+  return { status: 'success', results, completed: results.length, total: actions.length };
+}
+
 /* ─── Helpers ───────────────────────────────────────────────────────────── */
 
 async function getTargetTabId(args) {
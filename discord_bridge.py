@@ -4,6 +4,8 @@ import os
 import time
 import traceback
 
+from chat_streaming import ProgressiveReply
+
 try:
     import discord
     from discord.ext import commands
@@ -208,13 +210,15 @@ class DiscordBridge:
         channel_id = str(channel.id)
         user_display = str(message.author)
         response = ""
+        reply = self._new_progressive_reply(channel)
         try:
             # Show typing indicator while processing
             async with channel.typing():
-                response = await asyncio.wait_for(
-                    self.core.gateway.speak(text, chat_id=f"discord:{channel_id}"),
-                    timeout=self._get_speak_timeout()
-                )
+                with self.core.gateway.stream_to(reply):
+                    response = await asyncio.wait_for(
+                        self.core.gateway.speak(text, chat_id=f"discord:{channel_id}"),
+                        timeout=self._get_speak_timeout()
+                    )
         except asyncio.TimeoutError:
             provider = getattr(self.core.gateway.llm, 'provider', 'unknown')
             model = getattr(self.core.gateway.llm, 'model', 'unknown')
@@ -270,14 +274,41 @@ class DiscordBridge:
                     await self._log(f"[Discord] Image delivery error: {e}", priority=1)
 
             # Send text response — chunk if it exceeds Discord's 2000-char limit
-            if response:
+            if response or (reply is not None and reply.started):
                 try:
-                    chunks = self._chunk_text(response, 2000)
-                    for chunk in chunks:
-                        await channel.send(chunk)
+                    if reply is not None and reply.started:
+                        # Turn the live draft into the final answer in place (clears the cursor)
+                        await reply.finish(response)
+                    else:
+                        chunks = self._chunk_text(response, 2000)
+                        for chunk in chunks:
+                            await channel.send(chunk)
                 except Exception as e:
                     await self._log(f"[Discord] Send error: {e}", priority=1)
 
+    def _new_progressive_reply(self, channel):
+        """ProgressiveReply for a channel, or None when discord.stream_replies is off."""
+        if not self.config.get('stream_replies', True):
+            return None
+
+        async def _send(text, final):
+            return await channel.send(text)
+
+        async def _edit(msg, text, final):
+            await msg.edit(content=text)
+
+        async def _on_error(e):
+            await self._log(f"[Discord] Streamed reply error: {e}", priority=2)
+
+        return ProgressiveReply(
+            send=_send,
+            edit=_edit,
+            max_len=2000,
+            # Discord allows 5 message edits per 5s per channel
+            edit_interval=float(self.config.get('stream_edit_interval', 1.2)),
+            on_error=_on_error,
+        )
+
     # ──────────────────────────────────────────────
     #  Status report builder (shared by slash command)
     # ──────────────────────────────────────────────
@@ -6,6 +6,7 @@ import sys
 import yaml
 import time
 import logging
+from collections import deque
 from datetime import datetime
 
 # Enable VT processing for ANSI colors on Windows
@@ -19,9 +20,13 @@ logging.getLogger("aiohttp.access").setLevel(logging.WARNING)
 logging.getLogger("aiohttp.server").setLevel(logging.WARNING)
 
 class GalacticRelay:
+    TRACE_BUFFER_SIZE = 500  # agent_trace entries kept for the Thinking tab restore
+
     def __init__(self, core):
         self.core = core
         self.queue = asyncio.PriorityQueue()
+        # Captured once here instead of once per connected web client
+        self.trace_buffer = deque(maxlen=self.TRACE_BUFFER_SIZE)
 
     async def emit(self, priority, msg_type, data):
         await self.queue.put((priority, time.time(), json.dumps({"type": msg_type, "data": data})))
@@ -33,10 +38,19 @@ class GalacticRelay:
             payload["ts"] = ts
             encoded = (json.dumps(payload) + "\n").encode()
 
+            msg_type = payload.get("type")
+            if msg_type == "agent_trace" and payload.get("data"):
+                self.trace_buffer.append(payload["data"])
+
             # Broadcast to all connected adapters
             disconnected = []
             for client in self.core.clients:
                 try:
+                    # Queue-backed adapters (web sockets) take the frame without blocking;
+                    # they raise once they have fallen too far behind and been closed.
+                    if hasattr(client, 'enqueue'):
+                        client.enqueue(msg_type, payload, encoded)
+                        continue
                     client.write(encoded)
                     # Timeout drain so a stalled web client can't block the event loop
                     await asyncio.wait_for(client.drain(), timeout=2.0)
@@ -63,6 +77,7 @@ class GalacticCore:
         self.config = self.load_config()
         self.plugins = []
         self.skills = []
+        self.skill_loader = None
         self.clients = []
         self.relay = GalacticRelay(self)
         self.running = True
@@ -176,47 +191,79 @@ class GalacticCore:
             return False
 
     async def setup_systems(self):
-        """Initialize core sub-systems."""
+        """Initialize core sub-systems.
+
+        Each subsystem is built inside subsystems.measure() so the startup report
+        shows its time and memory. The vector store, embedding model and torch are
+        registered but deferred: they load on first use (or `await
+        self.subsystems.get(name)`).
+        """
         try:
-            from gateway_v3 import GalacticGateway
-            from galactic_memory import GalacticMemory
-            from telegram_bridge import TelegramBridge
-            from web_deck import GalacticWebDeck
-            from scheduler import GalacticScheduler
-            from model_manager import ModelManager
+            from subsystems import SubsystemRegistry
+            self.subsystems = SubsystemRegistry(self)
+            measure = self.subsystems.measure
             
             await self.log("Initializing core systems...", priority=2)
             
             # Resilient memory initialization (handles old/new signatures during upgrade)
-            try:
-                self.memory = GalacticMemory(self)
-            except TypeError:
-                self.memory = GalacticMemory()
-                self.memory.core = self # Manual link for legacy versions
+            with measure("memory"):
+                from galactic_memory import GalacticMemory
+                try:
+                    self.memory = GalacticMemory(self)
+                except TypeError:
+                    self.memory = GalacticMemory()
+                    self.memory.core = self # Manual link for legacy versions
+            # Heavy semantic-memory stacks: built on first save/recall
+            self.subsystems.register("vector_store", lambda: self.memory.collection, threaded=True)
+            self.subsystems.register("embeddings", lambda: self.memory.model, threaded=True)
+            self.subsystems.register("torch", lambda: __import__("torch"), threaded=True)
             
-            self.gateway = GalacticGateway(self)
-            self.gateway.galactic_memory = self.memory # Link them
+            with measure("gateway"):
+                from gateway_v3 import GalacticGateway
+                self.gateway = GalacticGateway(self)
+                self.gateway.galactic_memory = self.memory # Link them
             
             # Cost tracking (persistent JSONL)
-            from gateway_v3 import CostTracker
-            logs_dir = self.config.get('paths', {}).get('logs', './logs')
-            self.cost_tracker = CostTracker(logs_dir)
+            with measure("cost_tracker"):
+                from gateway_v3 import CostTracker
+                logs_dir = self.config.get('paths', {}).get('logs', './logs')
+                retention_days = self.config.get('cost_tracking', {}).get('retention_days', 30)
+                self.cost_tracker = CostTracker(logs_dir, retention_days=retention_days)
+
+            # Optional process pool for CPU-bound tools (workers.enabled)
+            with measure("workers"):
+                from worker_pool import WorkerPool
+                self.workers = WorkerPool(self)
+
+            # Optional warm Python kernels / shells per agent session (warm_sessions.enabled)
+            with measure("warm_sessions"):
+                from warm_sessions import WarmSessionManager
+                self.warm_sessions = WarmSessionManager(self)
             
-            self.model_manager = ModelManager(self)
+            with measure("model_manager"):
+                from model_manager import ModelManager
+                self.model_manager = ModelManager(self)
 
             # Ollama Manager — robust local model support (health, discovery, context windows)
-            from ollama_manager import OllamaManager
-            self.ollama_manager = OllamaManager(self)
+            with measure("ollama"):
+                from ollama_manager import OllamaManager
+                self.ollama_manager = OllamaManager(self)
             try:
                 await self.ollama_manager.health_check()
                 await self.ollama_manager.discover_models()
             except Exception as e:
                 await self.log(f"Ollama health check failed: {e}", priority=1)
 
-            self.telegram = TelegramBridge(self)
-            self.web_deck = GalacticWebDeck(self)
-            self.web = self.web_deck # Legacy alias
-            self.scheduler = GalacticScheduler(self)
+            with measure("telegram"):
+                from telegram_bridge import TelegramBridge
+                self.telegram = TelegramBridge(self)
+            with measure("web_deck"):
+                from web_deck import GalacticWebDeck
+                self.web_deck = GalacticWebDeck(self)
+                self.web = self.web_deck # Legacy alias
+            with measure("scheduler"):
+                from scheduler import GalacticScheduler
+                self.scheduler = GalacticScheduler(self)
 
             # Set initial model from ModelManager
             initial_model = self.model_manager.get_current_model()
@@ -232,7 +279,10 @@ class GalacticCore:
             await self.log("Systems initialized. Core capabilities running as Skills.", priority=2)
 
             # Load Skills (runs alongside plugins during migration)
-            await self.load_skills()
+            with measure("skills"):
+                await self.load_skills()
+
+            await self.log(self.subsystems.report(), priority=2)
         except Exception as e:
             await self.log(f"CRITICAL: Failed to setup systems: {e}", priority=1)
             import traceback
@@ -300,24 +350,28 @@ class GalacticCore:
             ('skills.core.tensor_context',   'TensorContext'),
             ('skills.core.reasoning_agent',  'ReasoningAgentSkill'),
         ]
-        loaded_skill_names = []
-        for module_path, class_name in CORE_SKILLS:
-            skill = self._load_skill(module_path, class_name, is_core=True)
-            if skill:
-                loaded_skill_names.append(skill.skill_name)
+        specs = [(module_path, class_name, True) for module_path, class_name in CORE_SKILLS]
 
         # Community skills from registry.json
         registry = self._read_registry()
         for entry in registry.get('installed', []):
-            module = f"skills.community.{entry['module']}"
-            skill = self._load_skill(module, entry['class'], is_core=False)
-            if skill:
-                loaded_skill_names.append(skill.skill_name)
+            specs.append((f"skills.community.{entry['module']}", entry['class'], False))
+
+        # Skills with a cached manifest entry and no background work are registered as
+        # stubs and imported on first tool call; the rest load concurrently here.
+        from skill_loader import SkillLoader, LazySkill
+        if self.skill_loader is None:
+            self.skill_loader = SkillLoader(self)
+        self.skills = await self.skill_loader.load_all(specs)
+        loaded_skill_names = [s.skill_name for s in self.skills if not isinstance(s, LazySkill)]
+        deferred_skill_names = [s.skill_name for s in self.skills if isinstance(s, LazySkill)]
 
         # Register all skill-provided tools into gateway
         if self.skills:
             self.gateway.register_skill_tools(self.skills)
             await self.log(f"Skills loaded: {', '.join(loaded_skill_names)}", priority=2)
+            if deferred_skill_names:
+                await self.log(f"Skills deferred until first use: {', '.join(deferred_skill_names)}", priority=3)
 
         # Backwards compat: also populate self.plugins so web_deck.py can find skills by class name
         for skill in self.skills:
@@ -327,7 +381,8 @@ class GalacticCore:
         # Re-check for browser skill now that skills are loaded
         if not getattr(self, 'browser', None):
             browser_skill = next(
-                (s for s in self.skills if getattr(s, 'skill_name', '') == 'browser_pro'),
+                (s for s in self.skills
+                 if getattr(s, 'skill_name', '') == 'browser_pro' and not isinstance(s, LazySkill)),
                 None
             )
             if browser_skill:
@@ -336,11 +391,15 @@ class GalacticCore:
     async def imprint_workspace(self):
         """Initial memory imprint of key personality files."""
         await self.log("Starting Workspace Memory Imprint...", priority=2)
-        workspace_files = ['USER.md', 'IDENTITY.md', 'SOUL.md', 'MEMORY.md', 'TOOLS.md', 'VAULT.md']
-        for file in workspace_files:
-            file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', file)
-            if os.path.exists(file_path):
-                await self.memory.imprint_file(file_path)
+        try:
+            workspace_files = ['USER.md', 'IDENTITY.md', 'SOUL.md', 'MEMORY.md', 'TOOLS.md', 'VAULT.md']
+            for file in workspace_files:
+                file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', file)
+                if os.path.exists(file_path):
+                    await self.memory.imprint_file(file_path)
+        except Exception as e:
+            await self.log(f"Workspace Imprint failed: {e}", priority=1)
+            return
         await self.log("Workspace Imprint Complete.", priority=2)
 
     def _rotate_if_needed(self, path, max_bytes=2_000_000, max_lines=5000):
@@ -582,6 +641,27 @@ class GalacticCore:
         except Exception:
             pass
 
+        # Stop worker processes
+        try:
+            if hasattr(self, 'workers'):
+                self.workers.shutdown()
+        except Exception:
+            pass
+
+        # Stop warm interpreter sessions
+        try:
+            if hasattr(self, 'warm_sessions'):
+                await self.warm_sessions.shutdown()
+        except Exception:
+            pass
+
+        # Close the shared Ollama HTTP client
+        try:
+            if hasattr(self, 'ollama_manager'):
+                await self.ollama_manager.close()
+        except Exception:
+            pass
+
         # Close browser if open
         try:
             if hasattr(self, 'browser') and hasattr(self.browser, 'close'):
@@ -683,7 +763,8 @@ class GalacticCore:
         await self.log(f"Launching {self.config['system']['name']} v{self.config.get('system',{}).get('version','?')} (Async)...", priority=1)
 
         await self.setup_systems()
-        await self.imprint_workspace()
+        # Imprinting embeds the workspace files, so it waits until memory is first used
+        self.memory.defer_until_semantic(self.imprint_workspace)
 
         # Remote access warning
         web_cfg = self.config.get('web', {})
@@ -715,14 +796,15 @@ class GalacticCore:
         asyncio.create_task(self.telegram.listen_loop())
         asyncio.create_task(self.web.run())
         asyncio.create_task(self.scheduler.run())
+        asyncio.create_task(self.warm_sessions.run())
         asyncio.create_task(self.ollama_manager.auto_discover_loop())
         asyncio.create_task(self._recovery_check_loop())
         asyncio.create_task(self._update_check_loop())
         asyncio.create_task(self._terminal_input_loop())
 
-        # Start Skills
+        # Start Skills (deferred skills start theirs when first loaded)
         for skill in self.skills:
-            asyncio.create_task(skill.run())
+            self.skill_loader.start_run(skill)
 
         await self.log(f"All systems online. Control Deck → http://{self.config.get('web', {}).get('host', '127.0.0.1')}:{self.config.get('web', {}).get('port', 17789)}", priority=1)
         await self.log("Press Ctrl+C to shut down.", priority=3)
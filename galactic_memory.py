@@ -2,18 +2,24 @@
 # GALACTIC MEMORY CORE: Hybrid Episodic + Semantic Storage
 # Surpasses OpenClaw by giving the AI a true "hippocampus" for long-term learning.
 
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 import sqlite3
 import json
 import asyncio
-import os
+import contextlib
+import importlib.util
+import threading
 from datetime import datetime
 from pathlib import Path
 import hashlib
 import os
 
+# chromadb and sentence-transformers (which pulls in torch) are imported on first
+# use, not here. Still fail the import if they are missing so callers that guard
+# with `except ImportError` keep working.
+for _dep in ("chromadb", "sentence_transformers"):
+    if importlib.util.find_spec(_dep) is None:
+        raise ImportError(f"galactic_memory requires {_dep}")
+
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = BASE_DIR / "galactic_memory.db"
 CHROMA_PATH = BASE_DIR / "chroma_data"
@@ -32,12 +38,9 @@ class GalacticMemory:
             self.db_path = DB_PATH
             self.chroma_path = CHROMA_PATH
 
-        # 2. Init Semantic Memory (ChromaDB)
-        self.chroma_client = chromadb.PersistentClient(path=self.chroma_path)
-        self.collection = self.chroma_client.get_or_create_collection(
-            name="galactic_memory", # Changed collection name
-            metadata={"hnsw:space": "cosine"} # Retained metadata
-        )
+        # 2. Semantic Memory (ChromaDB) — opened on first use, see `collection`
+        self.chroma_client = None
+        self._collection = None
 
         # 1. Init episodic memory (SQLite)
         self.db_conn = sqlite3.connect(self.db_path, check_same_thread=False) # Changed self.conn to self.db_conn, added check_same_thread
@@ -45,10 +48,48 @@ class GalacticMemory:
 
         # Thread safety lock
         self._lock = asyncio.Lock()
+        self._load_lock = threading.Lock()  # first-use loads may run in a worker thread
         
         # 3. Init Embedding Model (Lazy load)
         self._model = None
 
+        # Background work that needs embeddings (the workspace imprint) waits for first use
+        self._on_first_semantic = None
+        self._first_semantic_task = None
+
+    def _measure(self, name):
+        """Record a first-use load in the core's subsystem registry (startup report / readiness)."""
+        registry = getattr(self.core, 'subsystems', None)
+        return registry.measure(name) if registry is not None else contextlib.nullcontext()
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            with self._load_lock:
+                if self._collection is None:
+                    with self._measure("vector_store"):
+                        import chromadb
+                        self.chroma_client = chromadb.PersistentClient(path=self.chroma_path)
+                        self._collection = self.chroma_client.get_or_create_collection(
+                            name="galactic_memory", # Changed collection name
+                            metadata={"hnsw:space": "cosine"} # Retained metadata
+                        )
+        return self._collection
+
+    def defer_until_semantic(self, coro_fn):
+        """Run coro_fn() in the background once semantic memory is first used, so hosts that
+        never save or query memories never load chromadb or the embedding model."""
+        self._on_first_semantic = coro_fn
+
+    async def _ensure_semantic(self):
+        """Open the vector store and load the embedding model off the event loop (first call only)."""
+        if self._collection is None or self._model is None:
+            await asyncio.to_thread(lambda: (self.collection, self.model))
+        hook, self._on_first_semantic = self._on_first_semantic, None
+        if hook is not None:
+            # Not awaited: save_memory() holds self._lock here and the hook saves memories too
+            self._first_semantic_task = asyncio.create_task(hook())
+
     async def imprint(self, content, metadata=None):
         """Compatibility wrapper for 'imprint' (calls save_memory)."""
         category = (metadata or {}).get("category", "general")
@@ -77,16 +118,20 @@ class GalacticMemory:
     @property
     def model(self):
         if self._model is None:
-            # Look for GPUOffloader skill to handle hardware routing
-            device = "cpu"
-            if self.core:
-                offloader = next((s for s in self.core.skills if getattr(s, 'skill_name', '') == 'gpu_offloader'), None)
-                if offloader:
-                    device = offloader.get_device("embeddings")
+            with self._load_lock:
+                if self._model is None:
+                    with self._measure("embeddings"):
+                        from sentence_transformers import SentenceTransformer
+                        # Look for GPUOffloader skill to handle hardware routing
+                        device = "cpu"
+                        if self.core:
+                            offloader = next((s for s in getattr(self.core, 'skills', []) if getattr(s, 'skill_name', '') == 'gpu_offloader'), None)
+                            if offloader:
+                                device = offloader.get_device("embeddings")
 
-            print(f"🧠 Loading embedding model to {device} (approx 10s)...")
-            self._model = SentenceTransformer(EMBEDDING_MODEL, device=device)
-            print(f"✅ Model loaded on {device}.")
+                        print(f"🧠 Loading embedding model to {device} (approx 10s)...")
+                        self._model = SentenceTransformer(EMBEDDING_MODEL, device=device)
+                        print(f"✅ Model loaded on {device}.")
         return self._model
 
     def _init_db(self): # Renamed from _init_sql
@@ -107,6 +152,7 @@ class GalacticMemory:
         """Save a memory with both semantic (vector) and episodic (sql) storage."""
         async with self._lock:
             try:
+                await self._ensure_semantic()
                 timestamp = datetime.now().isoformat()
                 
                 # Generate Vector Embedding (semantic)
@@ -142,6 +188,7 @@ class GalacticMemory:
 
     async def query_memory(self, query: str, n_results: int = 5, category: str = None):
         """Query memory by meaning (semantic), with optional category filter."""
+        await self._ensure_semantic()
         async with self._lock:
             # SentenceTransformer encode is cpu-bound, but we run in thread to avoid blocking loop
             # For now, keeping it simple as this is a local small model
@@ -9,7 +9,10 @@ import traceback
 import uuid
 import hashlib
 import secrets
+import sqlite3
+import threading
 import contextvars
+import contextlib
 import httpx
 import webbrowser
 
@@ -26,6 +29,8 @@ except ImportError:
 from model_manager import (TRANSIENT_ERRORS, PERMANENT_ERRORS,
                            ERROR_RATE_LIMIT, ERROR_TIMEOUT, ERROR_AUTH)
 from spinner import spinner
+from media_utils import ImageStore, max_edge_for, prepare_image
+from process_output import capture_process
 
 # ── Dedicated Temporary Folder ─────────────────────────────────────────────────
 # ALL temporary scripts, snippets, and scratch files MUST go here.
@@ -143,50 +148,235 @@ FREE_PROVIDERS = {"nvidia", "cerebras", "groq", "huggingface", "ollama"}
 
 
 class CostTracker:
-    """Tracks per-request token costs, persists to JSONL, computes dashboard stats."""
+    """Tracks per-request token costs, persists to JSONL, computes dashboard stats.
 
-    def __init__(self, logs_dir='./logs'):
+    Every request is still appended to cost_log.jsonl, and is also folded into
+    per-day/model/provider rollups stored in cost_rollups.db (SQLite). Stats are
+    served from the in-memory rollups of the last STATS_WINDOW_DAYS days, so
+    neither startup nor get_stats() replays the raw log. Raw entries older than
+    retention_days are moved to cost_archive/cost_log_YYYY-MM.jsonl once a day.
+
+    The DB also keeps each raw entry (cost_entries) for the stats window. It is
+    the import's dedup key, so re-reading JSONL lines never counts them twice.
+    It also gives the exact part of the day a week/month window starts on.
+    """
+
+    STATS_WINDOW_DAYS = 31
+
+    def __init__(self, logs_dir='./logs', retention_days=30):
         self.logs_dir = logs_dir
         self.log_file = os.path.join(logs_dir, 'cost_log.jsonl')
+        self.db_path = os.path.join(logs_dir, 'cost_rollups.db')
+        self.archive_dir = os.path.join(logs_dir, 'cost_archive')
+        self.retention_days = retention_days
         os.makedirs(logs_dir, exist_ok=True)
         self.session_start = datetime.now().isoformat()
         self.session_cost = 0.0
         self.last_request_cost = 0.0
-        self.entries = []  # in-memory cache of recent entries
-        self._load_existing()
+        # (day, model, provider) -> {"messages", "tin", "tout", "cost", "free"}
+        self.rollups = {}
+        self.free_models = set()
+        self._start_day_entries = (None, {})  # (today, {day: raw entries}) for window start days
+        self._last_archive_day = None
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_db()
+        self._import_new_lines()
+        self._load_rollups()
+
+    def _init_db(self):
+        with self._db_lock:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS cost_daily (
+                    day TEXT,
+                    model TEXT,
+                    provider TEXT,
+                    free INTEGER DEFAULT 0,
+                    messages INTEGER DEFAULT 0,
+                    tokens_in INTEGER DEFAULT 0,
+                    tokens_out INTEGER DEFAULT 0,
+                    cost REAL DEFAULT 0,
+                    PRIMARY KEY (day, model, provider)
+                )
+            """)
+            self._db.execute("CREATE TABLE IF NOT EXISTS cost_meta (key TEXT PRIMARY KEY, value TEXT)")
+            new_entries_table = not self._db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cost_entries'").fetchone()
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS cost_entries (
+                    ts TEXT,
+                    model TEXT,
+                    provider TEXT,
+                    day TEXT,
+                    free INTEGER DEFAULT 0,
+                    tokens_in INTEGER DEFAULT 0,
+                    tokens_out INTEGER DEFAULT 0,
+                    cost REAL DEFAULT 0,
+                    PRIMARY KEY (ts, model, provider)
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS cost_entries_day ON cost_entries (day)")
+            if new_entries_table:
+                self._backfill_entries()
+            self._db.commit()
+
+    def _backfill_entries(self):
+        """Record the already-imported JSONL lines in cost_entries (DB created before that table)."""
+        offset = int(self._get_meta('log_offset', 0))
+        if not offset or not os.path.exists(self.log_file):
+            return
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            while f.tell() < offset:
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    self._insert_entry(json.loads(line))
+                except json.JSONDecodeError:
+                    pass
 
-    def _load_existing(self):
-        """Load existing JSONL entries into memory."""
+    def _get_meta(self, key, default=None):
+        row = self._db.execute("SELECT value FROM cost_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self._db.execute(
+            "INSERT INTO cost_meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    def _insert_entry(self, entry):
+        """Record one raw entry; False if it is already in the DB."""
+        cur = self._db.execute(
+            "INSERT OR IGNORE INTO cost_entries (ts, model, provider, day, free, tokens_in, tokens_out, cost) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                entry.get('ts', ''), entry.get('model', 'unknown'), entry.get('provider', ''),
+                entry.get('ts', '')[:10], 1 if entry.get('free') else 0,
+                entry.get('tin', 0), entry.get('tout', 0), entry.get('cost', 0.0),
+            ),
+        )
+        return cur.rowcount == 1
+
+    def _fold_into_db(self, entry):
+        """Add one raw entry to its daily rollup row unless it was folded before
+        (caller holds _db_lock and commits). Returns True if it was added."""
+        if not self._insert_entry(entry):
+            return False
+        self._db.execute(
+            "INSERT INTO cost_daily (day, model, provider, free, messages, tokens_in, tokens_out, cost) "
+            "VALUES (?, ?, ?, ?, 1, ?, ?, ?) "
+            "ON CONFLICT(day, model, provider) DO UPDATE SET "
+            "free = MAX(free, excluded.free), messages = messages + 1, "
+            "tokens_in = tokens_in + excluded.tokens_in, tokens_out = tokens_out + excluded.tokens_out, "
+            "cost = cost + excluded.cost",
+            (
+                entry.get('ts', '')[:10], entry.get('model', 'unknown'), entry.get('provider', ''),
+                1 if entry.get('free') else 0, entry.get('tin', 0), entry.get('tout', 0), entry.get('cost', 0.0),
+            ),
+        )
+        return True
+
+    def _fold_into_memory(self, entry):
+        key = (entry.get('ts', '')[:10], entry.get('model', 'unknown'), entry.get('provider', ''))
+        r = self.rollups.setdefault(key, {"messages": 0, "tin": 0, "tout": 0, "cost": 0.0, "free": False})
+        r["messages"] += 1
+        r["tin"] += entry.get('tin', 0)
+        r["tout"] += entry.get('tout', 0)
+        r["cost"] += entry.get('cost', 0.0)
+        r["free"] = r["free"] or bool(entry.get('free'))
+        if entry.get('free'):
+            self.free_models.add(key[1])
+
+    def _import_new_lines(self):
+        """Fold JSONL lines not yet in the rollup DB (first run after upgrade, or a crash mid-write).
+
+        Rows, cost_entries and the new offset are committed together, and lines
+        already in cost_entries are skipped. So a stale offset (e.g. a crash
+        between rewriting the log and committing) can't count anything twice.
+        """
         if not os.path.exists(self.log_file):
             return
         try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
+            with self._db_lock:
+                offset = int(self._get_meta('log_offset', 0))
+                size = os.path.getsize(self.log_file)
+                if size == offset:
+                    return
+                if size < offset:
+                    offset = 0  # file was rewritten — rescan it; known entries are skipped
+                with open(self.log_file, 'r', encoding='utf-8') as f:
+                    f.seek(offset)
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
                         try:
-                            self.entries.append(json.loads(line))
+                            self._fold_into_db(json.loads(line))
                         except json.JSONDecodeError:
                             print(f"⚠️ [CostTracker] Corrupted JSON in {self.log_file}. Skipping line.")
-                            continue
+                    self._set_meta('log_offset', f.tell())
+                self._db.commit()
         except Exception as e:
-            print(f"⚠️ [CostTracker] Error loading {self.log_file}: {e}")
+            print(f"⚠️ [CostTracker] Error importing {self.log_file}: {e}")
 
-    async def _rewrite_file_async(self):
-        """Rewrite the JSONL file from memory (after prune) asynchronously."""
-        def _sync_rewrite():
-            try:
-                with open(self.log_file, 'w', encoding='utf-8') as f:
-                    for entry in self.entries:
-                        f.write(json.dumps(entry) + '\n')
-            except Exception as e:
-                print(f"⚠️ [CostTracker] Error rewriting {self.log_file}: {e}")
-        
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, _sync_rewrite)
+    def _load_rollups(self):
+        """Load the rollups inside the stats window into memory."""
+        from datetime import timedelta
+        cutoff = (datetime.now() - timedelta(days=self.STATS_WINDOW_DAYS)).strftime('%Y-%m-%d')
+        try:
+            with self._db_lock:
+                rows = self._db.execute(
+                    "SELECT day, model, provider, free, messages, tokens_in, tokens_out, cost "
+                    "FROM cost_daily WHERE day >= ?", (cutoff,)
+                ).fetchall()
+                free_rows = self._db.execute("SELECT DISTINCT model FROM cost_daily WHERE free = 1").fetchall()
+        except Exception as e:
+            print(f"⚠️ [CostTracker] Error loading {self.db_path}: {e}")
+            return
+        for day, model, provider, free, messages, tin, tout, cost in rows:
+            self.rollups[(day, model, provider)] = {
+                "messages": messages, "tin": tin, "tout": tout, "cost": cost, "free": bool(free),
+            }
+        self.free_models.update(r[0] for r in free_rows)
+
+    def _archive_old_entries(self):
+        """Move raw JSONL entries older than retention_days into monthly archive files."""
+        from datetime import timedelta
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        # Raw entries stay in the DB as long as the log (or the stats window) can still hold them
+        keep_from = datetime.now() - timedelta(days=max(self.retention_days, self.STATS_WINDOW_DAYS) + 1)
+        self._db.execute("DELETE FROM cost_entries WHERE day < ?", (keep_from.strftime('%Y-%m-%d'),))
+        if not os.path.exists(self.log_file):
+            return
+        keep, archived = [], defaultdict(list)
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    day = json.loads(line).get('ts', '')[:10]
+                except json.JSONDecodeError:
+                    continue
+                if day and day < cutoff:
+                    archived[day[:7]].append(line)
+                else:
+                    keep.append(line)
+        if not archived:
+            return
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for month, lines in archived.items():
+            with open(os.path.join(self.archive_dir, f'cost_log_{month}.jsonl'), 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+        tmp_path = self.log_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(keep)
+        os.replace(tmp_path, self.log_file)
+        self._set_meta('log_offset', os.path.getsize(self.log_file))
 
     async def log_usage(self, model, provider, tokens_in, tokens_out, actual_cost=None):
-        """Calculate cost, append to JSONL, update running totals."""
+        """Calculate cost, append to JSONL, update running totals and rollups."""
         is_free = provider in FREE_PROVIDERS
 
         if actual_cost is not None:
@@ -214,29 +404,65 @@ class CostTracker:
             "actual": actual_cost is not None,
         }
 
-        self.entries.append(entry)
+        self._fold_into_memory(entry)
         self.session_cost += total_cost
         self.last_request_cost = total_cost
 
-        # Append to file asynchronously
+        today = entry["ts"][:10]
+        run_archive = self._last_archive_day != today
+        self._last_archive_day = today
+
+        # Append to file and rollup DB off the event loop
         def _sync_append():
             try:
-                with open(self.log_file, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps(entry) + '\n')
+                with self._db_lock:
+                    with open(self.log_file, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(entry) + '\n')
+                        offset = f.tell()
+                    self._fold_into_db(entry)
+                    self._set_meta('log_offset', offset)
+                    if run_archive:
+                        self._archive_old_entries()
+                    self._db.commit()
             except Exception as e:
                 print(f"⚠️ [CostTracker] Error appending to {self.log_file}: {e}")
         
         loop = asyncio.get_running_loop()
         await loop.run_in_executor(None, _sync_append)
 
+    def _entries_on(self, day, today):
+        """Raw entries of one past day. Windows that start partway through it need them.
+        Past days no longer change, so they are cached until the date rolls over."""
+        cached_today, by_day = self._start_day_entries
+        if cached_today != today:
+            by_day = {}
+            self._start_day_entries = (today, by_day)
+        if day not in by_day:
+            try:
+                with self._db_lock:
+                    by_day[day] = self._db.execute(
+                        "SELECT ts, model, free, tokens_in, tokens_out, cost FROM cost_entries WHERE day = ?",
+                        (day,)
+                    ).fetchall()
+            except Exception as e:
+                print(f"⚠️ [CostTracker] Error reading entries for {day}: {e}")
+                return []
+        return by_day[day]
+
     def get_stats(self):
-        """Compute dashboard statistics from in-memory entries."""
+        """Compute dashboard statistics from the in-memory daily rollups.
+
+        Windows start at the exact cutoff (now - 7d, now - 30d, ...). Whole days
+        after the cutoff's day come from the rollups; the cutoff's own day counts
+        only its raw entries from the cutoff time on.
+        """
         from datetime import timedelta
         now = datetime.now()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+        today = now.strftime('%Y-%m-%d')
         week_start = (now - timedelta(days=7)).isoformat()
         month_start = (now - timedelta(days=30)).isoformat()
         fourteen_days_ago = (now - timedelta(days=14)).isoformat()
+        window_start = (now - timedelta(days=self.STATS_WINDOW_DAYS)).strftime('%Y-%m-%d')
 
         today_cost = 0.0
         week_cost = 0.0
@@ -244,38 +470,47 @@ class CostTracker:
         month_messages = 0
         daily_map = defaultdict(lambda: {"cost": 0.0, "models": defaultdict(float)})
         model_map = defaultdict(lambda: {"cost": 0.0, "messages": 0, "tokens_in": 0, "tokens_out": 0})
-        free_models = set()
 
-        for e in self.entries:
-            ts = e.get('ts', '')
-            cost = e.get('cost', 0.0)
-            model = e.get('model', 'unknown')
-            is_free = e.get('free', False)
+        for key in [k for k in self.rollups if k[0] < window_start]:
+            del self.rollups[key]
 
-            if is_free:
-                free_models.add(model)
+        def add_month(model, messages, tin, tout, cost, free):
+            nonlocal month_cost, month_messages
+            month_cost += cost
+            month_messages += messages
+            # By-model aggregation (last 30 days)
+            if not free:
+                model_map[model]["cost"] += cost
+                model_map[model]["messages"] += messages
+                model_map[model]["tokens_in"] += tin
+                model_map[model]["tokens_out"] += tout
+
+        def add_daily(day, model, cost):
+            # Daily series (last 14 days)
+            daily_map[day]["cost"] += cost
+            short_model = model.split('/')[-1] if '/' in model else model
+            daily_map[day]["models"][short_model] += cost
 
-            if ts >= today_start:
+        for (day, model, _provider), r in self.rollups.items():
+            cost = r["cost"]
+            if day >= today:
                 today_cost += cost
+            if day > week_start[:10]:
+                week_cost += cost
+            if day > month_start[:10]:
+                add_month(model, r["messages"], r["tin"], r["tout"], cost, r["free"])
+            if day > fourteen_days_ago[:10]:
+                add_daily(day, model, cost)
+
+        for ts, model, free, tin, tout, cost in self._entries_on(week_start[:10], today):
             if ts >= week_start:
                 week_cost += cost
+        for ts, model, free, tin, tout, cost in self._entries_on(month_start[:10], today):
             if ts >= month_start:
-                month_cost += cost
-                month_messages += 1
-
-            # Daily series (last 14 days)
+                add_month(model, 1, tin, tout, cost, free)
+        for ts, model, free, tin, tout, cost in self._entries_on(fourteen_days_ago[:10], today):
             if ts >= fourteen_days_ago:
-                day = ts[:10]  # YYYY-MM-DD
-                daily_map[day]["cost"] += cost
-                short_model = model.split('/')[-1] if '/' in model else model
-                daily_map[day]["models"][short_model] += cost
-
-            # By-model aggregation (last 30 days)
-            if ts >= month_start and not is_free:
-                model_map[model]["cost"] += cost
-                model_map[model]["messages"] += 1
-                model_map[model]["tokens_in"] += e.get('tin', 0)
-                model_map[model]["tokens_out"] += e.get('tout', 0)
+                add_daily(ts[:10], model, cost)
 
         # Build daily series (sorted, last 14 days)
         daily_series = []
@@ -310,10 +545,95 @@ class CostTracker:
             "message_count_month": month_messages,
             "daily": daily_series,
             "by_model": by_model,
-            "free_models_used": sorted(list(free_models)),
+            "free_models_used": sorted(list(self.free_models)),
         }
 
 
+class StreamCoalescer:
+    """Batches streamed model deltas into relay stream_chunk frames by time and size.
+
+    A frame goes out when the oldest buffered delta is flush_ms old or the
+    buffer reaches flush_bytes, whichever comes first. Fast local models no
+    longer flood the relay with tiny frames, and slow models are not held
+    back waiting for a fixed token count. Per-session frame/byte counters are
+    written to `stats` on close() so the frame rate stays observable.
+    Deltas are also handed, unbatched, to the session's chat sink (if a
+    bridge registered one via gateway.stream_to), which throttles on its own.
+    """
+
+    def __init__(self, relay, session_id="MAIN", flush_ms=40, flush_bytes=512, stats=None, sink=None):
+        self.relay = relay
+        self.sink = sink
+        if sink is not None:
+            sink.reset()
+        self.session_id = session_id
+        self.flush_interval = max(flush_ms, 1) / 1000.0
+        self.flush_bytes = flush_bytes
+        self.stats = stats
+        self._buf = []
+        self._buf_bytes = 0
+        self._timer = None
+        self._started = time.monotonic()
+        self.frames = 0
+        self.deltas = 0
+        self.bytes = 0
+
+    async def push(self, delta):
+        if not delta:
+            return
+        self._buf.append(delta)
+        self._buf_bytes += len(delta.encode('utf-8'))
+        self.deltas += 1
+        if self.sink is not None:
+            try:
+                await self.sink.push(delta)
+            except Exception:
+                self.sink = None  # a broken chat sink must not break the model call
+        if self._buf_bytes >= self.flush_bytes:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.flush_interval)
+        except asyncio.CancelledError:
+            return
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        if not self._buf:
+            return
+        text = "".join(self._buf)
+        self.bytes += self._buf_bytes
+        self._buf = []
+        self._buf_bytes = 0
+        self.frames += 1
+        await self.relay.emit(3, "stream_chunk", text)
+
+    async def close(self):
+        """Flush whatever is left and record this stream's frame rate."""
+        await self.flush()
+        if self.stats is None or not self.deltas:
+            return
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        self.stats.pop(self.session_id, None)
+        self.stats[self.session_id] = {
+            "frames": self.frames,
+            "deltas": self.deltas,
+            "bytes": self.bytes,
+            "duration_s": round(elapsed, 3),
+            "frames_per_s": round(self.frames / elapsed, 2),
+            "ts": time.time(),
+        }
+        while len(self.stats) > 50:
+            self.stats.pop(next(iter(self.stats)))
+
+
 class GalacticGateway:
     def __init__(self, core):
         self.core = core
@@ -343,6 +663,8 @@ class GalacticGateway:
         self.total_tokens_out = 0
         self._last_usage = None  # Populated by provider methods with real API token counts
         self._last_generation_id = None  # OpenRouter generation ID for cost lookup
+        # Live-stream frame stats per session (populated by StreamCoalescer.close)
+        self.stream_stats = {}
 
         # TTS voice file tracking — handled by ContextVar
 
@@ -361,6 +683,7 @@ class GalacticGateway:
         # Session-isolated state using contextvars
         self._session_history = contextvars.ContextVar('session_history', default=[])
         self._session_trace_sid = contextvars.ContextVar('session_trace_sid', default=None)
+        self._session_isolated_sid = contextvars.ContextVar('session_isolated_sid', default=None)  # set only inside speak_isolated()
         self._session_speaking = contextvars.ContextVar('session_speaking', default=False)
         self._session_is_coding = contextvars.ContextVar('session_is_coding', default=False)
         self._session_active_plan = contextvars.ContextVar('session_active_plan', default=None)
@@ -377,6 +700,8 @@ class GalacticGateway:
         self._session_llm_model = contextvars.ContextVar('session_llm_model', default=self.model)
         self._session_llm_api_key = contextvars.ContextVar('session_llm_api_key', default=self.api_key)
         self._session_progress_percent = contextvars.ContextVar('session_progress_percent', default=0)
+        # Chat bridges subscribe to this session's token stream (see chat_streaming.py)
+        self._session_stream_sink = contextvars.ContextVar('session_stream_sink', default=None)
 
         class LLMProxy:
             def __init__(self, prov_var, mod_var, key_var):
@@ -403,6 +728,12 @@ class GalacticGateway:
         self.runs_dir = os.path.join(logs_dir, 'runs')
         os.makedirs(self.runs_dir, exist_ok=True)
 
+        # Content-addressed image store — history holds image_ref parts, not base64
+        images_dir = core.config.get('paths', {}).get('images', './images')
+        self.image_store = ImageStore(os.path.join(images_dir, 'store'),
+                                      max_age_days=models_cfg.get('image_store_days', 30),
+                                      max_mb=models_cfg.get('image_store_mb', 1024))
+
         # ── Temp folder management ──────────────────────────────────────────
         # GALACTIC_TEMP_DIR is module-level so tools can import it directly.
         # On every gateway start, purge files older than 7 days to prevent growth.
@@ -413,6 +744,11 @@ class GalacticGateway:
         self._tool_call_history = Counter() # (turn_idx, tool, args_str) -> count
         self.thinking_level = models_cfg.get('thinking_level', 'low')
         self._stop_requested = False  # Set by /api/stop_agent to abort the current loop
+        # Dynamic Ollama num_ctx: per-model chars/token calibration, last size sent,
+        # and a minimum raised whenever a prompt came back truncated
+        self._ollama_chars_per_token = {}
+        self._ollama_num_ctx_last = {}
+        self._ollama_num_ctx_floor = {}
 
         # Persistent chat log (JSONL) — survives page refreshes
         self.history_file = os.path.join(logs_dir, 'chat_history.jsonl')
@@ -466,6 +802,22 @@ class GalacticGateway:
         """Set the trace_sid for the current session/task."""
         self._session_trace_sid.set(value)
 
+    @property
+    def isolated_session_id(self):
+        """session_id passed to speak_isolated() for the current task, else None (main agent).
+        Unlike _trace_sid, which is fresh on every main-agent message, this is stable for the
+        life of a sub-agent session, so per-session resources can be keyed on it."""
+        return self._session_isolated_sid.get()
+
+    @contextlib.contextmanager
+    def stream_to(self, sink):
+        """Forward this session's visible streamed deltas to sink (reset()/push(delta))."""
+        token = self._session_stream_sink.set(sink)
+        try:
+            yield sink
+        finally:
+            self._session_stream_sink.reset(token)
+
     @property
     def _speaking(self):
         return self._session_speaking.get()
@@ -1064,6 +1416,7 @@ class GalacticGateway:
                 "parameters": {"type": "object", "properties": {
                     "code": {"type": "string", "description": "Python code to execute"},
                     "timeout": {"type": "integer", "description": "Timeout seconds (default: 60, max: 300)"},
+                    "persistent": {"type": "boolean", "description": "Run in this session's warm Python kernel so variables and imports carry over between calls (default: warm_sessions.enabled)"},
                 }, "required": ["code"]},
                 "fn": self.tool_execute_python
             },
@@ -1937,7 +2290,6 @@ class GalacticGateway:
         
         try:
             import httpx
-            from bs4 import BeautifulSoup
             
             async with httpx.AsyncClient(follow_redirects=True, timeout=30.0, verify=False) as client:
                 response = await client.get(url, headers={
@@ -1945,45 +2297,8 @@ class GalacticGateway:
                 })
                 response.raise_for_status()
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Remove script and style elements
-                for script in soup(["script", "style", "nav", "footer", "header"]):
-                    script.decompose()
-                
-                # Get text
-                if mode == 'text':
-                    text = soup.get_text(separator='\n', strip=True)
-                else:  # markdown mode
-                    # Basic markdown conversion
-                    title = soup.find('title')
-                    title_text = f"# {title.string}\n\n" if title else ""
-                    
-                    body = soup.find('body') or soup
-                    paragraphs = body.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'li'])
-                    
-                    text_parts = [title_text]
-                    for p in paragraphs:
-                        tag_name = p.name
-                        text_content = p.get_text(strip=True)
-                        
-                        if tag_name == 'h1':
-                            text_parts.append(f"\n# {text_content}\n")
-                        elif tag_name == 'h2':
-                            text_parts.append(f"\n## {text_content}\n")
-                        elif tag_name == 'h3':
-                            text_parts.append(f"\n### {text_content}\n")
-                        elif tag_name == 'li':
-                            text_parts.append(f"- {text_content}")
-                        else:
-                            text_parts.append(text_content)
-                    
-                    text = '\n'.join(text_parts)
-                
-                # Limit length
-                max_chars = 8000
-                if len(text) > max_chars:
-                    text = text[:max_chars] + "\n\n[... content truncated]"
+                # Parsing is CPU-bound — run it in the worker pool (or a thread)
+                text = await self._cpu_task('html_to_text', response.text, mode, 8000)
                 
                 return f"[DOC] Content from {url}:\n\n{text}"
         except Exception as e:
@@ -3147,23 +3462,23 @@ class GalacticGateway:
             upload_dir = os.path.abspath(os.path.join(workspace, 'uploads'))
             os.makedirs(upload_dir, exist_ok=True)
             
-            image_paths = []
-            import base64 as _b64
-            for i, img in enumerate(images):
-                raw_name = img.get('name', f'image_{int(time.time())}_{i}')
-                safe_name = "".join([c for c in raw_name if c.isalnum() or c in ('.', '_', '-')]).strip()
-                if '.' not in safe_name:
-                    ext = img.get('mime', 'image/jpeg').split('/')[-1].replace('jpeg', 'jpg')
-                    safe_name += f".{ext}"
-                
-                dest = os.path.join(upload_dir, safe_name)
-                try:
-                    with open(dest, 'wb') as f:
-                        f.write(_b64.b64decode(img['b64']))
-                    image_paths.append(dest)
-                    img['path'] = dest 
-                except Exception as e:
-                    logger.error(f"Failed to save uploaded image: {e}")
+            # Decode, hash, save and downscale off the event loop
+            max_edge = max_edge_for(self.llm.provider, self.core.config.get('models', {}).get('vision_max_edge'))
+
+            def _prepare_all():
+                paths = []
+                for i, img in enumerate(images):
+                    try:
+                        dest = prepare_image(img, upload_dir, max_edge, index=i)
+                        if dest:
+                            paths.append(dest)
+                        img['ref'] = self.image_store.put_b64(img['b64'], img['mime'])
+                    except Exception as e:
+                        logger.error(f"Failed to save uploaded image: {e}")
+                return paths
+
+            image_paths = await asyncio.to_thread(_prepare_all)
+            images = [img for img in images if img.get('ref')]
 
             content = []
             if image_paths:
@@ -3173,12 +3488,7 @@ class GalacticGateway:
             if user_input:
                 content.append({"type": "text", "text": user_input})
             for img in images:
-                content.append({
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:{img['mime']};base64,{img['b64']}"
-                    }
-                })
+                content.append({"type": "image_ref", "image_ref": img['ref']})
             self.history.append({"role": "user", "content": content})
         else:
             self.history.append({"role": "user", "content": user_input})
@@ -3636,11 +3946,15 @@ class GalacticGateway:
                         # Vision handling
                         if isinstance(result, dict):
                             if "__image_b64__" in result:
+                                # Stored once by content hash; only the reference enters history
+                                image_ref = await asyncio.to_thread(
+                                    self.image_store.put_b64, result['__image_b64__'], result.get('media_type', 'image/jpeg')
+                                )
                                 img_msg = {
                                     "role": "user",
                                     "content": [
                                         {"type": "text", "text": f"Tool Output: {result.get('text', 'Image')}"},
-                                        {"type": "image_url", "image_url": {"url": result['__image_b64__'] if result['__image_b64__'].startswith('data:') else f"data:{result.get('media_type', 'image/jpeg')};base64,{result['__image_b64__']}"}}
+                                        {"type": "image_ref", "image_ref": image_ref}
                                     ]
                                 }
                                 messages.append(img_msg)
@@ -3965,6 +4279,7 @@ class GalacticGateway:
         # Prepare session tokens (individual variables for type safety/linting)
         t_h = self._session_history.set([])
         t_sid = self._session_trace_sid.set(session_id)
+        t_isid = self._session_isolated_sid.set(session_id)
         t_sp = self._session_speaking.set(False)
         t_ic = self._session_is_coding.set(False)
         t_ap = self._session_active_plan.set(None)
@@ -3972,6 +4287,7 @@ class GalacticGateway:
         t_if = self._session_image_file.set(None)
         t_tcp = self._session_tool_count_cp.set(0)
         t_cs = self._session_chrome_state.set(None)
+        t_ss = self._session_stream_sink.set(None)  # sub-agents never stream into the parent's chat reply
         t_et = self._session_est_tokens.set(0)
         t_cp = self._session_checkpoint_id.set(None)
         t_qs = self._session_queued_switch.set(None)
@@ -3990,6 +4306,7 @@ class GalacticGateway:
         finally:
             self._session_history.reset(t_h)
             self._session_trace_sid.reset(t_sid)
+            self._session_isolated_sid.reset(t_isid)
             self._session_speaking.reset(t_sp)
             self._session_is_coding.reset(t_ic)
             self._session_active_plan.reset(t_ap)
@@ -3997,6 +4314,7 @@ class GalacticGateway:
             self._session_image_file.reset(t_if)
             self._session_tool_count_cp.reset(t_tcp)
             self._session_chrome_state.reset(t_cs)
+            self._session_stream_sink.reset(t_ss)
             self._session_est_tokens.reset(t_et)
             self._session_checkpoint_id.reset(t_cp)
             self._session_queued_switch.reset(t_qs)
@@ -4053,6 +4371,14 @@ class GalacticGateway:
         'post_reddit': 30, 'read_reddit_inbox': 30, 'reply_reddit': 30,
     }
 
+    async def _cpu_task(self, name, *args, **kwargs):
+        """Run a CPU-bound helper from worker_pool.CPU_TASKS (process pool when enabled)."""
+        pool = getattr(self.core, 'workers', None)
+        if pool is not None:
+            return await pool.run(name, *args, **kwargs)
+        from worker_pool import CPU_TASKS
+        return await asyncio.to_thread(CPU_TASKS[name], *args, **kwargs)
+
     def _get_tool_timeout(self, tool_name):
         """Per-tool timeout: config override > built-in default > 60s."""
         overrides = self.core.config.get('tool_timeouts', {})
@@ -4297,7 +4623,7 @@ class GalacticGateway:
                 for part in content:
                     if part.get('type') == 'text':
                         content_str += part.get('text', '')
-                    elif part.get('type') == 'image_url':
+                    elif part.get('type') in ('image_url', 'image_ref'):
                         content_str += " [Image data removed for summarization] "
             else:
                 content_str = str(content)
@@ -4406,8 +4732,9 @@ class GalacticGateway:
         for m in reversed(messages):
             content = m.get("content")
             if isinstance(content, list):
-                # Check for image_url type elements
-                has_image = any(p.get("type") == "image_url" for p in content)
+                # Check for image elements (image_ref parts are expanded lazily at send time,
+                # see _expand_image_refs, so they count here but are never pruned)
+                has_image = any(p.get("type") in ("image_url", "image_ref") for p in content)
                 if has_image:
                     image_count += 1
                     if image_count > 1: # Only keep the single MOST RECENT image to be aggressive with memory
@@ -4454,6 +4781,55 @@ class GalacticGateway:
             
         return messages
 
+    async def _expand_image_refs(self, messages):
+        """Turn image_ref parts into provider-ready image_url data URLs at send time.
+
+        Only the newest `models.vision_history_images` images (default 1) are
+        loaded from the image store; older refs become a text placeholder.
+        Returns a new list — messages that carry refs are copied, so history
+        itself keeps the lightweight references.
+        """
+        positions = []
+        for mi, m in enumerate(messages):
+            content = m.get("content")
+            if isinstance(content, list):
+                positions.extend((mi, pi) for pi, p in enumerate(content)
+                                 if isinstance(p, dict) and p.get("type") == "image_ref")
+        if not positions:
+            return messages
+
+        keep = max(0, int(self.core.config.get('models', {}).get('vision_history_images', 1)))
+        expand = set(positions[-keep:]) if keep else set()
+
+        def _load(refs):
+            loaded = {}
+            for key, ref in refs.items():
+                try:
+                    loaded[key] = self.image_store.load_b64(ref)
+                except Exception as e:
+                    logger.error(f"Image store miss for {ref.get('sha256', '?')[:12]}: {e}")
+            return loaded
+
+        refs = {pos: messages[pos[0]]["content"][pos[1]]["image_ref"] for pos in expand}
+        loaded = await asyncio.to_thread(_load, refs) if refs else {}
+
+        out = list(messages)
+        for mi in sorted({mi for mi, _ in positions}):
+            new_content = []
+            for pi, p in enumerate(messages[mi]["content"]):
+                if not (isinstance(p, dict) and p.get("type") == "image_ref"):
+                    new_content.append(p)
+                elif (mi, pi) in loaded:
+                    ref = p["image_ref"]
+                    new_content.append({
+                        "type": "image_url",
+                        "image_url": {"url": f"data:{ref.get('mime', 'image/jpeg')};base64,{loaded[(mi, pi)]}"}
+                    })
+                else:
+                    new_content.append({"type": "text", "text": "[Image pruned for memory savings]"})
+            out[mi] = dict(messages[mi], content=new_content)
+        return out
+
     async def _call_llm(self, messages, active_tools=None):
         """
         Consolidated routing method for multi-turn conversations.
@@ -4509,6 +4885,7 @@ class GalacticGateway:
 
         # 4. Context-window trimming (Universal)
         messages = await self._trim_messages(messages)
+        messages = await self._expand_image_refs(messages)
 
         # Snapshot original state to restore in finally block
         orig_provider = getattr(self.llm, 'provider', 'google')
@@ -5147,6 +5524,18 @@ class GalacticGateway:
         except Exception as e:
             return f"[ERROR] {self.llm.provider}: {str(e)}"
 
+    def _new_stream_coalescer(self):
+        """StreamCoalescer for the current session, tuned by models.stream_flush_ms / stream_flush_bytes."""
+        models_cfg = self.core.config.get('models', {})
+        return StreamCoalescer(
+            self.core.relay,
+            session_id=self._trace_sid or "MAIN",
+            flush_ms=models_cfg.get('stream_flush_ms', 40),
+            flush_bytes=models_cfg.get('stream_flush_bytes', 512),
+            stats=self.stream_stats,
+            sink=self._session_stream_sink.get(),
+        )
+
     async def _call_openai_compatible_streaming(self, prompt, context, url, headers, active_tools=None):
         """Streaming variant - returns full text but streams internally for real-time web UI updates."""
         payload = {
@@ -5175,7 +5564,7 @@ class GalacticGateway:
         try:
             async with httpx.AsyncClient(timeout=120.0, verify=False) as client:
                 async with client.stream("POST", url, headers=headers, json=payload) as response:
-                    token_buf = []
+                    streamer = self._new_stream_coalescer()
                     _suppress_stream = False
                     async for line in response.aiter_lines():
                         if not line.startswith("data: "):
@@ -5195,14 +5584,10 @@ class GalacticGateway:
                                     _suppress_stream = True
 
                                 if not _suppress_stream:
-                                    token_buf.append(delta)
-                                    if len(token_buf) >= 8:
-                                        await self.core.relay.emit(3, "stream_chunk", "".join(token_buf))
-                                        token_buf = []
+                                    await streamer.push(delta)
                         except json.JSONDecodeError:
                             continue
-                    if token_buf:
-                        await self.core.relay.emit(3, "stream_chunk", "".join(token_buf))
+                    await streamer.close()
             res = "".join(full_response)
             if not res.strip():
                 return f"[ERROR] {self.llm.provider}: empty stream content"
@@ -5234,6 +5619,140 @@ class GalacticGateway:
             pass  # Non-fatal — fall back to estimated cost
         return None
 
+    OLLAMA_CTX_BUCKETS = (4096, 8192, 16384, 32768, 65536, 131072)
+
+    async def _size_ollama_num_ctx(self, payload, ceiling, ollama_mgr=None):
+        """
+        Pick num_ctx for one Ollama request: measured prompt + expected output,
+        rounded up to a bucket and capped at the configured / discovered window.
+
+        A different num_ctx forces Ollama to reload the model, so a resident
+        model keeps its current size whenever the request still fits in it.
+        Returns None when sizing is disabled (the fixed ceiling is sent as-is).
+        """
+        models_cfg = self.core.config.get('models', {})
+        if not ceiling or not models_cfg.get('ollama_dynamic_ctx', True):
+            return None
+        model = self.llm.model
+        cap = int(ceiling)
+        discovered = ollama_mgr.get_context_window(model, default=0) if ollama_mgr else 0
+        if discovered:
+            cap = min(cap, int(discovered))
+
+        # Measure: message text + tool-call args + tool schemas (+ a flat cost per image)
+        chars = 0
+        images = 0
+        for m in payload.get("messages", []):
+            chars += len(m.get("content") or "") + 16
+            if m.get("tool_calls"):
+                chars += len(json.dumps(m["tool_calls"]))
+            images += len(m.get("images") or [])
+        if payload.get("tools"):
+            chars += len(json.dumps(payload["tools"]))
+        cpt = self._ollama_chars_per_token.get(model, 3.0)   # conservative until calibrated
+        prompt_tokens = int(chars / cpt) + images * 768
+        thinking = bool(payload.get("options", {}).get("think"))
+        reserve = int(self._get_max_tokens() or (4096 if thinking else 2048))
+        needed = max(prompt_tokens + reserve, self._ollama_num_ctx_floor.get(model, 0))
+
+        buckets = models_cfg.get('ollama_ctx_buckets') or self.OLLAMA_CTX_BUCKETS
+        bucket = next((int(b) for b in sorted(buckets) if int(b) >= needed), cap)
+        num_ctx = min(bucket, cap)
+        reason = "bucket"
+
+        # Reuse the size the model is loaded with when the request fits (no reload)
+        loaded_ctx = None
+        if ollama_mgr is not None:
+            resident = ollama_mgr.resident.get(ollama_mgr._canonical(model))
+            if resident is not None:
+                loaded_ctx = self._ollama_num_ctx_last.get(model) or resident.get("context_length")
+        else:
+            loaded_ctx = self._ollama_num_ctx_last.get(model)
+        if loaded_ctx and needed <= int(loaded_ctx) <= cap:
+            num_ctx, reason = int(loaded_ctx), "reuse"
+        elif loaded_ctx and int(loaded_ctx) != num_ctx:
+            reason = "reload"
+        if needed > cap:
+            reason = "capped"
+
+        self._ollama_num_ctx_last[model] = num_ctx
+        await self.core.log(
+            f"🔧 Ollama num_ctx={num_ctx} ({reason}; prompt≈{prompt_tokens} + out {reserve} tok, "
+            f"cap {cap}, model={model})",
+            priority=1
+        )
+        return {"num_ctx": num_ctx, "reason": reason, "prompt_chars": chars,
+                "prompt_tokens": prompt_tokens, "reserve": reserve, "cap": cap, "model": model}
+
+    def ollama_warm_num_ctx(self, model):
+        """
+        num_ctx for OllamaManager.warm(), so the first real request doesn't reload the
+        model at a different size: the size last chosen for it, else the smallest bucket
+        that fits the tool schemas plus the output reserve.
+        """
+        models_cfg = self.core.config.get('models', {})
+        ceiling = int(models_cfg.get('context_window') or 0)
+        if not models_cfg.get('ollama_dynamic_ctx', True):
+            return ceiling or None
+        bare = model[:-len(":latest")] if model.endswith(":latest") else model
+        last = self._ollama_num_ctx_last.get(model) or self._ollama_num_ctx_last.get(bare)
+        if last:
+            return int(last)
+
+        schemas = [{"name": name, "description": spec.get("description", ""),
+                    "parameters": spec.get("parameters", {})} for name, spec in self.tools.items()]
+        cpt = self._ollama_chars_per_token.get(bare, 3.0)
+        thinking = str(getattr(self, 'thinking_level', 'low') or 'off').lower() != 'off'
+        needed = int(len(json.dumps(schemas)) / cpt) + int(self._get_max_tokens() or (4096 if thinking else 2048))
+        ollama_mgr = getattr(self.core, 'ollama_manager', None)
+        cap = ceiling or self.OLLAMA_CTX_BUCKETS[-1]
+        discovered = ollama_mgr.get_context_window(model, default=0) if ollama_mgr else 0
+        if discovered:
+            cap = min(cap, int(discovered))
+        buckets = models_cfg.get('ollama_ctx_buckets') or self.OLLAMA_CTX_BUCKETS
+        return min(next((int(b) for b in sorted(buckets) if int(b) >= needed), cap), cap)
+
+    async def _note_ollama_timings(self, ctx_info, final):
+        """Log what the chosen num_ctx cost (load / prompt eval / generation) and calibrate chars/token."""
+        if not ctx_info:
+            return
+        ns = 1e9
+        load_s = (final.get('load_duration') or 0) / ns
+        prompt_n = final.get('prompt_eval_count') or 0
+        prompt_s = (final.get('prompt_eval_duration') or 0) / ns
+        gen_n = final.get('eval_count') or 0
+        gen_s = (final.get('eval_duration') or 0) / ns
+        await self.core.log(
+            f"⏱️ Ollama num_ctx={ctx_info['num_ctx']} ({ctx_info['reason']}): load {load_s:.2f}s, "
+            f"prompt {prompt_n} tok in {prompt_s:.2f}s (est {ctx_info['prompt_tokens']}), "
+            f"gen {gen_n} tok in {gen_s:.2f}s",
+            priority=1
+        )
+        model = ctx_info['model']
+        num_ctx = int(ctx_info['num_ctx'])
+        if prompt_n and prompt_n >= num_ctx - ctx_info.get('reserve', 0):
+            # Prompt filled the window, so Ollama most likely cut it: prompt_n is only what
+            # fit (useless for calibration) and the next request needs the next bucket up
+            buckets = self.core.config.get('models', {}).get('ollama_ctx_buckets') or self.OLLAMA_CTX_BUCKETS
+            bigger = next((int(b) for b in sorted(buckets) if int(b) > num_ctx), None)
+            cap = ctx_info.get('cap') or num_ctx
+            if bigger and num_ctx < cap:
+                self._ollama_num_ctx_floor[model] = min(bigger, cap)
+                await self.core.log(f"⚠️ Ollama prompt filled num_ctx={num_ctx} ({prompt_n} tok) — "
+                                    f"using ≥{min(bigger, cap)} for {model} from now on", priority=1)
+            else:
+                await self.core.log(f"⚠️ Ollama prompt filled num_ctx={num_ctx} ({prompt_n} tok) at the "
+                                    f"cap for {model}; older context was likely truncated", priority=1)
+            return
+        # A prompt served mostly from the KV cache reports only the new tokens — skip those
+        est_at_default = ctx_info['prompt_chars'] / 4
+        if prompt_n and prompt_n >= 0.5 * est_at_default:
+            measured = max(1.0, min(5.0, ctx_info['prompt_chars'] / prompt_n))
+            prev = self._ollama_chars_per_token.get(model)
+            # Stay a little conservative: underestimating the prompt truncates it
+            measured *= 0.9
+            self._ollama_chars_per_token[model] = measured if prev is None else round(0.7 * prev + 0.3 * measured, 3)
+
     async def _call_ollama_native_messages(self, messages, active_tools=None):
         """
         Call Ollama using the native /api/chat endpoint (NOT the OpenAI-compatible one).
@@ -5271,9 +5790,9 @@ class GalacticGateway:
         elif self.core.config.get('models', {}).get('context_window'):
             ollama_opts["num_ctx"] = int(self.core.config['models']['context_window'])
             
-        if ollama_opts.get("num_ctx"):
-            await self.core.log(f"🔧 Ollama num_ctx={ollama_opts['num_ctx']}", priority=1)
-            
+        # ollama_opts["num_ctx"] is now the ceiling; each request is sized below it
+        ollama_mgr = getattr(self.core, 'ollama_manager', None)
+
         think_lvl = self._get_model_override('thinking_level')
         if not think_lvl:
              think_lvl = getattr(self, 'thinking_level', 'low')
@@ -5465,6 +5984,14 @@ class GalacticGateway:
                         for name, spec in active_tools.items()
                     ]
 
+            # Size num_ctx for this request; keep_alive from the local usage mix
+            ctx_info = await self._size_ollama_num_ctx(payload, ollama_opts.get("num_ctx"), ollama_mgr)
+            if ctx_info:
+                payload["options"] = {**ollama_opts, "num_ctx": ctx_info["num_ctx"]}
+            if ollama_mgr:
+                ollama_mgr.note_request(self.llm.model)
+                payload["keep_alive"] = ollama_mgr.keep_alive_for(self.llm.model)
+
             if not use_streaming:
                 # ── Non-streaming path ──
                 try:
@@ -5482,6 +6009,7 @@ class GalacticGateway:
                                 continue
                             return f"[ERROR] ollama HTTP {resp.status_code}: {resp.text[:500]}"
                         data = resp.json()
+                        await self._note_ollama_timings(ctx_info, data)
                         msg = data.get('message', {})
                         content = (msg.get('content') or '').strip()
                         if not content and msg.get('tool_calls') is not None:
@@ -5518,7 +6046,7 @@ class GalacticGateway:
                                 continue
                             return f"[ERROR] ollama HTTP {response.status_code}: {body_text[:500]}"
                         
-                        token_buf = []
+                        streamer = self._new_stream_coalescer()
                         _tc_accumulators = {}
                         _suppress_stream = False
                         
@@ -5558,18 +6086,15 @@ class GalacticGateway:
                                     _suppress_stream = True
 
                                 if not _suppress_stream:
-                                    token_buf.append(delta)
-                                    if len(token_buf) >= 8:
-                                        await self.core.relay.emit(3, "stream_chunk", "".join(token_buf))
-                                        token_buf = []
+                                    await streamer.push(delta)
                             
                             # Check if done
                             if chunk.get('done'):
+                                await self._note_ollama_timings(ctx_info, chunk)
                                 break
                         
                         # Flush remaining buffer
-                        if token_buf:
-                            await self.core.relay.emit(3, "stream_chunk", "".join(token_buf))
+                        await streamer.close()
                         
                         # Handle accumulated tool calls
                         if _tc_accumulators:
@@ -5838,7 +6363,7 @@ class GalacticGateway:
                             except Exception:
                                 err_msg = body.decode('utf-8', errors='replace')[:500]
                             return f"[ERROR] {provider} HTTP {response.status_code}: {err_msg}"
-                        token_buf = []
+                        streamer = self._new_stream_coalescer()
                         # Accumulator for streamed native tool_calls (arguments arrive
                         # incrementally across multiple chunks)
                         _tc_accumulators = {} # index -> {'name': str, 'args': list}
@@ -5901,12 +6426,8 @@ class GalacticGateway:
 
                                 if delta:
                                     full_response.append(delta)
-                                    token_buf.append(delta)
-                                    # Batch emit every 8 tokens to reduce event loop pressure
-                                    if len(token_buf) >= 8:
-                                        await self.core.relay.emit(3, "stream_chunk", "".join(token_buf))
-                                        token_buf = []
-                                        await asyncio.sleep(0)  # yield to other tasks (typing, etc.)
+                                    # Coalesced by time/size window to keep relay load predictable
+                                    await streamer.push(delta)
 
                                 # Capture usage from final streaming chunk (OpenAI/OpenRouter)
                                 usage = chunk.get('usage')
@@ -5921,8 +6442,7 @@ class GalacticGateway:
                             except json.JSONDecodeError:
                                 continue
                         # Flush remaining buffer
-                        if token_buf:
-                            await self.core.relay.emit(3, "stream_chunk", "".join(token_buf))
+                        await streamer.close()
                             
                         # ── Flush accumulated native tool_calls ──
                         if _tc_accumulators:
@@ -7221,6 +7741,10 @@ $notify.Dispose()
         timeout = min(int(args.get('timeout', 60)), 300)
         if not code.strip():
             return "❌ Error: No code provided."
+
+        warm = getattr(self.core, 'warm_sessions', None)
+        if warm and warm.wants('python', args.get('persistent')):
+            return await self._execute_python_warm(warm, code, timeout)
         
         import tempfile
         tmp = None
@@ -7235,19 +7759,16 @@ $notify.Dispose()
                 stderr=asyncio.subprocess.PIPE,
             )
             
-            try:
-                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
-            except asyncio.TimeoutError:
-                proc.kill()
-                await proc.wait()
+            # Capping logic: first/last 2000 bytes per stream, read incrementally
+            stdout, stderr, _, timed_out = await capture_process(
+                proc, timeout, relay=self.core.relay, tool="execute_python",
+                head_bytes=2000, tail_bytes=2000,
+            )
+            if timed_out:
                 return f"⏱️ Timeout: Python script exceeded {timeout}s and was terminated."
 
-            out = stdout.decode('utf-8', errors='replace').strip()
-            err = stderr.decode('utf-8', errors='replace').strip()
-            
-            # Capping logic: 4000 chars per stream to protect context
-            if len(out) > 4000: out = out[:2000] + "\n...[STDOUT TRUNCATED]...\n" + out[-2000:]
-            if len(err) > 4000: err = err[:2000] + "\n...[STDERR TRUNCATED]...\n" + err[-2000:]
+            out = stdout.text("STDOUT")
+            err = stderr.text("STDERR")
             
             result_parts = []
             if err:
@@ -7267,6 +7788,30 @@ $notify.Dispose()
                 try: os.unlink(tmp.name)
                 except: pass
 
+    async def _execute_python_warm(self, warm, code, timeout):
+        """Run a cell in the session's persistent kernel (state survives between calls)."""
+        try:
+            output, status, timed_out, restarted = await warm.run_python(code, timeout, relay=self.core.relay)
+        except Exception as e:
+            return f"❌ Error executing Python: {str(e)}"
+
+        out = output.text("OUTPUT")
+        result_parts = []
+        if restarted:
+            result_parts.append("ℹ️ Started a fresh warm Python session.")
+        if timed_out:
+            if status.get('interrupted'):
+                result_parts.append(f"⏱️ Timeout: cell exceeded {timeout}s and was interrupted (session state kept).")
+            else:
+                result_parts.append(f"⏱️ Timeout: cell exceeded {timeout}s; the kernel was killed and its state discarded.")
+        elif status.get('error'):
+            result_parts.append(f"❌ ERROR:\n{status['error'].strip()}")
+        if out:
+            result_parts.append(f"✅ OUTPUT:\n{out}")
+        if status.get('exited') and not timed_out:
+            result_parts.append(f"⚠️ Kernel exited (code {status.get('exit_code')}); the next call starts a fresh session.")
+        return "\n\n".join(result_parts) if result_parts else "✅ Cell completed with no output."
+
     async def tool_wait(self, args):
         """Pause execution."""
         seconds = min(float(args.get('seconds', 1)), 300)
@@ -7302,47 +7847,10 @@ $notify.Dispose()
         if not path or not os.path.exists(path):
             return f"[ERROR] File not found: {path}"
         try:
-            try:
-                import pdfplumber
-                with pdfplumber.open(path) as pdf:
-                    total = len(pdf.pages)
-                    page_range = self._parse_page_range(pages_arg, total)
-                    texts = []
-                    for i in page_range:
-                        page = pdf.pages[i]
-                        text = page.extract_text()
-                        if text:
-                            texts.append(f"--- Page {i+1} ---\n{text}")
-                    return "\n\n".join(texts) if texts else "[INFO] No text content found in PDF."
-            except ImportError:
-                pass
-            try:
-                import PyPDF2
-                reader = PyPDF2.PdfReader(path)
-                total = len(reader.pages)
-                page_range = self._parse_page_range(pages_arg, total)
-                texts = []
-                for i in page_range:
-                    text = reader.pages[i].extract_text()
-                    if text:
-                        texts.append(f"--- Page {i+1} ---\n{text}")
-                return "\n\n".join(texts) if texts else "[INFO] No text content found in PDF."
-            except ImportError:
-                return "[ERROR] Install pdfplumber or PyPDF2: pip install pdfplumber"
+            return await self._cpu_task('read_pdf_text', path, pages_arg)
         except Exception as e:
             return f"[ERROR] read_pdf: {e}"
 
-    def _parse_page_range(self, spec, total):
-        """Parse page range like '1-5', '3', 'all'."""
-        if not spec or spec.lower() == 'all':
-            return range(total)
-        if '-' in spec:
-            parts = spec.split('-')
-            start = max(0, int(parts[0]) - 1)
-            end = min(total, int(parts[1]))
-            return range(start, end)
-        return [int(spec) - 1]
-
     async def tool_read_csv(self, args):
         """Read a CSV file (non-blocking)."""
         import csv as _csv
@@ -7393,23 +7901,9 @@ $notify.Dispose()
         path = args.get('path', ''); sheet = args.get('sheet', None); limit = int(args.get('limit', 100))
         if not path or not os.path.exists(path): return f"[ERROR] File not found: {path}"
 
-        def _excel_sync():
-            try:
-                import openpyxl
-                wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
-                ws = wb[sheet] if sheet and sheet in wb.sheetnames else wb.active
-                rows = list(ws.iter_rows(values_only=True))
-                if not rows: return "[INFO] Empty spreadsheet."
-                headers = [str(h) if h else f"col_{i}" for i, h in enumerate(rows[0])]
-                data = []
-                for row in rows[1:limit+1]:
-                    data.append({headers[i]: (str(v) if v is not None else '') for i, v in enumerate(row)})
-                snames = wb.sheetnames; wb.close()
-                return json.dumps({"sheets": snames, "columns": headers, "rows": data, "total_rows": len(data)}, indent=2)
-            except Exception as e: return f"[ERROR] excel_sync: {e}"
-
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, _excel_sync)
+        try:
+            return await self._cpu_task('read_excel_rows', path, sheet, limit)
+        except Exception as e: return f"[ERROR] excel_sync: {e}"
 
     async def tool_regex_search(self, args):
         """Search files with regex (non-blocking)."""
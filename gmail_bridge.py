@@ -1,21 +1,144 @@
 # Galactic AI - Gmail Bridge
 # IMAP/SMTP integration for reading and sending email via Gmail App Passwords
+#
+# New mail is pushed over a second connection parked in IMAP IDLE; the main
+# connection then syncs incrementally by UID (skipping the search entirely
+# when STATUS shows no new UIDs / unchanged HIGHESTMODSEQ). Only headers and
+# a size-capped preview are fetched for notifications; full bodies and
+# attachments are pulled on demand by the read/save tools. The last synced
+# UID survives restarts in <paths.logs>/gmail_state.json.
 import asyncio
 import email
 import email.header
 import email.utils
 import imaplib
+import re
 import smtplib
 import ssl
 import json
 import os
 import time
 import traceback
+from collections import deque
 from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 
+def _imap_quote(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+class _IdleWatcher:
+    """Async IMAP connection parked in IDLE on INBOX; sets `wake` when the mailbox changes.
+
+    Kept separate from the imaplib connection used for fetching, so a sync
+    never has to break the IDLE. The IDLE is re-issued every `refresh`
+    seconds (Gmail drops idlers after ~10 minutes of silence).
+    """
+
+    def __init__(self, bridge, wake: asyncio.Event, refresh: int = 540):
+        self.bridge = bridge
+        self.wake = wake
+        self.refresh = refresh
+        self.supported = None   # None until the server's CAPABILITY has been seen
+        self.connected = False
+        self.pushes = 0
+        self._tag = 0
+        self._reader = None
+        self._writer = None
+
+    async def _cmd(self, line: str):
+        self._tag += 1
+        tag = f"g{self._tag}"
+        self._writer.write(f"{tag} {line}\r\n".encode())
+        await self._writer.drain()
+        return tag
+
+    async def _until_tagged(self, tag: str, timeout: float = 30) -> list[str]:
+        lines = []
+        while True:
+            raw = await asyncio.wait_for(self._reader.readline(), timeout=timeout)
+            if not raw:
+                raise ConnectionError("IMAP connection closed")
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            if line.startswith(tag + " "):
+                if not line[len(tag) + 1:].upper().startswith("OK"):
+                    raise RuntimeError(line)
+                return lines
+            lines.append(line)
+
+    async def _connect(self):
+        b = self.bridge
+        ctx = ssl.create_default_context() if b.imap_ssl else None
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(b.imap_host, b.imap_port, ssl=ctx), timeout=30)
+        await asyncio.wait_for(self._reader.readline(), timeout=30)  # greeting
+        await self._until_tagged(await self._cmd(f"LOGIN {_imap_quote(b.email_address)} {_imap_quote(b.app_password)}"))
+        caps = " ".join(await self._until_tagged(await self._cmd("CAPABILITY"))).upper().split()
+        self.supported = "IDLE" in caps
+        if self.supported:
+            await self._until_tagged(await self._cmd("EXAMINE INBOX"))
+        self.connected = True
+
+    async def _idle_once(self):
+        """One IDLE round: returns after `refresh` seconds, waking the bridge on any change."""
+        tag = await self._cmd("IDLE")
+        first = await asyncio.wait_for(self._reader.readline(), timeout=30)
+        if not first.startswith(b"+"):
+            raise RuntimeError(f"IDLE refused: {first!r}")
+        deadline = time.monotonic() + self.refresh
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                raw = await asyncio.wait_for(self._reader.readline(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if not raw:
+                raise ConnectionError("IMAP connection closed during IDLE")
+            line = raw.decode(errors="replace").upper()
+            if line.startswith("* ") and (" EXISTS" in line or " RECENT" in line or " FETCH" in line):
+                self.pushes += 1
+                self.wake.set()
+        self._writer.write(b"DONE\r\n")
+        await self._writer.drain()
+        await self._until_tagged(tag)
+
+    async def close(self):
+        self.connected = False
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+            self._writer = None
+
+    async def run(self):
+        backoff = 5
+        while self.bridge.running and self.bridge.core.running:
+            try:
+                await self._connect()
+                if not self.supported:
+                    await self.bridge._log("[Gmail] Server has no IDLE -- staying on interval polling", priority=2)
+                    await self.close()
+                    return
+                backoff = 5
+                # Catch anything that arrived while we were (re)connecting
+                self.wake.set()
+                while self.bridge.running and self.bridge.core.running:
+                    await self._idle_once()
+            except asyncio.CancelledError:
+                await self.close()
+                raise
+            except Exception as e:
+                await self.bridge._log(f"[Gmail] IDLE connection lost ({e}); retrying in {backoff}s", priority=2)
+            await self.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 300)
+
+
 class GmailBridge:
     """Gmail integration for Galactic AI -- polls inbox, sends email, searches messages."""
 
@@ -31,11 +154,26 @@ class GmailBridge:
         self.app_password = self.config.get('app_password', '')
         self.check_interval = int(self.config.get('check_interval', 60))
         self.notify_telegram = self.config.get('notify_telegram', True)
+        # Server overrides let the bridge run against a local IMAP stand-in
+        self.imap_host = self.config.get('imap_host', self.IMAP_HOST)
+        self.imap_port = int(self.config.get('imap_port', self.IMAP_PORT))
+        self.imap_ssl = bool(self.config.get('imap_ssl', True))
+        self.use_idle = bool(self.config.get('idle', True))
+        self.idle_safety_interval = int(self.config.get('idle_safety_interval', 600))
+        self.preview_bytes = int(self.config.get('preview_bytes', 4096))
         self.running = True
         self._seen_uids: set[str] = set()
-        self._imap: imaplib.IMAP4_SSL | None = None
+        self._seen_order: deque = deque(maxlen=2000)
+        self._imap: imaplib.IMAP4 | None = None
         self._last_connect_attempt = 0.0
         self._component = "Gmail"
+        logs_dir = core.config.get('paths', {}).get('logs', './logs')
+        self._state_path = os.path.join(logs_dir, 'gmail_state.json')
+        # INBOX sync cursor: uidvalidity, last_uid, highestmodseq
+        self._state = {"uidvalidity": None, "last_uid": None, "highestmodseq": None}
+        self._idle = None
+        self._state_error = None   # set by _load_state/_save_state (worker thread), logged by poll_loop
+        self.sync_stats = {"syncs": 0, "skipped_unchanged": 0, "fetched_previews": 0, "bytes_fetched": 0}
 
     async def _log(self, message, priority=3):
         """Route logs to the Gmail component log file."""
@@ -57,9 +195,15 @@ class GmailBridge:
                     pass
                 self._imap = None
 
-        ctx = ssl.create_default_context()
-        conn = imaplib.IMAP4_SSL(self.IMAP_HOST, self.IMAP_PORT, ssl_context=ctx)
+        if self.imap_ssl:
+            conn = imaplib.IMAP4_SSL(self.imap_host, self.imap_port, ssl_context=ssl.create_default_context())
+        else:
+            conn = imaplib.IMAP4(self.imap_host, self.imap_port)
         conn.login(self.email_address, self.app_password)
+        # The pre-login greeting under-reports: Gmail advertises CONDSTORE only after LOGIN
+        typ, dat = conn.capability()
+        if typ == "OK" and dat and dat[-1]:
+            conn.capabilities = tuple(dat[-1].decode(errors="replace").upper().split())
         self._imap = conn
         return conn
 
@@ -113,6 +257,31 @@ class GmailBridge:
                 return payload.decode(charset, errors='replace')
         return "[No readable body]"
 
+    @staticmethod
+    def _group_fetch(msg_data) -> list[dict]:
+        """Split an imaplib FETCH response into per-message {meta, HEADER, TEXT, BODY} dicts."""
+        messages = []
+        for part in msg_data or []:
+            if isinstance(part, tuple):
+                meta = part[0].decode(errors="replace")
+                if re.match(r"^\d+ \(", meta) or not messages:
+                    messages.append({"meta": ""})
+                cur = messages[-1]
+                cur["meta"] += " " + meta
+                section = re.search(r"BODY\[([A-Z.]*)\]", meta.upper())
+                key = section.group(1) if section else "BODY"
+                cur[key or "BODY"] = part[1]
+            elif isinstance(part, bytes) and messages:
+                messages[-1]["meta"] += " " + part.decode(errors="replace")
+        for m in messages:
+            uid = re.search(r"UID (\d+)", m["meta"])
+            size = re.search(r"RFC822\.SIZE (\d+)", m["meta"])
+            flags = re.search(r"FLAGS \(([^)]*)\)", m["meta"])
+            m["uid"] = uid.group(1) if uid else ""
+            m["size"] = int(size.group(1)) if size else None
+            m["flags"] = flags.group(1).split() if flags else []
+        return messages
+
     def _parse_message(self, msg_data: bytes, uid: str = "") -> dict:
         """Parse raw email bytes into a structured dict."""
         msg = email.message_from_bytes(msg_data)
@@ -146,37 +315,84 @@ class GmailBridge:
     # ── Core Features ─────────────────────────────────────────────────────
 
     async def check_inbox(self) -> list[dict]:
-        """Poll for new unread emails via IMAP. Returns list of new message dicts."""
+        """Sync INBOX since the last seen UID. Returns list of new unread message previews."""
         loop = asyncio.get_running_loop()
         return await loop.run_in_executor(None, self._check_inbox_sync)
 
+    def _status_inbox(self, conn) -> dict:
+        """STATUS INBOX -> {uidnext, uidvalidity, highestmodseq} (modseq only with CONDSTORE)."""
+        items = "UIDNEXT UIDVALIDITY"
+        if "CONDSTORE" in conn.capabilities:
+            items += " HIGHESTMODSEQ"
+        status, data = conn.status("INBOX", f"({items})")
+        if status != "OK" or not data or not data[0]:
+            raise RuntimeError(f"STATUS failed: {status}")
+        text = data[0].decode(errors="replace").upper()
+        out = {}
+        for key in ("UIDNEXT", "UIDVALIDITY", "HIGHESTMODSEQ"):
+            m = re.search(rf"{key} (\d+)", text)
+            out[key.lower()] = int(m.group(1)) if m else None
+        return out
+
     def _check_inbox_sync(self) -> list[dict]:
-        """Synchronous inbox check (run in executor to avoid blocking the event loop)."""
+        """Incremental UID sync (run in executor to avoid blocking the event loop)."""
         new_messages = []
         try:
             conn = self._imap_connect()
-            conn.select("INBOX")
-            status, data = conn.search(None, "UNSEEN")
-            if status != "OK":
+            st = self._status_inbox(conn)
+            self.sync_stats["syncs"] += 1
+
+            if self._state["uidvalidity"] != st["uidvalidity"] or self._state["last_uid"] is None:
+                # First run (or the mailbox was rebuilt): start from "now", don't re-notify history
+                self._state = {"uidvalidity": st["uidvalidity"], "last_uid": (st["uidnext"] or 1) - 1,
+                               "highestmodseq": st["highestmodseq"]}
+                self._save_state()
                 return []
 
-            uids = data[0].split()
-            for uid_bytes in uids:
-                uid = uid_bytes.decode()
-                if uid in self._seen_uids:
-                    continue
-
-                status, msg_data = conn.fetch(uid_bytes, "(RFC822)")
-                if status != "OK" or not msg_data or not msg_data[0]:
-                    continue
-
-                raw = msg_data[0][1] if isinstance(msg_data[0], tuple) else msg_data[0]
-                if not isinstance(raw, bytes):
-                    continue
+            last_uid = self._state["last_uid"]
+            no_new_uids = st["uidnext"] is not None and st["uidnext"] - 1 <= last_uid
+            if no_new_uids and (st["highestmodseq"] is None or st["highestmodseq"] == self._state["highestmodseq"]):
+                self.sync_stats["skipped_unchanged"] += 1
+                return []
 
-                parsed = self._parse_message(raw, uid=uid)
-                new_messages.append(parsed)
-                self._seen_uids.add(uid)
+            conn.select("INBOX", readonly=True)
+            status, data = conn.uid("SEARCH", None, f"UID {last_uid + 1}:*")
+            if status != "OK":
+                return []
+            found = [u.decode() for u in (data[0] or b"").split() if int(u) > last_uid]
+            uids = [u for u in found if u not in self._seen_uids]
+            done = set()
+
+            if uids:
+                # Headers + a capped slice of the body only; full bodies are fetched on demand
+                status, msg_data = conn.uid(
+                    "FETCH", ",".join(uids),
+                    f"(UID FLAGS RFC822.SIZE BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.{self.preview_bytes}>)",
+                )
+                if status == "OK":
+                    for item in self._group_fetch(msg_data):
+                        if not item["uid"]:
+                            continue
+                        header, text = item.get("HEADER") or b"", item.get("TEXT") or b""
+                        self.sync_stats["fetched_previews"] += 1
+                        self.sync_stats["bytes_fetched"] += len(header) + len(text)
+                        if "\\Seen" not in item["flags"]:  # read elsewhere -- nothing to announce
+                            parsed = self._parse_message(header + text, uid=item["uid"])
+                            parsed["size"] = item["size"]
+                            parsed["partial"] = bool(item["size"] and item["size"] > len(header) + len(text))
+                            new_messages.append(parsed)
+                        self._mark_seen(item["uid"])
+                        done.add(item["uid"])
+
+            # Advance only past UIDs we actually got; a failed or missing FETCH item is retried
+            # next poll (later UIDs that did arrive are in _seen_uids and won't be re-announced)
+            missing = [int(u) for u in uids if u not in done]
+            if missing:
+                self._state["last_uid"] = max(last_uid, min(missing) - 1)
+            else:
+                self._state["last_uid"] = max([last_uid] + [int(u) for u in found])
+            self._state["highestmodseq"] = st["highestmodseq"]
+            self._save_state()
 
         except Exception as e:
             # Force reconnect on next poll
@@ -185,6 +401,36 @@ class GmailBridge:
 
         return new_messages
 
+    def _mark_seen(self, uid: str):
+        if uid in self._seen_uids:
+            return
+        if len(self._seen_order) == self._seen_order.maxlen:
+            self._seen_uids.discard(self._seen_order[0])
+        self._seen_order.append(uid)
+        self._seen_uids.add(uid)
+
+    def _load_state(self):
+        try:
+            with open(self._state_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self._state.update({k: saved.get(k) for k in self._state})
+            for uid in saved.get("seen_uids", []):
+                self._mark_seen(str(uid))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self._state_error = f"Could not read {self._state_path}: {e}"
+
+    def _save_state(self):
+        try:
+            os.makedirs(os.path.dirname(self._state_path) or ".", exist_ok=True)
+            tmp = self._state_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({**self._state, "seen_uids": list(self._seen_order)}, f)
+            os.replace(tmp, self._state_path)
+        except Exception as e:
+            self._state_error = f"Could not write {self._state_path}: {e}"
+
     async def send_email(self, to: str, subject: str, body: str, html: bool = False) -> str:
         """Send an email via SMTP with App Password authentication."""
         loop = asyncio.get_running_loop()
@@ -219,22 +465,63 @@ class GmailBridge:
         loop = asyncio.get_running_loop()
         return await loop.run_in_executor(None, self._read_email_sync, msg_uid)
 
+    def _fetch_full_sync(self, msg_uid: str, folder: str = "INBOX") -> bytes | None:
+        """Whole RFC822 message by UID (BODY.PEEK, so it is not marked read)."""
+        conn = self._imap_connect()
+        conn.select(folder, readonly=True)
+        status, msg_data = conn.uid("FETCH", msg_uid, "(BODY.PEEK[])")
+        if status != "OK":
+            return None
+        for item in self._group_fetch(msg_data):
+            raw = item.get("BODY")
+            if isinstance(raw, bytes):
+                return raw
+        return None
+
     def _read_email_sync(self, msg_uid: str) -> dict:
         """Synchronous single-message fetch."""
         try:
-            conn = self._imap_connect()
-            conn.select("INBOX")
-            status, msg_data = conn.fetch(msg_uid.encode(), "(RFC822)")
-            if status != "OK" or not msg_data or not msg_data[0]:
+            raw = self._fetch_full_sync(msg_uid)
+            if raw is None:
                 return {"error": f"Message UID {msg_uid} not found"}
-            raw = msg_data[0][1] if isinstance(msg_data[0], tuple) else msg_data[0]
-            if not isinstance(raw, bytes):
-                return {"error": "Could not read message data"}
             return self._parse_message(raw, uid=msg_uid)
         except Exception as e:
             self._imap = None
             return {"error": f"Failed to read email: {e}"}
 
+    async def save_attachment(self, msg_uid: str, filename: str = "") -> dict:
+        """Download attachments of one email into <workspace>/email_attachments."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._save_attachment_sync, msg_uid, filename)
+
+    def _save_attachment_sync(self, msg_uid: str, filename: str = "") -> dict:
+        try:
+            raw = self._fetch_full_sync(msg_uid)
+            if raw is None:
+                return {"error": f"Message UID {msg_uid} not found"}
+            workspace = self.core.config.get('paths', {}).get('workspace', '.')
+            out_dir = os.path.join(workspace, 'email_attachments', str(msg_uid))
+            saved = []
+            for part in email.message_from_bytes(raw).walk():
+                name = part.get_filename()
+                if not name:
+                    continue
+                name = os.path.basename(self._decode_header(name)) or "attachment"
+                if filename and name != filename:
+                    continue
+                payload = part.get_payload(decode=True) or b""
+                os.makedirs(out_dir, exist_ok=True)
+                path = os.path.join(out_dir, name)
+                with open(path, "wb") as f:
+                    f.write(payload)
+                saved.append({"filename": name, "path": path, "bytes": len(payload)})
+            if not saved:
+                return {"error": f"No attachment {'named ' + repr(filename) + ' ' if filename else ''}in UID {msg_uid}"}
+            return {"uid": msg_uid, "saved": saved}
+        except Exception as e:
+            self._imap = None
+            return {"error": f"Failed to save attachment: {e}"}
+
     async def search_emails(self, query: str, folder: str = "INBOX", limit: int = 20) -> list[dict]:
         """Search emails using IMAP search criteria.
 
@@ -265,7 +552,7 @@ class GmailBridge:
                 safe = query.replace('"', '\\"')
                 search_criteria = f'(OR SUBJECT "{safe}" FROM "{safe}")'
 
-            status, data = conn.search(None, search_criteria)
+            status, data = conn.uid("SEARCH", None, search_criteria)
             if status != "OK":
                 return [{"error": f"IMAP search failed: {status}"}]
 
@@ -277,7 +564,7 @@ class GmailBridge:
             for uid_bytes in uids:
                 uid = uid_bytes.decode()
                 # Fetch headers + a small preview (BODY.PEEK to avoid marking as read)
-                status, msg_data = conn.fetch(uid_bytes, "(BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.2000>)")
+                status, msg_data = conn.uid("FETCH", uid, "(BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.2000>)")
                 if status != "OK" or not msg_data:
                     continue
 
@@ -313,7 +600,7 @@ class GmailBridge:
         try:
             conn = self._imap_connect()
             conn.select(folder, readonly=True)
-            status, data = conn.search(None, "ALL")
+            status, data = conn.uid("SEARCH", None, "ALL")
             if status != "OK":
                 return [{"error": f"IMAP search failed: {status}"}]
 
@@ -323,7 +610,7 @@ class GmailBridge:
 
             for uid_bytes in uids:
                 uid = uid_bytes.decode()
-                status, msg_data = conn.fetch(uid_bytes, "(BODY.PEEK[HEADER])")
+                status, msg_data = conn.uid("FETCH", uid, "(BODY.PEEK[HEADER])")
                 if status != "OK" or not msg_data or not msg_data[0]:
                     continue
 
@@ -352,14 +639,16 @@ class GmailBridge:
     # ── Background Polling Loop ───────────────────────────────────────────
 
     async def poll_loop(self):
-        """Background loop that checks for new emails and dispatches notifications."""
-        await self._log("[Gmail] Bridge online -- polling inbox...", priority=1)
-
-        # Seed the seen set on startup so we don't re-notify old unreads
-        try:
-            await self._seed_seen_uids()
-        except Exception as e:
-            await self._log(f"[Gmail] Seed failed (will retry): {e}", priority=2)
+        """Background loop: sync on IDLE push (or every check_interval without IDLE) and notify."""
+        self._load_state()
+        wake = asyncio.Event()
+        if self.use_idle:
+            self._idle = _IdleWatcher(self, wake, refresh=int(self.config.get('idle_refresh', 540)))
+            idle_task = asyncio.create_task(self._idle.run())
+        else:
+            idle_task = None
+        await self._log(f"[Gmail] Bridge online -- {'IMAP IDLE push' if idle_task else 'polling'} "
+                        f"(last UID {self._state.get('last_uid')})...", priority=1)
 
         while self.running and self.core.running:
             try:
@@ -369,24 +658,31 @@ class GmailBridge:
             except Exception as e:
                 await self._log(f"[Gmail] Poll error: {e}", priority=2)
                 self._imap_disconnect()
+            if self._state_error:
+                error, self._state_error = self._state_error, None
+                await self._log(f"[Gmail] {error}", priority=2)
 
-            await asyncio.sleep(self.check_interval)
+            # While IDLE is live the interval is only a safety net
+            idle_live = self._idle is not None and self._idle.connected and self._idle.supported
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=self.idle_safety_interval if idle_live else self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
 
+        if idle_task is not None:
+            idle_task.cancel()
         self._imap_disconnect()
         await self._log("[Gmail] Bridge stopped.", priority=2)
 
-    async def _seed_seen_uids(self):
-        """Mark all current UNSEEN UIDs as 'seen' so we only notify on truly new arrivals."""
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._seed_seen_uids_sync)
-
-    def _seed_seen_uids_sync(self):
-        conn = self._imap_connect()
-        conn.select("INBOX")
-        status, data = conn.search(None, "UNSEEN")
-        if status == "OK" and data[0]:
-            for uid_bytes in data[0].split():
-                self._seen_uids.add(uid_bytes.decode())
+    def get_sync_status(self) -> dict:
+        return {
+            "idle": bool(self._idle and self._idle.connected and self._idle.supported),
+            "idle_pushes": self._idle.pushes if self._idle else 0,
+            "last_uid": self._state.get("last_uid"),
+            "highestmodseq": self._state.get("highestmodseq"),
+            **self.sync_stats,
+        }
 
     async def _on_new_email(self, msg: dict):
         """Handle a newly detected email -- log + notify."""
@@ -448,6 +744,15 @@ class GmailBridge:
             return f"[ERROR] {msg['error']}"
         return json.dumps(msg, indent=2, ensure_ascii=False)
 
+    async def tool_save_email_attachment(self, args: dict) -> str:
+        uid = args.get("uid", "")
+        if not uid:
+            return "[ERROR] 'uid' is required."
+        result = await self.save_attachment(str(uid), args.get("filename", ""))
+        if "error" in result:
+            return f"[ERROR] {result['error']}"
+        return json.dumps(result, indent=2, ensure_ascii=False)
+
     async def tool_search_emails(self, args: dict) -> str:
         query = args.get("query", "")
         folder = args.get("folder", "INBOX")
@@ -497,6 +802,18 @@ class GmailBridge:
                 },
                 "fn": self.tool_read_email
             },
+            "save_email_attachment": {
+                "description": "Download the attachments of an email (all, or one by filename) into the workspace's email_attachments folder. New-mail notifications only carry a preview; use this to pull attachments on demand.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "uid":      {"type": "string", "description": "Email UID"},
+                        "filename": {"type": "string", "description": "Only save the attachment with this name (default: all)"},
+                    },
+                    "required": ["uid"]
+                },
+                "fn": self.tool_save_email_attachment
+            },
             "search_emails": {
                 "description": "Search emails in Gmail. Accepts a simple text query (searches Subject and From) or raw IMAP syntax (e.g. 'FROM \"alice@example.com\"', 'SINCE \"01-Jan-2025\"', 'UNSEEN'). Returns matching messages with previews.",
                 "parameters": {
@@ -0,0 +1,380 @@
+"""
+Galactic AI — image helpers for uploads and vision requests.
+
+Everything here is synchronous and CPU/disk bound (base64 decode, hashing,
+Pillow resize). Async callers run these through asyncio.to_thread() so a
+large upload never stalls the event loop for other users.
+"""
+import base64
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional — images are passed through unscaled
+    Image = None
+
+# Longest edge (px) each vision provider actually uses. Anything larger is
+# downscaled by the provider anyway, so sending it only costs upload time.
+VISION_MAX_EDGE = {
+    'anthropic':  1568,
+    'openai':     2048,
+    'openrouter': 2048,
+    'xai':        2048,
+    'google':     3072,
+    'mistral':    1540,
+    'groq':       1024,
+    'nvidia':     1024,
+    'ollama':     1024,
+}
+DEFAULT_MAX_EDGE = 1568
+
+
+def max_edge_for(provider, override=None):
+    """Return the downscale target for a provider (config override wins)."""
+    if override:
+        return int(override)
+    return VISION_MAX_EDGE.get(provider, DEFAULT_MAX_EDGE)
+
+
+def safe_upload_name(name, mime, index=0):
+    """Filesystem-safe file name for an uploaded image."""
+    raw_name = name or f'image_{int(time.time())}_{index}'
+    safe_name = "".join([c for c in raw_name if c.isalnum() or c in ('.', '_', '-')]).strip()
+    if '.' not in safe_name:
+        ext = (mime or 'image/jpeg').split('/')[-1].replace('jpeg', 'jpg')
+        safe_name += f".{ext}"
+    return safe_name
+
+
+def downscale_image(raw, mime, max_edge):
+    """Shrink image bytes so the long side is at most max_edge.
+
+    Returns (bytes, mime). The input is returned unchanged when it is already
+    small enough, when Pillow is missing, or when it can't be decoded.
+    """
+    if Image is None or not max_edge:
+        return raw, mime
+    try:
+        with Image.open(io.BytesIO(raw)) as im:
+            if max(im.size) <= max_edge:
+                return raw, mime
+            im.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            out = io.BytesIO()
+            if im.mode in ('RGBA', 'LA', 'P'):
+                im.save(out, format='PNG', optimize=True)
+                return out.getvalue(), 'image/png'
+            im.convert('RGB').save(out, format='JPEG', quality=85)
+            return out.getvalue(), 'image/jpeg'
+    except Exception:
+        return raw, mime
+
+
+def prepare_image(img, upload_dir, max_edge, index=0):
+    """Decode, persist, hash and downscale one attached image (in place).
+
+    img is a {name, mime, b64} dict, or {name, mime, src_path} for uploads
+    already streamed to a temp file. The full-resolution original is saved
+    under upload_dir (img['path']) for tools that need the file; img['b64']
+    is replaced with the provider-sized version. Returns the saved path or None.
+    """
+    mime = img.get('mime', 'image/jpeg')
+    src_path = img.pop('src_path', None)
+    if src_path:
+        with open(src_path, 'rb') as f:
+            raw = f.read()
+        try:
+            os.remove(src_path)
+        except OSError:
+            pass
+    else:
+        raw = base64.b64decode(img['b64'])
+
+    img['sha256'] = hashlib.sha256(raw).hexdigest()
+    img['bytes'] = len(raw)
+
+    dest = None
+    if upload_dir:
+        os.makedirs(upload_dir, exist_ok=True)
+        dest = os.path.join(upload_dir, safe_upload_name(img.get('name'), mime, index))
+        with open(dest, 'wb') as f:
+            f.write(raw)
+        img['path'] = dest
+
+    scaled, scaled_mime = downscale_image(raw, mime, max_edge)
+    img['mime'] = scaled_mime
+    img['b64'] = base64.b64encode(scaled).decode('ascii')
+    return dest
+
+
+_MIME_EXT = {'image/jpeg': 'jpg', 'image/png': 'png', 'image/gif': 'gif', 'image/webp': 'webp'}
+
+
+class ImageStore:
+    """Content-addressed image files shared by uploads and tool screenshots.
+
+    Each distinct image is written once as <root>/<sha256>.<ext>; identical
+    screenshots resolve to the same file. Message history keeps only an
+    image_ref part ({"sha256", "mime", "path"}) and the gateway expands refs
+    back into base64 data URLs at send time. All methods are blocking — call
+    them via asyncio.to_thread().
+
+    Files untouched for max_age_days are removed at startup, and whenever the
+    store grows past max_mb the least recently used files are removed until it
+    is back under 90% of that. A history ref whose file is gone is simply not
+    expanded.
+    """
+
+    def __init__(self, root, cache_size=8, max_age_days=30, max_mb=1024):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+        self.cache_size = cache_size
+        self.max_age_days = max_age_days
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else 0
+        self._cache = OrderedDict()  # sha256 -> b64, most recently expanded last
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.stats = {'stored': 0, 'dedup_hits': 0, 'cache_hits': 0, 'evicted': 0}
+        self.gc(max_age_days=max_age_days)
+
+    def path_for(self, sha256, mime):
+        return os.path.join(self.root, f"{sha256}.{_MIME_EXT.get(mime, 'img')}")
+
+    def put_bytes(self, raw, mime='image/jpeg'):
+        """Store raw image bytes (once) and return their reference dict."""
+        sha256 = hashlib.sha256(raw).hexdigest()
+        path = self.path_for(sha256, mime)
+        with self._lock:
+            if os.path.exists(path):
+                self.stats['dedup_hits'] += 1
+                self._touch(path)
+            else:
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(raw)
+                os.replace(tmp_path, path)
+                self.stats['stored'] += 1
+                self._bytes += len(raw)
+            over = self.max_bytes and self._bytes > self.max_bytes
+        if over:
+            self.gc()
+        return {'sha256': sha256, 'mime': mime, 'path': path, 'bytes': len(raw)}
+
+    def put_b64(self, b64, mime='image/jpeg'):
+        """Store a base64 string or data: URL and return its reference dict."""
+        if b64.startswith('data:') and ',' in b64:
+            header, b64 = b64.split(',', 1)
+            mime = header[5:].split(';', 1)[0] or mime
+        ref = self.put_bytes(base64.b64decode(b64), mime)
+        self._remember(ref['sha256'], b64)
+        return ref
+
+    def load_b64(self, ref):
+        """Return the base64 payload for a reference (small LRU in front of the disk)."""
+        sha256 = ref['sha256']
+        with self._lock:
+            if sha256 in self._cache:
+                self._cache.move_to_end(sha256)
+                self.stats['cache_hits'] += 1
+                return self._cache[sha256]
+        path = ref.get('path') or self.path_for(sha256, ref.get('mime'))
+        with open(path, 'rb') as f:
+            b64 = base64.b64encode(f.read()).decode('ascii')
+        self._touch(path)
+        self._remember(sha256, b64)
+        return b64
+
+    @staticmethod
+    def _touch(path):
+        # mtime is the last-used time GC goes by
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def gc(self, max_age_days=None):
+        """Remove files older than max_age_days, then least recently used files
+        until the store is under 90% of max_bytes. Returns the number removed."""
+        with self._lock:
+            files = []
+            for entry in os.scandir(self.root):
+                try:
+                    if entry.is_file():
+                        st = entry.stat()
+                        files.append((st.st_mtime, st.st_size, entry.path))
+                except OSError:
+                    pass
+            files.sort()
+            total = sum(size for _, size, _ in files)
+            cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+            target = int(self.max_bytes * 0.9) if self.max_bytes and total > self.max_bytes else None
+            removed = 0
+            for mtime, size, path in files:
+                if not ((cutoff and mtime < cutoff) or (target is not None and total > target)):
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except OSError:
+                    pass
+            self._bytes = total
+            self.stats['evicted'] += removed
+            return removed
+
+    def _remember(self, sha256, b64):
+        with self._lock:
+            self._cache[sha256] = b64
+            self._cache.move_to_end(sha256)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+def dhash(im, size=16):
+    """size*size-bit difference hash of a PIL image — equal/near-equal frames hash close."""
+    small = im.convert('L').resize((size + 1, size), Image.BILINEAR)
+    px = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = px[row * (size + 1) + col]
+            bits = (bits << 1) | (left > px[row * (size + 1) + col + 1])
+    return bits
+
+
+def _gif_image_block(gif_bytes):
+    """Pull the image descriptor + colour table + LZW data out of a single-frame GIF.
+
+    A global colour table is moved into the descriptor as a local one, so every
+    frame carries its own palette and can be appended to any GIF stream.
+    """
+    packed = gif_bytes[10]
+    pos = 13
+    gct = b''
+    if packed & 0x80:
+        gct_len = 3 * (2 ** ((packed & 0x07) + 1))
+        gct = gif_bytes[pos:pos + gct_len]
+        pos += gct_len
+        gct_bits = packed & 0x07
+    while pos < len(gif_bytes):
+        block = gif_bytes[pos]
+        if block == 0x21:  # extension: skip label + sub-blocks
+            pos += 2
+            while gif_bytes[pos]:
+                pos += gif_bytes[pos] + 1
+            pos += 1
+        elif block == 0x2C:
+            desc = bytearray(gif_bytes[pos:pos + 10])
+            pos += 10
+            local = b''
+            if desc[9] & 0x80:
+                local_len = 3 * (2 ** ((desc[9] & 0x07) + 1))
+                local = gif_bytes[pos:pos + local_len]
+                pos += local_len
+            elif gct:
+                desc[9] = (desc[9] & 0x78) | 0x80 | gct_bits
+                local = gct
+            start = pos
+            pos += 1  # LZW minimum code size
+            while gif_bytes[pos]:
+                pos += gif_bytes[pos] + 1
+            pos += 1
+            return bytes(desc) + local + gif_bytes[start:pos]
+        else:
+            break
+    raise ValueError('no image block in GIF data')
+
+
+class GifStreamWriter:
+    """Animated GIF encoded frame-by-frame straight to disk.
+
+    Each frame is downscaled to max_edge, quantized and LZW-encoded as it
+    arrives, so memory stays flat however long a recording runs. A frame whose
+    perceptual hash is within dedup_distance of the previous kept frame is
+    dropped and the previous frame is held longer instead. Frame delays are
+    patched in place by finish() once the playback speed is known.
+    Blocking — call add_frame()/finish() via asyncio.to_thread(). The calls are
+    serialized, and add_frame() after finish()/abort() is a no-op.
+    """
+
+    def __init__(self, path, max_edge=960, dedup_distance=0):
+        if Image is None:
+            raise RuntimeError('Pillow not installed. Run: pip install Pillow')
+        self.path = path
+        self.max_edge = max_edge
+        self.dedup_distance = dedup_distance
+        self.size = None
+        self.frames = 0          # frames written
+        self.dropped = 0         # duplicate frames skipped
+        self.bytes_in = 0
+        self._holds = []         # per written frame: [delay field offset, captures held]
+        self._last_hash = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._fp = open(path, 'wb')
+
+    def _write_header(self, width, height):
+        self._fp.write(b'GIF89a' + width.to_bytes(2, 'little') + height.to_bytes(2, 'little') + b'\x00\x00\x00')
+        # NETSCAPE2.0 application extension: loop forever
+        self._fp.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+    def add_frame(self, raw):
+        """Encode one captured frame (any Pillow-readable bytes). Returns True if kept."""
+        with self._lock:
+            if self._closed:
+                return False
+            return self._add_frame(raw)
+
+    def _add_frame(self, raw):
+        self.bytes_in += len(raw)
+        with Image.open(io.BytesIO(raw)) as im:
+            im = im.convert('RGB')
+            if self.size is None:
+                im.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS)
+                self.size = im.size
+                self._write_header(*self.size)
+            elif im.size != self.size:
+                im = im.resize(self.size, Image.LANCZOS)
+
+            h = dhash(im)
+            if self._last_hash is not None and bin(h ^ self._last_hash).count('1') <= self.dedup_distance:
+                self._holds[-1][1] += 1
+                self.dropped += 1
+                return False
+            self._last_hash = h
+
+            out = io.BytesIO()
+            im.quantize(colors=256, method=Image.Quantize.MEDIANCUT).save(out, format='GIF')
+        block = _gif_image_block(out.getvalue())
+
+        # Graphic control extension; the delay (bytes 4-5) is filled in by finish()
+        self._holds.append([self._fp.tell() + 4, 1])
+        self._fp.write(b'\x21\xf9\x04\x04\x00\x00\x00\x00')
+        self._fp.write(block)
+        self.frames += 1
+        return True
+
+    def finish(self, frame_duration_ms=500):
+        """Write the trailer and set every frame's delay. Returns the file path."""
+        with self._lock:
+            self._closed = True
+            self._fp.write(b'\x3b')
+            for offset, held in self._holds:
+                delay = min(65535, max(2, round(frame_duration_ms * held / 10)))
+                self._fp.seek(offset)
+                self._fp.write(delay.to_bytes(2, 'little'))
+            self._fp.close()
+        return self.path
+
+    def abort(self):
+        with self._lock:
+            self._closed = True
+            try:
+                self._fp.close()
+                os.remove(self.path)
+            except OSError:
+                pass
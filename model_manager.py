@@ -5,10 +5,12 @@ and intelligent multi-level fallback chain with per-provider health tracking.
 """
 
 import asyncio
+import bisect
 import yaml
 import os
 import re
 import contextvars
+import time
 from datetime import datetime, timedelta
 
 # ── Error type constants ──────────────────────────────────────────────
@@ -24,6 +26,209 @@ ERROR_UNKNOWN    = "UNKNOWN"
 TRANSIENT_ERRORS = {ERROR_RATE_LIMIT, ERROR_SERVER, ERROR_TIMEOUT, ERROR_NETWORK, ERROR_EMPTY}
 PERMANENT_ERRORS = {ERROR_AUTH, ERROR_QUOTA}
 
+class ModelCatalog:
+    """
+    In-memory model catalog with precomputed lookup indexes.
+
+    config/models.yaml is parsed once and re-parsed only when its mtime
+    changes; the flat entry list is rebuilt when the yaml, the set of
+    providers with API keys, or the discovered Ollama models change.
+    Every rebuild precomputes:
+
+      exact     lowercase id               -> id
+      prefix    every prefix of every id    -> first id in catalog order
+      names     all lowercase names joined  (one str.find for the substring tier)
+      provider  provider                   -> [ids]
+
+    so resolve() is a handful of dict probes and one C-level find instead of
+    four list scans, with exactly the same results as the scans.
+    """
+
+    def __init__(self, core, models_yaml_path):
+        self.core = core
+        self.path = models_yaml_path
+        self._yaml_stamp = None
+        self._yaml_data = {}
+        self._signature = None
+        self.entries = []
+        self._exact = {}
+        self._prefix = {}
+        self._names = ""
+        self._name_starts = []      # offset of each entry's name in self._names
+        self._by_provider = {}
+        self._resolved = {}
+        self._checked_at = 0.0
+        self.check_interval = 1.0   # seconds between staleness checks on the resolve() path
+        self.stats = {
+            'reloads': 0, 'rebuilds': 0, 'last_load_ms': 0.0,
+            'lookups': 0, 'lookup_ns_total': 0, 'lookup_ns_max': 0,
+            'hits': {'memo': 0, 'exact': 0, 'hf': 0, 'tag_prefix': 0,
+                     'prefix': 0, 'name': 0, 'miss': 0},
+        }
+
+    # ── Loading ────────────────────────────────────────────────────────
+
+    def _load_yaml(self):
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._yaml_stamp:
+            return
+        self._yaml_stamp = stamp
+        self._yaml_data = {}
+        if stamp is not None:
+            t0 = time.perf_counter()
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._yaml_data = yaml.safe_load(f) or {}
+            except Exception as e:
+                import logging
+                logging.error(f"Error loading models.yaml for model catalog: {e}")
+            self.stats['reloads'] += 1
+            self.stats['last_load_ms'] = round((time.perf_counter() - t0) * 1000, 2)
+
+    def _configured_providers(self):
+        providers_cfg = self.core.config.get('providers', {})
+        configured = []
+        for provider in (self._yaml_data.get('providers') or {}):
+            if provider == 'ollama':
+                continue  # Handled via discovery
+            prov_cfg = providers_cfg.get(provider, {}) or {}
+            api_key = (prov_cfg.get('apiKey', '') or prov_cfg.get('api_key', '')
+                       or prov_cfg.get('apikey', ''))
+            # NVIDIA special case: unified key or sub-keys
+            if provider == 'nvidia' and not api_key:
+                sub_keys = prov_cfg.get('keys', {})
+                if sub_keys and any(v for v in sub_keys.values()):
+                    api_key = next((v for v in sub_keys.values() if v), '')
+            if api_key and api_key not in ('', 'NONE'):
+                configured.append(provider)
+        return tuple(configured)
+
+    def refresh(self, force=True):
+        """Cheap staleness check; rebuilds the indexes only when an input changed."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        self._load_yaml()
+        ollama_mgr = getattr(self.core, 'ollama_manager', None)
+        ollama_models = tuple(getattr(ollama_mgr, 'discovered_models', None) or ())
+        signature = (self._yaml_stamp, self._configured_providers(), ollama_models)
+        if signature != self._signature:
+            self._signature = signature
+            self._rebuild(signature[1], ollama_models)
+
+    def _rebuild(self, providers, ollama_models):
+        entries = []
+        available = self._yaml_data.get('providers') or {}
+        for provider in providers:
+            for m in available.get(provider) or []:
+                if not m.get('enabled', True) or not m.get('id'):
+                    continue
+                mid = m.get('id')
+                mname = m.get('name', mid)
+                # Format ID for subagent_manager.spawn(): "provider/model"
+                full_id = mid
+                if provider != 'openrouter' and '/' not in mid:
+                    full_id = f"{provider}/{mid}"
+                entries.append({"id": full_id, "name": f"{mname} ({provider})",
+                                "provider": provider, "model": mid, "label": mname})
+        for m in ollama_models:
+            entries.append({"id": f"ollama/{m}", "name": f"🦙 {m} (local)",
+                            "provider": "ollama", "model": m, "label": m})
+
+        exact, prefix, by_provider = {}, {}, {}
+        name_parts, name_starts, offset = [], [], 0
+        for e in entries:
+            mid = e['id'].lower()
+            exact.setdefault(mid, e['id'])
+            by_provider.setdefault(e['provider'], []).append(e['id'])
+            for i in range(1, len(mid) + 1):
+                prefix.setdefault(mid[:i], e['id'])
+            # NUL-separated so a match can never span two names
+            name_starts.append(offset)
+            name_parts.append(e['name'].lower())
+            offset += len(name_parts[-1]) + 1
+
+        self.entries = entries
+        self._exact, self._prefix, self._by_provider = exact, prefix, by_provider
+        self._names, self._name_starts = "\0".join(name_parts), name_starts
+        self._resolved = {}
+        self.stats['rebuilds'] += 1
+
+    # ── Lookup ─────────────────────────────────────────────────────────
+
+    def models_for(self, provider):
+        self.refresh()
+        return list(self._by_provider.get(provider, []))
+
+    def resolve(self, query):
+        """Best matching catalog id for query, or None. See ModelManager.resolve_model_id."""
+        t0 = time.perf_counter_ns()
+        self.refresh(force=False)
+        query_l = query.lower().strip()
+        hit = self._resolved.get(query_l)
+        if hit is not None:
+            tier, found = 'memo', hit[1]
+        else:
+            tier, found = self._resolve_uncached(query, query_l)
+            if len(self._resolved) < 4096:
+                self._resolved[query_l] = (tier, found)
+        dt = time.perf_counter_ns() - t0
+        st = self.stats
+        st['lookups'] += 1
+        st['lookup_ns_total'] += dt
+        st['lookup_ns_max'] = max(st['lookup_ns_max'], dt)
+        st['hits'][tier] += 1
+        return found
+
+    def _resolve_uncached(self, query, query_l):
+        # 0. hf.co (Ollama) paths: exact or contained in a discovered Ollama model
+        if query_l.startswith('hf.co/'):
+            found = self._exact.get(f"ollama/{query_l}")
+            if found is None:
+                found = next((mid for mid in self._by_provider.get('ollama', [])
+                              if query_l in mid.lower()), None)
+            # If not discovered but looks like a full HF path, assume Ollama
+            return 'hf', found or f"ollama/{query}"
+        # 1. Exact ID match (case-insensitive)
+        found = self._exact.get(query_l)
+        if found:
+            return 'exact', found
+        # 2. Prefix match, prioritizing exact prefix + tag ("ollama/qwen3" -> "ollama/qwen3:8b")
+        found = self._prefix.get(query_l + ":")
+        if found:
+            return 'tag_prefix', found
+        found = self._prefix.get(query_l)
+        if found:
+            return 'prefix', found
+        # 3. Keyword on the name (e.g. "qwen3" -> "🦙 qwen3:8b (local)"); the lowest
+        #    offset is the first entry in catalog order, as with a scan
+        query_part = query_l.split('/')[-1]
+        if query_part and "\0" not in query_part:
+            pos = self._names.find(query_part)
+            if pos >= 0:
+                return 'name', self.entries[bisect.bisect_right(self._name_starts, pos) - 1]['id']
+        return 'miss', None
+
+    def get_stats(self):
+        st = self.stats
+        return {
+            'entries': len(self.entries),
+            'providers': {p: len(ids) for p, ids in self._by_provider.items()},
+            'reloads': st['reloads'],
+            'rebuilds': st['rebuilds'],
+            'last_load_ms': st['last_load_ms'],
+            'lookups': st['lookups'],
+            'avg_lookup_us': round(st['lookup_ns_total'] / st['lookups'] / 1000, 2) if st['lookups'] else 0.0,
+            'max_lookup_us': round(st['lookup_ns_max'] / 1000, 2),
+            'hits': dict(st['hits']),
+        }
+
+
 class ModelManager:
     """
     Manages model selection with primary/fallback system.
@@ -90,6 +295,10 @@ class ModelManager:
         self._routed = False
         self._pre_route_state = None
 
+        # ── Model catalog (config/models.yaml + discovered Ollama models) ──
+        self.catalog = ModelCatalog(
+            core, os.path.join(os.path.dirname(self.config_path), 'config', 'models.yaml'))
+
     # Policy loading removed (Auto Fallback simplification)
 
     # ─────────────────────────────────────────────────────────────────
@@ -433,67 +642,11 @@ class ModelManager:
     def get_all_models(self):
         """
         Returns a flat list of all models from configured providers and discovered Ollama models.
-        Each entry: {"id": "provider/model_id", "label": "Model Name"}
-        Used to populate UI model selectors.
+        Each entry: {"id": "provider/model_id", "name": "Model Name (provider)", "provider": ...}
+        Used to populate UI model selectors. Served from the cached catalog.
         """
-        all_models = []
-        providers_cfg = self.core.config.get('providers', {})
-        
-        # 1. Load config/models.yaml
-        models_yaml_path = os.path.join(os.path.dirname(self.config_path), 'config', 'models.yaml')
-        models_data = {}
-        if os.path.exists(models_yaml_path):
-            try:
-                with open(models_yaml_path, 'r', encoding='utf-8') as f:
-                    models_data = yaml.safe_load(f) or {}
-            except Exception as e:
-                import logging
-                logging.error(f"Error loading models.yaml for get_all_models: {e}")
-
-        available_providers = models_data.get('providers', {})
-        
-        # 2. Collect from configured cloud providers
-        for provider, models_list in available_providers.items():
-            if provider == 'ollama':
-                continue # Handled below via discovery
-            
-            # Check if provider is configured with an API key
-            prov_cfg = providers_cfg.get(provider, {})
-            api_key = (prov_cfg.get('apiKey', '') or prov_cfg.get('api_key', '')
-                       or prov_cfg.get('apikey', ''))
-            
-            # NVIDIA special case: unified key or sub-keys
-            if provider == 'nvidia' and not api_key:
-                sub_keys = prov_cfg.get('keys', {})
-                if sub_keys and any(v for v in sub_keys.values()):
-                    api_key = next((v for v in sub_keys.values() if v), '')
-
-            if api_key and api_key not in ('', 'NONE'):
-                for m in models_list:
-                    if m.get('enabled', True):
-                        mid = m.get('id')
-                        mname = m.get('name', mid)
-                        
-                        # Format ID for subagent_manager.spawn(): "provider/model"
-                        full_id = mid
-                        if provider != 'openrouter' and '/' not in mid:
-                            full_id = f"{provider}/{mid}"
-                        
-                        all_models.append({
-                            "id": full_id,
-                            "name": f"{mname} ({provider})"
-                        })
-
-        # 3. Collect from discovered Ollama models
-        ollama_mgr = getattr(self.core, 'ollama_manager', None)
-        if ollama_mgr and hasattr(ollama_mgr, 'discovered_models'):
-            for m in ollama_mgr.discovered_models:
-                all_models.append({
-                    "id": f"ollama/{m}",
-                    "name": f"🦙 {m} (local)"
-                })
-        
-        return all_models
+        self.catalog.refresh()
+        return [dict(e) for e in self.catalog.entries]
 
     def resolve_model_id(self, query: str) -> str:
         """
@@ -503,47 +656,9 @@ class ModelManager:
         """
         if not query:
             return query
-            
-        all_models = self.get_all_models()
-        query_l = query.lower().strip()
-        
-        # 0. Handle hf.co (Ollama) specific routing
-        if query_l.startswith('hf.co/'):
-            # Try to find an ollama model that has this ID or contains it
-            for m in all_models:
-                mid_l = m['id'].lower()
-                if mid_l == f"ollama/{query_l}":
-                    return m['id']
-                if query_l in mid_l and m['provider'] == 'ollama':
-                    return m['id']
-            # If not found in all_models, but looks like a full HF path, assume Ollama
-            return f"ollama/{query}"
+        return self.catalog.resolve(query) or query
 
-        # 1. Exact ID match (case-insensitive)
-        for m in all_models:
-            mid = m['id'].lower()
-            if mid == query_l:
-                return m['id']
-                
-        # 2. Prefix match (e.g. "ollama/qwen" matches "ollama/qwen3:8b")
-        # Prioritize exact prefix + tag match
-        for m in all_models:
-            mid = m['id'].lower()
-            if mid.startswith(query_l + ":"):
-                return m['id']
-        
-        # 3. General prefix match
-        for m in all_models:
-            mid = m['id'].lower()
-            if mid.startswith(query_l):
-                return m['id']
-                
-        # 4. Keyword match on name/label (e.g. "qwen3" matches "🦙 qwen3:8b (local)")
-        # Split by '/' to handle case where user provided provider/part
-        query_part = query_l.split('/')[-1]
-        for m in all_models:
-            mname = m['name'].lower()
-            if query_part in mname:
-                return m['id']
-                
-        return query
+    def get_catalog_stats(self):
+        """Catalog size, reload counts and lookup latency for the status API."""
+        self.catalog.refresh()
+        return self.catalog.get_stats()
@@ -6,12 +6,17 @@ Provides robust, stable local model support:
 - Context-window awareness per model
 - Auto-reconnect and background polling
 - Remote/custom-port Ollama instance support (reads baseUrl from config)
+- Residency tracking (/api/ps), warm-up of fallback/sub-agent models and
+  keep_alive chosen from the observed local usage mix
 """
 
 import asyncio
 import json
 import logging
+import os
+import re
 import time
+from collections import deque
 import httpx
 
 logger = logging.getLogger("OllamaManager")
@@ -25,12 +30,15 @@ class OllamaManager:
 
     HEALTH_CACHE_SECONDS = 30      # Don't hammer /api/version on every LLM call
     DISCOVERY_INTERVAL_SECONDS = 60  # Re-scan for newly pulled models
+    RESIDENCY_INTERVAL_SECONDS = 15  # Re-read /api/ps (which models are loaded right now)
+    SHOW_CONCURRENCY = 4             # Parallel /api/show requests
 
     def __init__(self, core):
         self.core = core
+        ollama_cfg = core.config.get('providers', {}).get('ollama', {})
 
         # Build base URL from config (strip /v1 if present to get the raw Ollama host)
-        raw = core.config.get('providers', {}).get('ollama', {}).get('baseUrl', 'http://127.0.0.1:11434/v1')
+        raw = ollama_cfg.get('baseUrl', 'http://127.0.0.1:11434/v1')
         self.base_url = raw.rstrip('/').removesuffix('/v1')   # e.g. "http://127.0.0.1:11434"
         self.openai_url = self.base_url + '/v1'               # for OpenAI-compat endpoint
 
@@ -40,6 +48,29 @@ class OllamaManager:
         self._last_health_check: float = 0.0
         self._cached_health: bool = False
         self._last_model_set: set[str] = set()  # Track changes — only log when models change
+        self._http: httpx.AsyncClient | None = None
+
+        # Metadata cache: /api/show is only re-queried when a model's digest changes
+        self.model_digests: dict[str, str] = {}
+        logs_dir = core.config.get('paths', {}).get('logs', './logs')
+        self._cache_path = os.path.join(logs_dir, 'ollama_models.json')
+        self._load_cache()
+
+        # Residency + warm-up
+        self.resident: dict[str, dict] = {}     # model -> {size_vram, expires_at}
+        self.warm_enabled = bool(ollama_cfg.get('warm_models_enabled', True))
+        self.extra_warm_models = list(ollama_cfg.get('warm_models', []) or [])
+        self.max_resident = int(ollama_cfg.get('max_resident', 2))
+        self.warm_idle_seconds = float(ollama_cfg.get('warm_idle_seconds', 20))
+        self.keep_alive_hot = str(ollama_cfg.get('keep_alive_hot', '30m'))
+        self.keep_alive_default = str(ollama_cfg.get('keep_alive', '5m'))
+        self.keep_alive_cold = str(ollama_cfg.get('keep_alive_cold', '2m'))
+        self.usage_window = float(ollama_cfg.get('usage_window_seconds', 3600))
+        self._usage: deque = deque(maxlen=2000)  # (monotonic, model) per local request
+        self._last_request = 0.0
+        self._warming: set[str] = set()
+        self.residency_stats = {"requests": 0, "resident_hits": 0, "cold_starts": 0,
+                                "warmups": 0, "warm_failures": 0, "last_warm_s": None}
 
     # ─────────────────────────────────────────────────────────────────
     # Public API
@@ -55,9 +86,8 @@ class OllamaManager:
             return self._cached_health
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(f"{self.base_url}/api/version")
-                healthy = resp.status_code == 200
+            resp = await self._client().get(f"{self.base_url}/api/version")
+            healthy = resp.status_code == 200
         except Exception:
             healthy = False
 
@@ -81,18 +111,18 @@ class OllamaManager:
     async def discover_models(self) -> list[str]:
         """
         Queries /api/tags to get all locally installed Ollama models.
-        Also fetches context-window size for each model via /api/show.
+        Also fetches context-window size via /api/show for new or re-pulled models.
         Broadcasts the list to the web UI and imprints it into memory.
         """
         if not await self.health_check():
             return self.discovered_models  # return cached list, don't wipe it
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(f"{self.base_url}/api/tags")
-                data = resp.json()
+            resp = await self._client().get(f"{self.base_url}/api/tags")
+            data = resp.json()
 
             models = [m['name'] for m in data.get('models', [])]
+            digests = {m['name']: m.get('digest', '') for m in data.get('models', [])}
             self.discovered_models = models
 
             # Only log to terminal when models actually change (added/removed)
@@ -127,8 +157,12 @@ class OllamaManager:
                     except Exception:
                         pass  # memory imprint is best-effort
 
-            # Fetch context windows in parallel (fire-and-forget, best-effort)
-            asyncio.create_task(self._fetch_context_windows(models))
+            # Fetch context windows for new/changed models (fire-and-forget, best-effort)
+            for gone in set(self.model_digests) - set(models):
+                self.model_digests.pop(gone, None)
+            stale = [m for m in models if self.model_digests.get(m) != digests.get(m)]
+            if stale:
+                asyncio.create_task(self._fetch_context_windows(stale, digests))
 
             # Always broadcast to web UI so the model grid stays fresh
             await self.core.relay.emit(2, "ollama_models", models)
@@ -141,15 +175,23 @@ class OllamaManager:
 
     async def auto_discover_loop(self):
         """
-        Background task: polls Ollama every DISCOVERY_INTERVAL_SECONDS.
-        Started by galactic_core_v2.py via asyncio.create_task().
+        Background task: discovers models every DISCOVERY_INTERVAL_SECONDS and
+        re-reads residency (warming configured models when idle) every
+        RESIDENCY_INTERVAL_SECONDS. Started by galactic_core_v2.py via asyncio.create_task().
         """
+        last_discovery = 0.0
         while True:
             try:
-                await self.discover_models()
+                now = time.monotonic()
+                if now - last_discovery >= self.DISCOVERY_INTERVAL_SECONDS:
+                    last_discovery = now
+                    await self.discover_models()
+                if self.is_healthy:
+                    await self.refresh_residency()
+                    await self._warm_targets_if_idle()
             except Exception as e:
                 logger.debug(f"OllamaManager loop error: {e}")
-            await asyncio.sleep(self.DISCOVERY_INTERVAL_SECONDS)
+            await asyncio.sleep(self.RESIDENCY_INTERVAL_SECONDS)
 
     def get_openai_base_url(self) -> str:
         """Return the /v1-suffixed URL for use by the OpenAI-compat gateway call."""
@@ -167,33 +209,229 @@ class OllamaManager:
             "models": self.discovered_models,
             "model_count": len(self.discovered_models),
             "context_windows": self.model_context_windows,
+            "resident": self.resident,
+            "warm_targets": self.warm_targets(),
+            "usage_mix": self._usage_mix(),
+            "keep_alive": {m: self.keep_alive_for(m) for m in self.resident},
+            "residency": self.residency_stats,
         }
 
     # ─────────────────────────────────────────────────────────────────
-    # Internal helpers
+    # Residency, warm-up and keep_alive
     # ─────────────────────────────────────────────────────────────────
 
-    async def _fetch_context_windows(self, models: list[str]):
+    async def refresh_residency(self) -> dict:
+        """Read /api/ps: which models the Ollama server currently holds in memory."""
+        try:
+            resp = await self._client().get(f"{self.base_url}/api/ps")
+            data = resp.json()
+        except Exception as e:
+            logger.debug(f"Ollama /api/ps failed: {e}")
+            return self.resident
+        resident = {}
+        for m in data.get('models', []) or []:
+            info = {"size_vram": m.get('size_vram', 0), "expires_at": m.get('expires_at')}
+            # Newer servers report the context the runner was loaded with
+            if m.get('context_length'):
+                info["context_length"] = m['context_length']
+            resident[m.get('name') or m.get('model')] = info
+        if set(resident) != set(self.resident):
+            await self.core.log(f"🤖 Ollama resident: {', '.join(resident) or 'none'}", priority=3)
+        self.resident = resident
+        return resident
+
+    def note_request(self, model: str):
+        """Record a local generation request (gateway calls this before each Ollama call)."""
+        model = self._canonical(model)
+        now = time.monotonic()
+        self._usage.append((now, model))
+        self._last_request = now
+        self.residency_stats["requests"] += 1
+        if model in self.resident:
+            self.residency_stats["resident_hits"] += 1
+        else:
+            self.residency_stats["cold_starts"] += 1
+
+    def warm_targets(self) -> list[str]:
+        """Installed models worth keeping loaded: the Ollama fallback, the sub-agent default, warm_models."""
+        targets = []
+        mm = getattr(self.core, 'model_manager', None)
+        if mm and getattr(mm, 'fallback_provider', '') == 'ollama' and getattr(mm, 'fallback_model', ''):
+            targets.append(mm.fallback_model)
+        sub = str(self.core.config.get('subagents', {}).get('default_model') or '')
+        if sub.startswith('ollama/'):
+            targets.append(sub.split('/', 1)[1])
+        targets += self.extra_warm_models
+        installed = set(self.discovered_models)
+        out = []
+        for m in map(self._canonical, targets):
+            if m in installed and m not in out:
+                out.append(m)
+        return out
+
+    def keep_alive_for(self, model: str) -> str:
         """
-        Best-effort: for each model call POST /api/show to extract context_length
-        from the modelinfo blob.  Results stored in self.model_context_windows.
+        keep_alive for a request to model, from the usage mix over usage_window:
+        warm targets and models carrying most local traffic stay loaded longer,
+        rarely used ones are released sooner so they don't squat on VRAM.
         """
-        for model_name in models:
+        model = self._canonical(model)
+        if model in self.warm_targets():
+            return self.keep_alive_hot
+        mix = self._usage_mix()
+        total = sum(mix.values())
+        if not total:
+            return self.keep_alive_default
+        share = mix.get(model, 0) / total
+        if share >= 0.5:
+            return self.keep_alive_hot
+        if share < 0.1 and total >= 10:
+            return self.keep_alive_cold
+        return self.keep_alive_default
+
+    async def warm(self, model: str) -> bool:
+        """Load model into memory now (empty /api/generate) so the next request skips the cold load."""
+        model = self._canonical(model)
+        if model in self._warming:
+            return False
+        self._warming.add(model)
+        started = time.monotonic()
+        body = {"model": model, "keep_alive": self.keep_alive_for(model)}
+        # Load at the size the gateway will ask for; a different num_ctx would reload the model
+        gateway = getattr(self.core, 'gateway', None)
+        num_ctx = gateway.ollama_warm_num_ctx(model) if hasattr(gateway, 'ollama_warm_num_ctx') else None
+        if num_ctx:
+            body["options"] = {"num_ctx": int(num_ctx)}
+        try:
+            resp = await self._client().post(
+                f"{self.base_url}/api/generate",
+                json=body,
+                timeout=300.0,
+            )
+            ok = resp.status_code == 200
+        except Exception as e:
+            logger.debug(f"Ollama warm-up of {model} failed: {e}")
+            ok = False
+        finally:
+            self._warming.discard(model)
+        elapsed = round(time.monotonic() - started, 2)
+        if ok:
+            self.residency_stats["warmups"] += 1
+            self.residency_stats["last_warm_s"] = elapsed
+            ctx_note = f" at num_ctx={num_ctx}" if num_ctx else ""
+            await self.core.log(f"🔥 Ollama: warmed {model}{ctx_note} in {elapsed}s", priority=2)
+            await self.refresh_residency()
+        else:
+            self.residency_stats["warm_failures"] += 1
+        return ok
+
+    async def _warm_targets_if_idle(self):
+        """Warm missing targets, but never while local requests are flowing or if it would evict the active model."""
+        if not self.warm_enabled:
+            return
+        if time.monotonic() - self._last_request < self.warm_idle_seconds:
+            return
+        gw = getattr(self.core, 'gateway', None)
+        llm = getattr(gw, 'llm', None)
+        active = self._canonical(llm.model) if getattr(llm, 'provider', '') == 'ollama' else None
+        for model in self.warm_targets():
+            if model in self.resident or model in self._warming:
+                continue
+            loaded = set(self.resident) | {model}
+            if active:
+                loaded.add(active)
+            if len(loaded) > self.max_resident:
+                continue
+            await self.warm(model)
+
+    def _usage_mix(self) -> dict:
+        cutoff = time.monotonic() - self.usage_window
+        while self._usage and self._usage[0][0] < cutoff:
+            self._usage.popleft()
+        mix = {}
+        for _, m in self._usage:
+            mix[m] = mix.get(m, 0) + 1
+        return mix
+
+    @staticmethod
+    def _canonical(model: str) -> str:
+        """Ollama names untagged models ':latest'."""
+        model = str(model or '').removeprefix('ollama/')
+        return model if ':' in model else f"{model}:latest"
+
+    async def close(self):
+        if self._http is not None:
             try:
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    resp = await client.post(
+                await self._http.aclose()
+            except Exception:
+                pass
+            self._http = None
+
+    # ─────────────────────────────────────────────────────────────────
+    # Internal helpers
+    # ─────────────────────────────────────────────────────────────────
+
+    def _client(self) -> httpx.AsyncClient:
+        """One pooled client for every Ollama API call (health, tags, ps, show, warm-up)."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=10.0)
+        return self._http
+
+    async def _fetch_context_windows(self, models: list[str], digests: dict | None = None):
+        """
+        Best-effort: POST /api/show for the given models (SHOW_CONCURRENCY at a time)
+        and extract context_length from the modelinfo blob. Results are stored in
+        self.model_context_windows and persisted with each model's digest.
+        """
+        sem = asyncio.Semaphore(self.SHOW_CONCURRENCY)
+
+        async def _show(model_name):
+            async with sem:
+                try:
+                    resp = await self._client().post(
                         f"{self.base_url}/api/show",
-                        json={"name": model_name}
+                        json={"name": model_name},
+                        timeout=5.0,
                     )
                     data = resp.json()
-                    # Ollama returns nested modelinfo with arch-specific keys
-                    model_info = data.get('model_info', {})
-                    ctx = (
-                        model_info.get('llama.context_length')
-                        or model_info.get('context_length')
-                        or data.get('parameters', {}).get('num_ctx')
-                    )
-                    if ctx:
-                        self.model_context_windows[model_name] = int(ctx)
-            except Exception:
-                pass  # best-effort
+                except Exception:
+                    return  # best-effort; retried on next discovery
+            # Ollama returns nested modelinfo with arch-specific keys ("qwen3.context_length", ...)
+            model_info = data.get('model_info', {}) or {}
+            ctx = model_info.get('llama.context_length') or model_info.get('context_length')
+            if not ctx:
+                ctx = next((v for k, v in model_info.items() if k.endswith('.context_length')), None)
+            if not ctx:
+                m = re.search(r'^num_ctx\s+(\d+)', str(data.get('parameters') or ''), re.MULTILINE)
+                ctx = m.group(1) if m else None
+            if ctx:
+                self.model_context_windows[model_name] = int(ctx)
+            self.model_digests[model_name] = (digests or {}).get(model_name, '')
+
+        await asyncio.gather(*(_show(m) for m in models))
+        self._save_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self._cache_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            for name, info in (saved.get('models') or {}).items():
+                self.model_digests[name] = info.get('digest', '')
+                if info.get('context_length'):
+                    self.model_context_windows[name] = int(info['context_length'])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read {self._cache_path}: {e}")
+
+    def _save_cache(self):
+        models = {name: {"digest": digest, "context_length": self.model_context_windows.get(name)}
+                  for name, digest in self.model_digests.items()}
+        try:
+            os.makedirs(os.path.dirname(self._cache_path) or ".", exist_ok=True)
+            tmp = self._cache_path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"models": models}, f)
+            os.replace(tmp, self._cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write {self._cache_path}: {e}")
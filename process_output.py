@@ -0,0 +1,134 @@
+"""
+Galactic AI — bounded, streamed capture of subprocess output.
+
+communicate() holds a command's entire stdout/stderr in memory before we cut
+it down to a few KB for the model. Here the pipes are read incrementally into
+HeadTailBuffer (first and last N KB plus a byte count), and live chunks are
+forwarded to the relay as `tool_output` messages so the dashboard can show
+progress while the command is still running.
+"""
+import asyncio
+import time
+
+
+class HeadTailBuffer:
+    """Keeps the first head_bytes and last tail_bytes of a stream, counts the rest."""
+
+    def __init__(self, head_bytes=4096, tail_bytes=4096):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data):
+        self.total += len(data)
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            if len(self.tail) > self.tail_bytes:
+                del self.tail[:len(self.tail) - self.tail_bytes]
+
+    @property
+    def truncated(self):
+        return self.total > len(self.head) + len(self.tail)
+
+    def text(self, label="OUTPUT"):
+        head = self.head.decode('utf-8', errors='replace')
+        tail = self.tail.decode('utf-8', errors='replace')
+        if not self.truncated:
+            return (head + tail).strip()
+        skipped = self.total - len(self.head) - len(self.tail)
+        return (f"{head}\n...[{label} TRUNCATED: {skipped:,} of {self.total:,} bytes omitted]...\n{tail}").strip()
+
+
+class _LiveForwarder:
+    """Batches live chunks into at most one relay message per interval; a timer flushes
+    whatever is pending so output from a slow producer still arrives within one interval."""
+
+    def __init__(self, relay, tool, run_id, interval=0.25, max_chunk=4096):
+        self.relay = relay
+        self.tool = tool
+        self.run_id = run_id
+        self.interval = interval
+        self.max_chunk = max_chunk
+        self.pending = {}      # stream -> bytearray
+        self.last_sent = 0.0
+        self._timer = None
+
+    async def push(self, stream, data):
+        buf = self.pending.setdefault(stream, bytearray())
+        if len(buf) < self.max_chunk:
+            buf += data[:self.max_chunk - len(buf)]
+        wait = self.last_sent + self.interval - time.monotonic()
+        if wait <= 0:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later(wait))
+
+    async def _flush_later(self, delay):
+        await asyncio.sleep(delay)
+        await self.flush()
+
+    async def flush(self, done=False, exit_code=None):
+        if done and self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        self.last_sent = time.monotonic()
+        pending, self.pending = self.pending, {}
+        for stream, buf in pending.items():
+            if buf:
+                await self._emit({'stream': stream, 'chunk': buf.decode('utf-8', errors='replace')})
+        if done:
+            await self._emit({'done': True, 'exit_code': exit_code})
+
+    async def _emit(self, data):
+        try:
+            await self.relay.emit(3, 'tool_output', {'tool': self.tool, 'run_id': self.run_id, **data})
+        except Exception:
+            pass
+
+
+async def capture_process(proc, timeout, relay=None, tool='exec', head_bytes=4096, tail_bytes=4096,
+                          read_size=65536):
+    """Drain proc.stdout/stderr into HeadTailBuffers while it runs.
+
+    Returns (stdout_buf, stderr_buf, exit_code, timed_out). On timeout the
+    process is killed and the output gathered so far is still returned.
+    """
+    bufs = {'stdout': HeadTailBuffer(head_bytes, tail_bytes), 'stderr': HeadTailBuffer(head_bytes, tail_bytes)}
+    live = _LiveForwarder(relay, tool, f"{tool}-{id(proc):x}") if relay is not None else None
+
+    async def _drain(name, pipe):
+        if pipe is None:
+            return
+        while True:
+            data = await pipe.read(read_size)
+            if not data:
+                return
+            bufs[name].write(data)
+            if live:
+                await live.push(name, data)
+
+    readers = asyncio.gather(_drain('stdout', proc.stdout), _drain('stderr', proc.stderr))
+    timed_out = False
+    try:
+        # One deadline for both: a command can close its pipes and keep running
+        await asyncio.wait_for(asyncio.gather(asyncio.shield(readers), proc.wait()), timeout=timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+        await proc.wait()
+        readers.cancel()
+        try:
+            await readers
+        except (asyncio.CancelledError, Exception):
+            pass
+    if live:
+        await live.flush(done=True, exit_code=None if timed_out else proc.returncode)
+    return bufs['stdout'], bufs['stderr'], proc.returncode, timed_out
@@ -1,4 +1,6 @@
 import asyncio
+import heapq
+import itertools
 import time
 import json
 import os
@@ -9,12 +11,100 @@ logger = logging.getLogger("GalacticScheduler")
 
 CRON_FILE = os.path.join(os.path.dirname(__file__), "logs", "cron_tasks.json")
 
+# What to do when a job comes due while its previous run is still going:
+#   skip     — drop this firing (default)
+#   queue    — run once more as soon as the current run finishes
+#   parallel — start another run alongside it
+OVERLAP_POLICIES = ("skip", "queue", "parallel")
+
+
+class CronExpr:
+    """A 5-field cron expression compiled once into sets of allowed values.
+
+    Fields: minute hour day-of-month month day-of-week (0 or 7 = Sunday).
+    Each field can be: * (any), N (exact), */N (every N), N-M (range),
+    N-M/S or N/S (stepped), and comma-separated lists of those.
+    As before, day-of-month and day-of-week must both match.
+    """
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expr):
+        self.expr = expr.strip()
+        fields = self.expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: '{expr}'")
+        parsed = [self._parse_field(f, *self.RANGES[i]) for i, f in enumerate(fields)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {d % 7 for d in weekdays}
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_str = part.split('/', 1)
+                step = int(step_str)
+                if step < 1:
+                    raise ValueError(f"Invalid cron step: '{field}'")
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(x) for x in part.split('-', 1))
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field out of range: '{field}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def matches(self, dt):
+        return (dt.minute in self.minutes and dt.hour in self.hours
+                and dt.day in self.days and dt.month in self.months
+                and (dt.isoweekday() % 7) in self.weekdays)
+
+    def next_after(self, dt):
+        """First matching minute strictly after dt, or None if none within 5 years."""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif t.day not in self.days or (t.isoweekday() % 7) not in self.weekdays:
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        return None
+
+
 class GalacticScheduler:
+    """Interval, one-shot and cron jobs driven by a min-heap of next-fire times.
+
+    The loop sleeps until the earliest job is due (or a job is added/removed),
+    then dispatches it as its own asyncio task, so a slow job never delays the
+    others. Runs are capped globally by scheduler.max_concurrent, and each job
+    has an overlap policy (see OVERLAP_POLICIES). Per-job run counts, duration
+    and scheduling drift are kept in job["stats"].
+    """
+
     def __init__(self, core):
         self.core = core
         self.tasks = []
         self.cron_tasks = []
         self.running = False
+        sched_cfg = core.config.get('scheduler', {}) if hasattr(core, 'config') else {}
+        self.max_concurrent = sched_cfg.get('max_concurrent', 4)
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._heap = []  # (fire_at, seq, generation, job)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._inflight = set()
         self._load_cron_tasks()
 
     # ── Persistent cron storage ──────────────────────────────────────
@@ -26,12 +116,14 @@ class GalacticScheduler:
                 with open(CRON_FILE, 'r') as f:
                     saved = json.load(f)
                 for entry in saved:
-                    self.cron_tasks.append({
-                        "name": entry["name"],
-                        "cron_expr": entry["cron_expr"],
-                        "action": entry["action"],  # stored as string (AI prompt)
-                        "last_run": 0,
-                    })
+                    try:
+                        job = self._new_cron_job(entry["name"], entry["cron_expr"], entry["action"],
+                                                 overlap=entry.get("overlap", "skip"))
+                    except ValueError as e:
+                        logger.error(f"Skipping cron task {entry.get('name')}: {e}")
+                        continue
+                    self.cron_tasks.append(job)
+                    self._push(job)
                 logger.info(f"Loaded {len(saved)} cron tasks from {CRON_FILE}")
             except Exception as e:
                 logger.error(f"Failed to load cron tasks: {e}")
@@ -41,50 +133,108 @@ class GalacticScheduler:
         os.makedirs(os.path.dirname(CRON_FILE), exist_ok=True)
         saveable = []
         for t in self.cron_tasks:
-            saveable.append({
+            entry = {
                 "name": t["name"],
                 "cron_expr": t["cron_expr"],
                 "action": t["action"] if isinstance(t["action"], str) else "(callable)",
-            })
+            }
+            if t["overlap"] != "skip":
+                entry["overlap"] = t["overlap"]
+            saveable.append(entry)
         try:
             with open(CRON_FILE, 'w') as f:
                 json.dump(saveable, f, indent=2)
         except Exception as e:
             logger.error(f"Failed to save cron tasks: {e}")
 
+    # ── Job bookkeeping ──────────────────────────────────────────────
+
+    @staticmethod
+    def _new_stats():
+        return {"runs": 0, "failures": 0, "skipped": 0, "queued": 0,
+                "last_duration": 0.0, "avg_duration": 0.0,
+                "last_drift": 0.0, "max_drift": 0.0}
+
+    def _new_cron_job(self, name, cron_expr, action, overlap="skip"):
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"Unknown overlap policy '{overlap}' (use one of {', '.join(OVERLAP_POLICIES)})")
+        compiled = CronExpr(cron_expr)
+        next_dt = compiled.next_after(datetime.now())
+        return {
+            "name": name,
+            "kind": "cron",
+            "cron_expr": cron_expr,
+            "compiled": compiled,
+            "action": action,
+            "overlap": overlap,
+            "next_run": next_dt.timestamp() if next_dt else None,
+            "last_run": 0,
+            "_active": 0,
+            "_pending": 0,
+            "_gen": 0,
+            "stats": self._new_stats(),
+        }
+
+    def _push(self, job):
+        """(Re)insert a job into the heap. Older heap entries for it become stale."""
+        job["_gen"] += 1
+        if job["next_run"] is not None:
+            heapq.heappush(self._heap, (job["next_run"], next(self._seq), job["_gen"], job))
+        self._wakeup.set()
+
+    def _forget(self, job):
+        """Invalidate a removed job's heap entries (lazy deletion)."""
+        job["_gen"] += 1
+        job["next_run"] = None
+        self._wakeup.set()
+
     # ── Original interval-based API (backward-compatible) ────────────
 
-    async def add_task(self, name, interval_seconds, func, *args, **kwargs):
+    async def add_task(self, name, interval_seconds, func, *args, overlap="skip", **kwargs):
         """Schedule a recurring task."""
         task = {
             "name": name,
+            "kind": "interval",
             "interval": interval_seconds,
             "func": func,
             "args": args,
             "kwargs": kwargs,
+            "overlap": overlap,
             "next_run": time.time() + interval_seconds,
-            "last_run": 0
+            "last_run": 0,
+            "_active": 0,
+            "_pending": 0,
+            "_gen": 0,
+            "stats": self._new_stats(),
         }
         self.tasks.append(task)
+        self._push(task)
         await self.core.log(f"Scheduled Task: {name} (Every {interval_seconds}s)", priority=2)
 
     async def add_one_shot(self, name, delay_seconds, func, *args, **kwargs):
         """Schedule a one-time task."""
         task = {
             "name": name,
+            "kind": "interval",
             "interval": 0, # 0 means one-shot
             "func": func,
             "args": args,
             "kwargs": kwargs,
+            "overlap": "parallel",
             "next_run": time.time() + delay_seconds,
-            "last_run": 0
+            "last_run": 0,
+            "_active": 0,
+            "_pending": 0,
+            "_gen": 0,
+            "stats": self._new_stats(),
         }
         self.tasks.append(task)
+        self._push(task)
         await self.core.log(f"Scheduled One-Shot: {name} (In {delay_seconds}s)", priority=2)
 
     # ── Cron-style API ───────────────────────────────────────────────
 
-    async def add_cron(self, name, cron_expr, action, persist=True):
+    async def add_cron(self, name, cron_expr, action, persist=True, overlap="skip"):
         """Schedule a cron-style task.
 
         Args:
@@ -92,16 +242,21 @@ class GalacticScheduler:
             cron_expr: Cron expression (e.g., "0 9 * * *" = daily at 9am)
             action: Either a string (processed as AI prompt) or a callable
             persist: If True, save to disk so it survives restarts
+            overlap: skip | queue | parallel — behaviour when the previous run is still active
+
+        Raises:
+            ValueError: if the cron expression or overlap policy is invalid
         """
+        job = self._new_cron_job(name, cron_expr, action, overlap=overlap)
+
         # Remove any existing task with the same name
+        for t in self.cron_tasks:
+            if t["name"] == name:
+                self._forget(t)
         self.cron_tasks = [t for t in self.cron_tasks if t["name"] != name]
 
-        self.cron_tasks.append({
-            "name": name,
-            "cron_expr": cron_expr,
-            "action": action,
-            "last_run": 0,
-        })
+        self.cron_tasks.append(job)
+        self._push(job)
 
         if persist and isinstance(action, str):
             self._save_cron_tasks()
@@ -109,138 +264,157 @@ class GalacticScheduler:
         await self.core.log(f"Scheduled Cron: {name} ({cron_expr})", priority=2)
 
     def _cron_matches(self, cron_expr, dt):
-        """Check if a datetime matches a cron expression.
-        Supports: minute hour day-of-month month day-of-week
-        Each field can be: * (any), N (exact), */N (every N), N-M (range)
-        """
-        fields = cron_expr.strip().split()
-        if len(fields) != 5:
+        """Check if a datetime matches a cron expression (invalid expressions never match)."""
+        try:
+            return CronExpr(cron_expr).matches(dt)
+        except ValueError:
             return False
 
-        values = [dt.minute, dt.hour, dt.day, dt.month, dt.isoweekday() % 7]  # 0=Sun
-        # Also support 7 as Sunday for convenience
-        for i, (field, value) in enumerate(zip(fields, values)):
-            if not self._cron_field_matches(field, value, i):
-                return False
-        return True
-
-    def _cron_field_matches(self, field, value, field_index):
-        """Check if a single cron field matches a value."""
-        if field == '*':
-            return True
-
-        for part in field.split(','):
-            # Handle step: */N or N-M/S
-            step = 1
-            if '/' in part:
-                part, step_str = part.split('/', 1)
-                try:
-                    step = int(step_str)
-                except ValueError:
-                    return False
-
-            # Handle range: N-M
-            if '-' in part and part != '*':
-                try:
-                    low, high = part.split('-', 1)
-                    low, high = int(low), int(high)
-                    if step > 1:
-                        if value in range(low, high + 1, step):
-                            return True
-                    else:
-                        if low <= value <= high:
-                            return True
-                except ValueError:
-                    return False
-            elif part == '*':
-                # */N — step over full range
-                ranges = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
-                low, high = ranges[field_index]
-                if (value - low) % step == 0:
-                    return True
-            else:
-                try:
-                    if int(part) == value:
-                        return True
-                except ValueError:
-                    return False
-        return False
-
     # ── Main loop ────────────────────────────────────────────────────
 
     async def run(self):
-        """Main scheduler loop."""
+        """Main scheduler loop: sleep until the next due job, then dispatch it."""
         self.running = True
         logger.info("Scheduler started.")
         while self.running:
-            now = time.time()
-            to_remove = []
+            # Drop stale heap entries (rescheduled or removed jobs)
+            while self._heap and self._heap[0][2] != self._heap[0][3]["_gen"]:
+                heapq.heappop(self._heap)
 
-            # ── Interval-based tasks ──
-            for task in self.tasks:
-                if now >= task["next_run"]:
-                    try:
-                        logger.info(f"Running task: {task['name']}")
-                        if asyncio.iscoroutinefunction(task["func"]):
-                            await task["func"](*task["args"], **task["kwargs"])
-                        else:
-                            task["func"](*task["args"], **task["kwargs"])
-
-                        task["last_run"] = now
-
-                        if task["interval"] > 0:
-                            task["next_run"] = now + task["interval"]
-                        else:
-                            to_remove.append(task)
-
-                    except Exception as e:
-                        logger.error(f"Task {task['name']} failed: {e}")
-                        await self.core.log(f"Task Failed: {task['name']} - {e}", priority=1)
-
-            for task in to_remove:
-                self.tasks.remove(task)
-
-            # ── Cron-based tasks ──
-            dt_now = datetime.now()
-            for ctask in self.cron_tasks:
-                if self._cron_matches(ctask["cron_expr"], dt_now):
-                    # Only fire once per matching minute
-                    minute_key = dt_now.strftime("%Y%m%d%H%M")
-                    if ctask.get("_last_minute_key") == minute_key:
-                        continue
-                    ctask["_last_minute_key"] = minute_key
-                    ctask["last_run"] = now
+            now = time.time()
+            if self._heap and self._heap[0][0] <= now:
+                fire_at, _, _, job = heapq.heappop(self._heap)
+                self._dispatch(job, fire_at)
+                self._reschedule(job, fire_at)
+                continue
+
+            # Re-check at least once a minute so wall-clock jumps (DST, NTP) are noticed
+            delay = min(self._heap[0][0] - now, 60.0) if self._heap else 60.0
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    def _reschedule(self, job, fire_at):
+        now = time.time()
+        if job["kind"] == "cron":
+            next_dt = job["compiled"].next_after(datetime.now())
+            job["next_run"] = next_dt.timestamp() if next_dt else None
+        elif job["interval"] > 0:
+            # Keep the original cadence unless we've fallen a whole interval behind
+            next_run = fire_at + job["interval"]
+            job["next_run"] = next_run if next_run > now else now + job["interval"]
+        else:
+            if job in self.tasks:
+                self.tasks.remove(job)
+            job["next_run"] = None
+        self._push(job)
+
+    def _dispatch(self, job, fire_at):
+        """Start a run of job as an independent task, honouring its overlap policy."""
+        if job["_active"] > 0:
+            if job["overlap"] == "skip":
+                job["stats"]["skipped"] += 1
+                logger.info(f"Skipping {job['name']}: previous run still active")
+                return
+            if job["overlap"] == "queue":
+                job["_pending"] += 1
+                job["stats"]["queued"] += 1
+                return
+        job["_active"] += 1
+        t = asyncio.create_task(self._run_job(job, fire_at))
+        self._inflight.add(t)
+        t.add_done_callback(self._inflight.discard)
+
+    async def _run_job(self, job, fire_at):
+        stats = job["stats"]
+        try:
+            while True:
+                async with self._slots:
+                    started = time.time()
+                    drift = max(0.0, started - fire_at)
+                    stats["last_drift"] = round(drift, 3)
+                    stats["max_drift"] = round(max(stats["max_drift"], drift), 3)
+                    job["last_run"] = started
+                    ok = await self._execute(job)
+                    duration = time.time() - started
+                stats["runs"] += 1
+                if not ok:
+                    stats["failures"] += 1
+                stats["last_duration"] = round(duration, 3)
+                stats["avg_duration"] = round(
+                    stats["avg_duration"] + (duration - stats["avg_duration"]) / stats["runs"], 3
+                )
+                if job["_pending"] <= 0:
+                    break
+                job["_pending"] -= 1
+                fire_at = time.time()
+        finally:
+            job["_active"] -= 1
+
+    async def _execute(self, job):
+        """Run a job's action once. Returns False if it failed."""
+        if job["kind"] == "interval":
+            try:
+                logger.info(f"Running task: {job['name']}")
+                if asyncio.iscoroutinefunction(job["func"]):
+                    await job["func"](*job["args"], **job["kwargs"])
+                else:
+                    job["func"](*job["args"], **job["kwargs"])
+                return True
+            except Exception as e:
+                logger.error(f"Task {job['name']} failed: {e}")
+                await self.core.log(f"Task Failed: {job['name']} - {e}", priority=1)
+                return False
 
-                    try:
-                        logger.info(f"Running cron task: {ctask['name']}")
-                        action = ctask["action"]
-                        if isinstance(action, str):
-                            # AI prompt — process through gateway
-                            resp = await asyncio.wait_for(
-                                self.core.gateway.speak(action, chat_id=f"cron:{ctask['name']}"),
-                                timeout=120.0
-                            )
-                            await self.core.relay.emit(2, "cron_executed", {
-                                "name": ctask["name"],
-                                "prompt": action[:200],
-                                "response": (resp or "")[:200],
-                            })
-                        elif callable(action):
-                            if asyncio.iscoroutinefunction(action):
-                                await action()
-                            else:
-                                action()
-                    except asyncio.TimeoutError:
-                        logger.error(f"Cron task {ctask['name']} timed out")
-                        await self.core.log(f"Cron task timed out: {ctask['name']}", priority=1)
-                    except Exception as e:
-                        logger.error(f"Cron task {ctask['name']} failed: {e}")
-                        await self.core.log(f"Cron task failed: {ctask['name']} - {e}", priority=1)
-
-            await asyncio.sleep(1)
+        try:
+            logger.info(f"Running cron task: {job['name']}")
+            action = job["action"]
+            if isinstance(action, str):
+                # AI prompt — process through gateway
+                resp = await asyncio.wait_for(
+                    self.core.gateway.speak(action, chat_id=f"cron:{job['name']}"),
+                    timeout=120.0
+                )
+                await self.core.relay.emit(2, "cron_executed", {
+                    "name": job["name"],
+                    "prompt": action[:200],
+                    "response": (resp or "")[:200],
+                })
+            elif callable(action):
+                if asyncio.iscoroutinefunction(action):
+                    await action()
+                else:
+                    action()
+            return True
+        except asyncio.TimeoutError:
+            logger.error(f"Cron task {job['name']} timed out")
+            await self.core.log(f"Cron task timed out: {job['name']}", priority=1)
+        except Exception as e:
+            logger.error(f"Cron task {job['name']} failed: {e}")
+            await self.core.log(f"Cron task failed: {job['name']} - {e}", priority=1)
+        return False
 
     async def stop(self):
         self.running = False
+        self._wakeup.set()
+
+    def get_status(self):
+        """Per-job schedule and run statistics (drift, duration, skips)."""
+        jobs = []
+        for t in self.tasks + self.cron_tasks:
+            jobs.append({
+                "name": t["name"],
+                "kind": "cron" if t["kind"] == "cron" else ("recurring" if t["interval"] > 0 else "one-shot"),
+                "schedule": t.get("cron_expr") or f"every {t['interval']}s",
+                "overlap": t["overlap"],
+                "next_run": t["next_run"],
+                "active_runs": t["_active"],
+                **t["stats"],
+            })
+        return {"running": self.running, "max_concurrent": self.max_concurrent,
+                "in_flight": len(self._inflight), "jobs": jobs}
 
     # ── Gateway tool definitions ─────────────────────────────────────
 
@@ -252,6 +426,7 @@ class GalacticScheduler:
                     "name": {"type": "string", "description": "Task name"},
                     "cron": {"type": "string", "description": "Cron expression (minute hour day month weekday)"},
                     "prompt": {"type": "string", "description": "AI prompt to execute on schedule"},
+                    "overlap": {"type": "string", "description": "If still running when due again: skip (default), queue, or parallel"},
                 },
                 "fn": self._tool_schedule_task
             },
@@ -269,9 +444,12 @@ class GalacticScheduler:
             }
         }
 
-    async def _tool_schedule_task(self, name, cron, prompt, **kw):
+    async def _tool_schedule_task(self, name, cron, prompt, overlap="skip", **kw):
         """Gateway tool: schedule a cron task."""
-        await self.add_cron(name, cron, prompt, persist=True)
+        try:
+            await self.add_cron(name, cron, prompt, persist=True, overlap=overlap)
+        except ValueError as e:
+            return f"[ERROR] {e}"
         return f"Scheduled cron task '{name}' with expression '{cron}'."
 
     async def _tool_list_tasks(self, **kw):
@@ -279,25 +457,36 @@ class GalacticScheduler:
         lines = []
         for t in self.tasks:
             kind = "recurring" if t["interval"] > 0 else "one-shot"
-            lines.append(f"[{kind}] {t['name']} — every {t['interval']}s")
+            lines.append(f"[{kind}] {t['name']} — every {t['interval']}s{self._fmt_stats(t)}")
         for t in self.cron_tasks:
             action_desc = t["action"][:80] if isinstance(t["action"], str) else "(callable)"
-            lines.append(f"[cron] {t['name']} — {t['cron_expr']} — {action_desc}")
+            lines.append(f"[cron] {t['name']} — {t['cron_expr']} — {action_desc}{self._fmt_stats(t)}")
         if not lines:
             return "No scheduled tasks."
         return "\n".join(lines)
 
+    @staticmethod
+    def _fmt_stats(t):
+        s = t["stats"]
+        if not s["runs"] and not s["skipped"]:
+            return ""
+        return (f" (runs: {s['runs']}, failed: {s['failures']}, skipped: {s['skipped']}, "
+                f"avg {s['avg_duration']:.1f}s, drift {s['last_drift']:.2f}s)")
+
     async def _tool_remove_task(self, name, **kw):
         """Gateway tool: remove a task by name."""
         # Try interval tasks
         for t in list(self.tasks):
             if t["name"] == name:
                 self.tasks.remove(t)
+                self._forget(t)
                 return f"Removed interval task '{name}'."
         # Try cron tasks
-        before = len(self.cron_tasks)
+        removed = [t for t in self.cron_tasks if t["name"] == name]
+        for t in removed:
+            self._forget(t)
         self.cron_tasks = [t for t in self.cron_tasks if t["name"] != name]
-        if len(self.cron_tasks) < before:
+        if removed:
             self._save_cron_tasks()
             return f"Removed cron task '{name}'."
         return f"No task found with name '{name}'."
@@ -0,0 +1,270 @@
+"""
+Local IMAP stand-in for exercising GmailBridge without Gmail.
+
+Speaks just enough IMAP4rev1 for the bridge: LOGIN, CAPABILITY (IDLE, and
+CONDSTORE only after login as Gmail does), SELECT/EXAMINE, STATUS, (UID)
+SEARCH, (UID) FETCH with BODY.PEEK[...] partials, IDLE/DONE, NOOP and
+LOGOUT. Plain TCP, one in-memory INBOX; a new message is delivered every
+--every seconds and pushed to idling clients as "* n EXISTS".
+
+    python scripts/imap_standin.py --port 1143 --every 20
+
+Then point the bridge at it in config.yaml:
+
+    gmail:
+      email: test@example.com
+      app_password: anything
+      imap_host: 127.0.0.1
+      imap_port: 1143
+      imap_ssl: false
+"""
+import argparse
+import asyncio
+import email.utils
+import re
+import time
+
+CAPABILITIES = "IMAP4rev1 IDLE CONDSTORE UIDPLUS"
+# Like Gmail, CONDSTORE is only advertised once logged in
+PRELOGIN_CAPABILITIES = "IMAP4rev1 IDLE UIDPLUS"
+
+
+def sample_message(n, attachment_kb=64):
+    """A multipart message with a text body and a binary attachment."""
+    boundary = f"standin-{n}"
+    body = "\r\n".join(f"Line {i} of message {n}. " * 4 for i in range(40))
+    blob = ("QUJD" * (attachment_kb * 64))  # base64 filler
+    return (
+        f"From: Stand-in Sender <sender{n}@example.com>\r\n"
+        f"To: test@example.com\r\n"
+        f"Subject: Stand-in message #{n}\r\n"
+        f"Date: {email.utils.formatdate(localtime=True)}\r\n"
+        f"Message-ID: <standin-{n}-{int(time.time())}@localhost>\r\n"
+        f"MIME-Version: 1.0\r\n"
+        f"Content-Type: multipart/mixed; boundary=\"{boundary}\"\r\n"
+        f"\r\n"
+        f"--{boundary}\r\n"
+        f"Content-Type: text/plain; charset=utf-8\r\n\r\n{body}\r\n"
+        f"--{boundary}\r\n"
+        f"Content-Type: application/octet-stream\r\n"
+        f"Content-Disposition: attachment; filename=\"data-{n}.bin\"\r\n"
+        f"Content-Transfer-Encoding: base64\r\n\r\n{blob}\r\n"
+        f"--{boundary}--\r\n"
+    ).encode()
+
+
+class Mailbox:
+    def __init__(self):
+        self.uidvalidity = int(time.time())
+        self.uidnext = 1
+        self.modseq = 1
+        self.messages = []      # dicts: uid, flags(set), raw, modseq
+        self.idlers = set()     # writers currently in IDLE
+
+    def deliver(self, raw, flags=()):
+        self.modseq += 1
+        self.messages.append({"uid": self.uidnext, "flags": set(flags), "raw": raw, "modseq": self.modseq})
+        self.uidnext += 1
+        for w in list(self.idlers):
+            try:
+                w.write(f"* {len(self.messages)} EXISTS\r\n".encode())
+            except Exception:
+                self.idlers.discard(w)
+
+    def resolve(self, spec, by_uid):
+        """Sequence-set -> list of (seq, msg)."""
+        if not self.messages:
+            return []
+        top = self.messages[-1]["uid"] if by_uid else len(self.messages)
+        wanted = set()
+        for piece in spec.split(","):
+            if ":" in piece:
+                a, b = piece.split(":")
+                a = top if a == "*" else int(a)
+                b = top if b == "*" else int(b)
+                lo, hi = min(a, b), max(a, b)
+                wanted.update(range(lo, hi + 1))
+            else:
+                wanted.add(top if piece == "*" else int(piece))
+        out = []
+        for seq, m in enumerate(self.messages, 1):
+            if (m["uid"] if by_uid else seq) in wanted:
+                out.append((seq, m))
+        return out
+
+
+def split_raw(raw):
+    idx = raw.find(b"\r\n\r\n")
+    return (raw, b"") if idx == -1 else (raw[:idx + 4], raw[idx + 4:])
+
+
+class Session:
+    def __init__(self, box, reader, writer, user, password):
+        self.box, self.reader, self.writer = box, reader, writer
+        self.user, self.password = user, password
+        self.authed = False
+
+    def send(self, data):
+        self.writer.write(data if isinstance(data, bytes) else data.encode())
+
+    async def run(self):
+        self.send(f"* OK [CAPABILITY {PRELOGIN_CAPABILITIES}] IMAP stand-in ready\r\n")
+        try:
+            while True:
+                raw = await self.reader.readline()
+                if not raw:
+                    return
+                line = raw.decode(errors="replace").rstrip("\r\n")
+                if not line:
+                    continue
+                tag, _, rest = line.partition(" ")
+                cmd, _, args = rest.partition(" ")
+                handler = getattr(self, "cmd_" + cmd.upper(), None)
+                if handler is None:
+                    self.send(f"{tag} BAD unknown command {cmd}\r\n")
+                elif await handler(tag, args) is False:
+                    return
+                await self.writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.box.idlers.discard(self.writer)
+            self.writer.close()
+
+    async def cmd_CAPABILITY(self, tag, args):
+        caps = CAPABILITIES if self.authed else PRELOGIN_CAPABILITIES
+        self.send(f"* CAPABILITY {caps}\r\n{tag} OK CAPABILITY completed\r\n")
+
+    async def cmd_LOGIN(self, tag, args):
+        parts = re.findall(r'"((?:[^"\\]|\\.)*)"|(\S+)', args)
+        creds = [(a or b).replace('\\"', '"').replace("\\\\", "\\") for a, b in parts]
+        if self.password and creds[1:2] != [self.password]:
+            self.send(f"{tag} NO [AUTHENTICATIONFAILED] bad credentials\r\n")
+            return
+        self.authed = True
+        self.send(f"{tag} OK [CAPABILITY {CAPABILITIES}] LOGIN completed\r\n")
+
+    async def cmd_NOOP(self, tag, args):
+        self.send(f"{tag} OK NOOP completed\r\n")
+
+    async def cmd_LOGOUT(self, tag, args):
+        self.send(f"* BYE stand-in logging out\r\n{tag} OK LOGOUT completed\r\n")
+        await self.writer.drain()
+        return False
+
+    async def cmd_SELECT(self, tag, args, mode="READ-WRITE"):
+        b = self.box
+        unseen = sum(1 for m in b.messages if "\\Seen" not in m["flags"])
+        self.send(
+            f"* FLAGS (\\Answered \\Flagged \\Deleted \\Seen \\Draft)\r\n"
+            f"* {len(b.messages)} EXISTS\r\n* 0 RECENT\r\n"
+            f"* OK [UNSEEN {unseen}] unseen\r\n"
+            f"* OK [UIDVALIDITY {b.uidvalidity}] UIDs valid\r\n"
+            f"* OK [UIDNEXT {b.uidnext}] next UID\r\n"
+            f"* OK [HIGHESTMODSEQ {b.modseq}] modseq\r\n"
+            f"{tag} OK [{mode}] SELECT completed\r\n")
+
+    async def cmd_EXAMINE(self, tag, args):
+        await self.cmd_SELECT(tag, args, mode="READ-ONLY")
+
+    async def cmd_STATUS(self, tag, args):
+        b = self.box
+        unseen = sum(1 for m in b.messages if "\\Seen" not in m["flags"])
+        self.send(f'* STATUS "INBOX" (MESSAGES {len(b.messages)} UIDNEXT {b.uidnext} '
+                  f'UIDVALIDITY {b.uidvalidity} UNSEEN {unseen} HIGHESTMODSEQ {b.modseq})\r\n'
+                  f"{tag} OK STATUS completed\r\n")
+
+    async def cmd_IDLE(self, tag, args):
+        self.send("+ idling\r\n")
+        await self.writer.drain()
+        self.box.idlers.add(self.writer)
+        try:
+            while True:
+                raw = await self.reader.readline()
+                if not raw:
+                    return False
+                if raw.strip().upper() == b"DONE":
+                    break
+        finally:
+            self.box.idlers.discard(self.writer)
+        self.send(f"{tag} OK IDLE terminated\r\n")
+
+    async def cmd_UID(self, tag, args):
+        sub, _, rest = args.partition(" ")
+        if sub.upper() == "SEARCH":
+            return await self.cmd_SEARCH(tag, rest, by_uid=True)
+        if sub.upper() == "FETCH":
+            return await self.cmd_FETCH(tag, rest, by_uid=True)
+        self.send(f"{tag} BAD unsupported UID {sub}\r\n")
+
+    async def cmd_SEARCH(self, tag, args, by_uid=False):
+        crit = args.strip().upper()
+        m = re.match(r"^(?:CHARSET \S+ )?UID (\S+)$", crit)
+        if m:
+            hits = self.box.resolve(m.group(1), by_uid=True)
+        elif crit == "UNSEEN":
+            hits = [(s, msg) for s, msg in enumerate(self.box.messages, 1) if "\\Seen" not in msg["flags"]]
+        else:  # ALL and anything we don't model
+            hits = list(enumerate(self.box.messages, 1))
+        ids = " ".join(str(msg["uid"] if by_uid else s) for s, msg in hits)
+        self.send(f"* SEARCH {ids}\r\n{tag} OK SEARCH completed\r\n".replace("SEARCH \r\n", "SEARCH\r\n"))
+
+    async def cmd_FETCH(self, tag, args, by_uid=False):
+        spec, _, items = args.partition(" ")
+        items = items.strip().upper()
+        for seq, m in self.box.resolve(spec, by_uid):
+            header, text = split_raw(m["raw"])
+            out = [b"* %d FETCH (UID %d" % (seq, m["uid"])]
+            if "FLAGS" in items:
+                out.append(b" FLAGS (%s)" % " ".join(sorted(m["flags"])).encode())
+            if "RFC822.SIZE" in items:
+                out.append(b" RFC822.SIZE %d" % len(m["raw"]))
+            sections = re.findall(r"(BODY(?:\.PEEK)?\[([A-Z.]*)\](?:<(\d+)\.(\d+)>)?|RFC822(?!\.))", items)
+            for full, section, start, length in sections:
+                if full == "RFC822":
+                    data, name = m["raw"], "RFC822"
+                else:
+                    data = {"HEADER": header, "TEXT": text}.get(section, m["raw"])
+                    name = f"BODY[{section}]"
+                    if start:
+                        data = data[int(start):int(start) + int(length)]
+                        name += f"<{start}>"
+                if full == "RFC822" or ".PEEK" not in full:
+                    m["flags"].add("\\Seen")
+                out.append(b" %s {%d}\r\n" % (name.encode(), len(data)) + data)
+            out.append(b")\r\n")
+            self.send(b"".join(out))
+        self.send(f"{tag} OK FETCH completed\r\n")
+
+
+async def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=1143)
+    ap.add_argument("--user", default="")
+    ap.add_argument("--password", default="", help="require this password (default: accept any)")
+    ap.add_argument("--seed", type=int, default=3, help="messages already in the INBOX at start (marked read)")
+    ap.add_argument("--every", type=float, default=30.0, help="deliver a new message every N seconds (0 = never)")
+    args = ap.parse_args()
+
+    box = Mailbox()
+    for n in range(1, args.seed + 1):
+        box.deliver(sample_message(n), flags=("\\Seen",))
+
+    async def handle(reader, writer):
+        await Session(box, reader, writer, args.user, args.password).run()
+
+    server = await asyncio.start_server(handle, args.host, args.port)
+    print(f"IMAP stand-in on {args.host}:{args.port} ({len(box.messages)} seeded messages)")
+    async with server:
+        n = args.seed
+        while args.every > 0:
+            await asyncio.sleep(args.every)
+            n += 1
+            box.deliver(sample_message(n))
+            print(f"delivered message #{n} (uid {box.uidnext - 1})")
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+"""
+Replay Meta-shaped WhatsApp webhook payloads against the bridge.
+
+Offline (default): drives WhatsAppBridge.ingest() in-process with a stub
+gateway and a stub Graph API that just records outbound messages, then
+prints the ingress stats and the order in which messages were answered.
+
+    python scripts/whatsapp_replay.py --senders 4 --messages 8 --chatty 40 --redeliver 0.3
+
+Live: POST the same payloads to a running webhook (signed when --secret is
+given, exactly as Meta does with X-Hub-Signature-256).
+
+    python scripts/whatsapp_replay.py --url http://127.0.0.1:17789/webhook/whatsapp --secret s3cret
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import hmac
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+ADMIN = "15550000000"
+
+
+def make_payload(sender, text, msg_id, name="Replay"):
+    """One Cloud API webhook body carrying a single text message."""
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": "0",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "metadata": {"display_phone_number": "15550001111", "phone_number_id": "replay"},
+                    "contacts": [{"profile": {"name": name}, "wa_id": sender}],
+                    "messages": [{
+                        "from": sender,
+                        "id": msg_id,
+                        "timestamp": str(int(time.time())),
+                        "type": "text",
+                        "text": {"body": text},
+                    }],
+                },
+            }],
+        }],
+    }
+
+
+def build_traffic(args):
+    """Payloads for --senders numbers, one --chatty sender, with redeliveries mixed in."""
+    senders = [ADMIN] + [f"1555{i:07d}" for i in range(1, args.senders)]
+    payloads = []
+    for s_idx, sender in enumerate(senders):
+        count = args.chatty if (s_idx == 0 and args.chatty) else args.messages
+        for n in range(count):
+            payloads.append(make_payload(sender, f"msg {n} from {sender}", f"wamid.{sender}.{n}"))
+    rng = random.Random(args.seed)
+    rng.shuffle(payloads)
+    redelivered = [p for p in payloads if rng.random() < args.redeliver]
+    return payloads + redelivered, len(redelivered)
+
+
+class StubCore:
+    """Just enough of GalacticCore for the bridge: config, log, relay and a slow echo gateway."""
+
+    def __init__(self, args):
+        self.config = {'whatsapp': {
+            'phone_number_id': 'replay', 'admin_phone_number': '',
+            'ingress_max': args.ingress_max, 'ingress_workers': args.workers,
+            'ingress_per_sender': args.per_sender, 'stream_replies': False,
+        }}
+        self.relay = self
+        self.gateway = self
+        self.llm = type('LLM', (), {'provider': 'stub', 'model': 'echo'})()
+        self.speak_delay = args.speak_delay
+        self.concurrent = 0
+        self.peak = 0
+
+    async def log(self, message, priority=3, component=None):
+        if priority <= 1:
+            print(f"[log] {message}")
+
+    async def emit(self, priority, msg_type, data):
+        pass
+
+    @contextlib.contextmanager
+    def stream_to(self, sink):
+        yield sink
+
+    async def speak(self, text, chat_id=None):
+        self.concurrent += 1
+        self.peak = max(self.peak, self.concurrent)
+        try:
+            await asyncio.sleep(self.speak_delay)
+            return f"echo: {text}"
+        finally:
+            self.concurrent -= 1
+
+
+async def replay_offline(args):
+    from whatsapp_bridge import WhatsAppBridge
+
+    answered = []
+
+    class StubGraphBridge(WhatsAppBridge):
+        # Everyone is "authorized" and nothing leaves the machine
+        def _is_authorized(self, phone_number):
+            return True
+
+        async def send_message(self, to, text):
+            answered.append((to, text))
+
+        async def send_typing(self, to):
+            pass
+
+        async def keep_typing(self, to):
+            pass
+
+    core = StubCore(args)
+    bridge = StubGraphBridge(core)
+    payloads, redelivered = build_traffic(args)
+    refused = 0
+    started = time.monotonic()
+    for payload in payloads:
+        if not bridge.ingest(payload):
+            refused += 1
+    while bridge._pending_count or bridge._busy:
+        await asyncio.sleep(0.01)
+    elapsed = time.monotonic() - started
+
+    print(f"payloads: {len(payloads)} ({redelivered} redeliveries), refused with 503: {refused}")
+    print(f"answered: {len(answered)} in {elapsed:.2f}s, peak concurrent speak(): {core.peak}")
+    print("first 12 replies (sender order shows round-robin fairness):")
+    for to, _ in answered[:12]:
+        print(f"  -> {to}")
+    print(json.dumps(bridge.get_ingress_stats(), indent=2))
+
+
+async def replay_live(args):
+    import httpx
+
+    payloads, redelivered = build_traffic(args)
+    codes = {}
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        for payload in payloads:
+            body = json.dumps(payload).encode()
+            headers = {"Content-Type": "application/json"}
+            if args.secret:
+                sig = hmac.new(args.secret.encode(), body, hashlib.sha256).hexdigest()
+                headers["X-Hub-Signature-256"] = f"sha256={sig}"
+            r = await client.post(args.url, content=body, headers=headers)
+            codes[r.status_code] = codes.get(r.status_code, 0) + 1
+    print(f"posted {len(payloads)} payloads ({redelivered} redeliveries) to {args.url}: {codes}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--url', help="POST to a running webhook instead of replaying in-process")
+    ap.add_argument('--secret', default='', help="webhook_secret used to sign live payloads")
+    ap.add_argument('--senders', type=int, default=4)
+    ap.add_argument('--messages', type=int, default=5, help="messages per sender")
+    ap.add_argument('--chatty', type=int, default=30, help="messages from the first (chatty) sender")
+    ap.add_argument('--redeliver', type=float, default=0.25, help="fraction of payloads sent twice")
+    ap.add_argument('--speak-delay', type=float, default=0.05)
+    ap.add_argument('--workers', type=int, default=4)
+    ap.add_argument('--ingress-max', type=int, default=200)
+    ap.add_argument('--per-sender', type=int, default=20)
+    ap.add_argument('--seed', type=int, default=7)
+    args = ap.parse_args()
+    asyncio.run(replay_live(args) if args.url else replay_offline(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Galactic AI — lazy, parallel skill loading.
+
+load_skills() used to import every core and community skill one after another
+and call get_tools() on each, although most sessions only touch a handful.
+
+Each skill's metadata and tool schemas are now cached in a manifest
+(<paths.logs>/skill_manifest.json, invalidated by the module's source
+mtime/size). At startup a skill with a valid entry is represented by a
+LazySkill: its tools are registered as stubs, and the module is imported
+and on_load() awaited only when one of those tools is first called (or
+something reaches for an attribute the manifest doesn't carry).
+
+Skills that need their background run() (GalacticSkill.background_run) and
+skills without a manifest entry load at startup, concurrently: module imports
+run in worker threads, construction and on_load() back on the event loop.
+"""
+import asyncio
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import time
+import traceback
+
+MANIFEST_VERSION = 1
+
+# Class attributes served from the manifest without importing the skill
+META_ATTRS = ('skill_name', 'display_name', 'version', 'author', 'description',
+              'category', 'icon', 'name')
+
+
+def _source_stamp(module_path):
+    spec = importlib.util.find_spec(module_path)
+    if spec is None or not spec.origin or not os.path.exists(spec.origin):
+        return None
+    st = os.stat(spec.origin)
+    return [spec.origin, st.st_mtime_ns, st.st_size]
+
+
+def _background_flag(cls):
+    from skills.base import GalacticSkill
+    flag = getattr(cls, 'background_run', None)
+    if flag is None:
+        flag = cls.run is not GalacticSkill.run or cls.on_load is not GalacticSkill.on_load
+    return flag
+
+
+def _background_enabled(flag, config):
+    if isinstance(flag, str):
+        section, _, key = flag.partition('.')
+        return bool((config.get(section, {}) or {}).get(key, False))
+    return bool(flag)
+
+
+class LazySkill:
+    """Stand-in for a skill whose module has not been imported yet."""
+
+    def __init__(self, loader, module_path, class_name, is_core, entry):
+        d = self.__dict__
+        d['_loader'] = loader
+        d['_skill'] = None
+        d['_stubs'] = {}
+        d['module_path'] = module_path
+        d['class_name'] = class_name
+        d['entry'] = entry
+        for attr, value in entry['meta'].items():
+            d[attr] = value
+        d['is_core'] = is_core
+        d['enabled'] = True
+
+    @property
+    def loaded(self):
+        return self._skill is not None
+
+    def get_tools(self):
+        if self._skill is not None:
+            return self._skill.get_tools()
+        tools = {}
+        for tool_name, schema in self.entry['tools'].items():
+            if tool_name not in self._stubs:
+                self._stubs[tool_name] = self._stub(tool_name)
+            tools[tool_name] = {**schema, 'fn': self._stubs[tool_name]}
+        return tools
+
+    def _stub(self, tool_name):
+        async def _lazy_tool(args):
+            skill = await self._loader.ensure_loaded(self)
+            if skill is None:
+                return f"[ERROR] Skill '{self.skill_name}' failed to load."
+            tool = skill.get_tools().get(tool_name)
+            if not tool:
+                return f"[ERROR] Tool '{tool_name}' is no longer provided by skill '{self.skill_name}'."
+            return await tool['fn'](args)
+        _lazy_tool._lazy_stub = True
+        return _lazy_tool
+
+    async def on_unload(self):
+        if self._skill is not None:
+            await self._skill.on_unload()
+
+    def __getattr__(self, attr):
+        # Only reached for attributes the manifest doesn't carry
+        if attr.startswith('__') or attr in META_ATTRS:
+            raise AttributeError(attr)
+        skill = self._skill or self._loader.load_now(self)
+        if skill is None:
+            raise AttributeError(attr)
+        return getattr(skill, attr)
+
+    def __setattr__(self, attr, value):
+        # Manifest meta, is_core and enabled live on the stand-in (enabled is copied over on
+        # load); anything else is state the real skill must see, so load it first.
+        if self._skill is None and attr not in self.__dict__:
+            if self._loader.load_now(self) is None:
+                raise AttributeError(f"Skill '{self.skill_name}' failed to load; cannot set {attr}")
+        if self._skill is not None:
+            setattr(self._skill, attr, value)
+        if attr in self.__dict__:
+            self.__dict__[attr] = value
+
+    def __repr__(self):
+        state = "loaded" if self._skill is not None else "deferred"
+        return f"<LazySkill {self.module_path}.{self.class_name} ({state})>"
+
+
+class SkillLoader:
+    """Builds core.skills from the manifest, loading skills eagerly or on first use."""
+
+    def __init__(self, core):
+        self.core = core
+        logs_dir = core.config.get('paths', {}).get('logs', './logs')
+        self.path = os.path.join(logs_dir, 'skill_manifest.json')
+        self.manifest = self._read()
+        self.instances = {}     # "module:Class" -> loaded skill
+        self.proxies = {}       # "module:Class" -> LazySkill (reused across load_skills() calls)
+        self.load_ms = {}       # "module:Class" -> import + init + on_load time
+        self._pending = {}      # "module:Class" -> asyncio.Task (on-demand loads)
+        self._runs = set()      # id(skill) whose run() task was started
+        self.loop = None        # event loop load_all() ran on (for loads from worker threads)
+
+    # ── Manifest ──────────────────────────────────────────────────────
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION and data.get('base') == _source_stamp('skills.base'):
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[Skill] Ignoring unreadable manifest {self.path}: {e}")
+        return {'version': MANIFEST_VERSION, 'base': _source_stamp('skills.base'), 'skills': {}}
+
+    def _write(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"[Skill] Could not write {self.path}: {e}")
+
+    def _valid_entry(self, key, module_path):
+        entry = self.manifest['skills'].get(key)
+        if entry and entry.get('source') == _source_stamp(module_path):
+            return entry
+        return None
+
+    def _record(self, key, module_path, skill):
+        cls = type(skill)
+        meta = {a: getattr(cls, a) for a in META_ATTRS if hasattr(cls, a)}
+        try:
+            tools = {name: {k: v for k, v in spec.items() if k != 'fn'}
+                     for name, spec in skill.get_tools().items()}
+            json.dumps([meta, tools])
+        except Exception:
+            tools = None
+        if not tools:
+            # Not cacheable, or empty (often an optional dependency is missing and the
+            # skill offers no tools yet): always load eagerly so a later install is seen.
+            self.manifest['skills'].pop(key, None)
+            return
+        self.manifest['skills'][key] = {
+            'source': _source_stamp(module_path),
+            'meta': meta,
+            'tools': tools,
+            'background': _background_flag(cls),
+        }
+
+    # ── Loading ───────────────────────────────────────────────────────
+
+    async def load_all(self, specs):
+        """specs: [(module_path, class_name, is_core)] in registration order.
+        Returns the skill list (real skills and LazySkill stand-ins), order preserved."""
+        self.loop = asyncio.get_running_loop()
+        skills = [None] * len(specs)
+        eager = []
+        for i, (module_path, class_name, is_core) in enumerate(specs):
+            key = f"{module_path}:{class_name}"
+            if key in self.instances:
+                skills[i] = self.instances[key]
+                continue
+            entry = self._valid_entry(key, module_path)
+            if entry and not _background_enabled(entry['background'], self.core.config):
+                proxy = self.proxies.get(key)
+                if proxy is None or proxy.entry is not entry:
+                    proxy = self.proxies[key] = LazySkill(self, module_path, class_name, is_core, entry)
+                skills[i] = proxy
+            else:
+                eager.append(i)
+        results = await asyncio.gather(*(self._load(*specs[i]) for i in eager))
+        for i, skill in zip(eager, results):
+            skills[i] = skill
+        self._write()
+        return [s for s in skills if s is not None]
+
+    async def _load(self, module_path, class_name, is_core, proxy=None):
+        key = f"{module_path}:{class_name}"
+        started = time.perf_counter()
+        try:
+            if module_path in sys.modules:
+                mod = importlib.import_module(module_path)
+            else:
+                mod = await asyncio.to_thread(importlib.import_module, module_path)
+            if proxy is not None and proxy._skill is not None:
+                return proxy._skill   # a synchronous load won the race
+            skill = getattr(mod, class_name)(self.core)
+            skill.is_core = is_core
+        except ModuleNotFoundError as e:
+            print(f"[Skill] {class_name} missing dependency: {e} — skipping")
+            return None
+        except Exception as e:
+            print(f"[Skill] {class_name} failed to load: {e}")
+            traceback.print_exc()
+            return None
+        try:
+            await skill.on_load()
+        except Exception as e:
+            print(f"[Skill] {class_name} on_load failed: {e}")
+        self.load_ms[key] = round((time.perf_counter() - started) * 1000, 1)
+        self.instances[key] = skill
+        self._record(key, module_path, skill)
+        return skill
+
+    async def ensure_loaded(self, proxy):
+        """Load a deferred skill (once, shared by concurrent callers) and swap it in."""
+        if proxy._skill is not None:
+            return proxy._skill
+        key = f"{proxy.module_path}:{proxy.class_name}"
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(proxy.module_path, proxy.class_name, proxy.is_core, proxy))
+            self._pending[key] = task
+        try:
+            skill = await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._pending.pop(key, None)
+        if skill is not None and proxy._skill is None:
+            await self._activate(proxy, skill)
+            self._write()
+        return proxy._skill
+
+    def load_now(self, proxy):
+        """Synchronous fallback for attribute access on a deferred skill, from the event loop or a
+        worker thread. on_load() and the swap into core.skills/gateway.tools are scheduled on the loop."""
+        if proxy._skill is not None:
+            return proxy._skill
+        key = f"{proxy.module_path}:{proxy.class_name}"
+        started = time.perf_counter()
+        try:
+            mod = importlib.import_module(proxy.module_path)
+            skill = getattr(mod, proxy.class_name)(self.core)
+            skill.is_core = proxy.is_core
+        except Exception as e:
+            print(f"[Skill] {proxy.class_name} failed to load: {e}")
+            return None
+        self.load_ms[key] = round((time.perf_counter() - started) * 1000, 1)
+        self.instances[key] = skill
+        self._record(key, proxy.module_path, skill)
+        proxy.__dict__['_skill'] = skill
+        try:
+            asyncio.get_running_loop().create_task(self._activate(proxy, skill, run_on_load=True))
+        except RuntimeError:
+            # Worker thread (e.g. galactic_memory building the embedder asks gpu_offloader for a device)
+            if self.loop is not None and not self.loop.is_closed():
+                self.loop.call_soon_threadsafe(
+                    lambda: self.loop.create_task(self._activate(proxy, skill, run_on_load=True)))
+        return skill
+
+    async def _activate(self, proxy, skill, run_on_load=False):
+        """Swap the real skill in for its stand-in: lists, gateway tools, core.browser, run()."""
+        proxy.__dict__['_skill'] = skill
+        skill.enabled = proxy.enabled
+        if run_on_load:
+            try:
+                await skill.on_load()
+            except Exception as e:
+                print(f"[Skill] {proxy.class_name} on_load failed: {e}")
+        for seq in (getattr(self.core, 'skills', None), getattr(self.core, 'plugins', None)):
+            if seq is not None:
+                for i, s in enumerate(seq):
+                    if s is proxy:
+                        seq[i] = skill
+        gateway = getattr(self.core, 'gateway', None)
+        if gateway is not None and skill.enabled:
+            for tool_name, tool_def in skill.get_tools().items():
+                current = gateway.tools.get(tool_name)
+                if current is None or getattr(current.get('fn'), '_lazy_stub', False):
+                    gateway.tools[tool_name] = tool_def
+        if getattr(skill, 'skill_name', '') == 'browser_pro' and not getattr(self.core, 'browser', None):
+            self.core.browser = skill
+        self.start_run(skill)
+        key = f"{proxy.module_path}:{proxy.class_name}"
+        await self.core.log(f"🧩 Skill {skill.skill_name} loaded on demand in {self.load_ms.get(key, 0):.0f} ms", priority=3)
+
+    def start_run(self, skill):
+        """Start skill.run() once per skill instance."""
+        if isinstance(skill, LazySkill) or id(skill) in self._runs:
+            return
+        self._runs.add(id(skill))
+        asyncio.create_task(skill.run())
+
+    def get_status(self):
+        deferred = [s.skill_name for s in getattr(self.core, 'skills', []) if isinstance(s, LazySkill)]
+        return {
+            'loaded': len(self.instances),
+            'deferred': deferred,
+            'load_ms': dict(sorted(self.load_ms.items(), key=lambda kv: -kv[1])),
+        }
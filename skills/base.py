@@ -19,6 +19,10 @@ class GalacticSkill:
     category     = "general"          # browser, social, system, desktop, data, general
     icon         = "\u2699\ufe0f"
     is_core     = False              # Set by loader — True for skills/core/
+    # Whether the skill must be loaded at startup for its background run()/on_load().
+    # None = only if the subclass overrides run() or on_load(); False = load on first
+    # tool call; "section.key" = follow that boolean in config.yaml.
+    background_run = None
 
     def __init__(self, core):
         self.core = core
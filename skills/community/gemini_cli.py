@@ -52,6 +52,7 @@ class GeminiCLISkill(GalacticSkill):
     description = "Full integration of the Gemini CLI engineering agent and workflow."
     category    = "intelligence"
     icon        = "🛠️"
+    background_run = False   # run() is only a banner/keepalive; load on first tool call
 
     def get_tools(self):
         return {
@@ -18,6 +18,7 @@ class SeniorCoder(GalacticSkill):
     description  = "Senior-tier coding engine with interactive plan/apply stages."
     category     = "development"
     icon         = "💻"
+    background_run = False   # run() is only a banner/keepalive; load on first tool call
 
     def __init__(self, core):
         super().__init__(core)
@@ -1,7 +1,10 @@
 """Playwright browser automation skill for Galactic AI."""
 
 import asyncio
+import difflib
 import json
+import time
+from collections import deque
 from pathlib import Path
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 
@@ -10,14 +13,112 @@ from skills.base import GalacticSkill
 # Page state tracking (OpenClaw parity)
 pageStates = {}
 
-def ensurePageState(page):
-    """Ensure page has state tracking for console/errors/requests/responses (OpenClaw+ parity)."""
+# Default per-page capture budgets. Each BrowserProSkill copies them and applies
+# its config.yaml browser.capture_* overrides to the copy.
+BUFFER_LIMITS = {
+    "console_entries":  500,
+    "error_entries":    200,
+    "request_entries":  1000,
+    "log_bytes":        512 * 1024,        # per buffer (console / errors / requests)
+    "response_entries": 50,
+    "response_bytes":   2 * 1024 * 1024,   # all captured bodies on one page
+    "body_max_bytes":   100_000,           # a single captured body
+}
+
+
+def _entry_size(entry):
+    return sum(len(v) if isinstance(v, str) else 16 for v in entry.values())
+
+
+class PageBuffer:
+    """Ring buffer with an entry cap and a byte budget; oldest entries are evicted first."""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = deque()
+        self.bytes = 0
+        self.dropped = 0
+
+    def append(self, entry):
+        size = _entry_size(entry)
+        self.entries.append((entry, size))
+        self.bytes += size
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, old = self.entries.popleft()
+            self.bytes -= old
+            self.dropped += 1
+
+    def __iter__(self):
+        return (e for e, _ in self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.bytes, "dropped": self.dropped}
+
+
+class ResponseBuffer(PageBuffer):
+    """Captured response bodies keyed by URL (newest capture per URL wins)."""
+
+    def append(self, entry):
+        for i, (old, size) in enumerate(self.entries):
+            if old["url"] == entry["url"]:
+                del self.entries[i]
+                self.bytes -= size
+                break
+        super().append(entry)
+
+    def as_dict(self):
+        return {e["url"]: e for e in self}
+
+
+def _matches_capture(filters, url, content_type):
+    for f in filters:
+        if f.get("url_pattern") and f["url_pattern"] not in url:
+            continue
+        if f.get("content_type") and f["content_type"] not in content_type:
+            continue
+        return True
+    return False
+
+
+# Installed on demand in each document: bumps a counter on every DOM mutation so
+# snapshot() can tell whether anything changed since the last one. The random id
+# changes on navigation (new document), the scroll/viewport part invalidates coords.
+DOM_VERSION_JS = """() => {
+    if (!window.__galacticDom) {
+        window.__galacticDom = {id: Math.random().toString(36).slice(2), v: 0};
+        const bump = () => { window.__galacticDom.v++; };
+        new MutationObserver(bump).observe(document, {
+            subtree: true, childList: true, attributes: true, characterData: true
+        });
+        // Typing/filling changes .value and .checked without any DOM mutation
+        document.addEventListener('input', bump, true);
+        document.addEventListener('change', bump, true);
+    }
+    const d = window.__galacticDom;
+    return `${d.id}:${d.v}:${Math.round(scrollX)},${Math.round(scrollY)}:${innerWidth}x${innerHeight}`;
+}"""
+
+
+def ensurePageState(page, limits=None):
+    """Ensure page has state tracking for console/errors/requests/responses (OpenClaw+ parity).
+
+    Console, error and request logs are bounded ring buffers sized by limits
+    (default BUFFER_LIMITS). Response bodies are only fetched while a capture
+    filter is armed (browser_capture_responses).
+    """
     if page not in pageStates:
+        lim = limits or BUFFER_LIMITS
         state = {
-            "console": [],
-            "errors": [],
-            "requests": [],
-            "responses": {}   # url -> {status, headers, body, timestamp}
+            "console":   PageBuffer(lim["console_entries"], lim["log_bytes"]),
+            "errors":    PageBuffer(lim["error_entries"], lim["log_bytes"]),
+            "requests":  PageBuffer(lim["request_entries"], lim["log_bytes"]),
+            "responses": ResponseBuffer(lim["response_entries"], lim["response_bytes"]),
+            "capture":   [],   # armed filters: [{url_pattern, content_type}]
+            "limits":    lim,
         }
         pageStates[page] = state
 
@@ -41,24 +142,210 @@ def ensurePageState(page):
             "timestamp": str(asyncio.get_event_loop().time())
         }))
 
-        # Response body capture (async — best-effort)
+        # Response body capture (async — best-effort, only when a filter is armed)
         async def _capture_response(resp):
             try:
                 body_bytes = await resp.body()
-                state["responses"][resp.url] = {
+                state["responses"].append({
+                    "url": resp.url,
                     "status": resp.status,
                     "headers": dict(resp.headers),
-                    "body": body_bytes.decode('utf-8', errors='replace')[:100_000],
+                    "body": body_bytes[:lim["body_max_bytes"]].decode('utf-8', errors='replace'),
                     "timestamp": str(asyncio.get_event_loop().time())
-                }
+                })
             except Exception:
                 pass  # binary / closed responses are silently skipped
 
-        page.on("response", lambda resp: asyncio.create_task(_capture_response(resp)))
+        def _on_response(resp):
+            if state["capture"] and _matches_capture(
+                    state["capture"], resp.url, resp.headers.get("content-type", "")):
+                asyncio.create_task(_capture_response(resp))
+
+        page.on("response", _on_response)
+        page.on("close", lambda _: pageStates.pop(page, None))
 
     return pageStates[page]
 
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Request-blocking profiles applied per leased context (browser_set_profile).
+RESOURCE_PROFILES = {
+    "default": None,
+    "text":    {"block_types": {"image", "font", "media"}, "block_trackers": True},
+    "minimal": {"block_types": {"image", "font", "media", "stylesheet"}, "block_trackers": True},
+}
+TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "connect.facebook.com", "hotjar.com", "segment.io", "scorecardresearch.com",
+    "adservice.google.com", "quantserve.com", "criteo.com",
+)
+
+
+async def apply_resource_profile(context, profile):
+    """Install (or remove) request blocking on a context for the named profile."""
+    try:
+        await context.unroute("**/*")
+    except Exception:
+        pass
+    spec = RESOURCE_PROFILES.get(profile)
+    if not spec:
+        return
+
+    async def _block(route):
+        req = route.request
+        if req.resource_type in spec["block_types"] or (
+                spec["block_trackers"] and any(h in req.url for h in TRACKER_HOSTS)):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", _block)
+
+
+class BrowserContextPool:
+    """Pre-launched browser contexts leased to agent sessions and recycled on release.
+
+    Contexts share one browser process; each lease gets an isolated cookie jar and
+    page set. A context is reset (pages closed, cookies/permissions/routes cleared)
+    and returned to the idle list, or closed once it has served max_reuse leases.
+    """
+
+    def __init__(self, factory, size=4, warm=1, max_reuse=20, acquire_timeout=60):
+        self.factory = factory            # async () -> BrowserContext
+        self.size = max(1, size)
+        self.warm = min(warm, self.size)
+        self.max_reuse = max_reuse
+        self.acquire_timeout = acquire_timeout
+        self.idle = []
+        self.uses = {}                    # context -> leases served
+        self.in_use = 0
+        self._cond = asyncio.Condition()
+        self.stats = {"leases": 0, "reused": 0, "created": 0, "recycled": 0,
+                      "wait_total_s": 0.0, "wait_max_s": 0.0, "timeouts": 0}
+
+    async def _create(self):
+        ctx = await self.factory()
+        self.uses[ctx] = 0
+        self.stats["created"] += 1
+        return ctx
+
+    async def fill(self):
+        """Pre-launch contexts up to the warm target."""
+        while len(self.idle) + self.in_use < self.warm:
+            ctx = await self._create()
+            async with self._cond:
+                self.idle.append(ctx)
+                self._cond.notify()
+
+    async def acquire(self):
+        """Lease a context, waiting at most acquire_timeout seconds for one to free up."""
+        started = time.monotonic()
+        async with self._cond:
+            try:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: self.idle or self.in_use < self.size),
+                    timeout=self.acquire_timeout or None)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise TimeoutError(
+                    f"all {self.size} pooled browser contexts are busy (waited {self.acquire_timeout}s); "
+                    f"retry later or raise browser.pool_size") from None
+            self.in_use += 1
+            ctx = self.idle.pop() if self.idle else None
+        if ctx is None:
+            try:
+                ctx = await self._create()
+            except Exception:
+                async with self._cond:
+                    self.in_use -= 1
+                    self._cond.notify()
+                raise
+        else:
+            self.stats["reused"] += 1
+        waited = time.monotonic() - started
+        self.stats["leases"] += 1
+        self.stats["wait_total_s"] += waited
+        self.stats["wait_max_s"] = max(self.stats["wait_max_s"], waited)
+        self.uses[ctx] += 1
+        return ctx
+
+    async def release(self, ctx, reusable=True):
+        keep = reusable and self.uses.get(ctx, self.max_reuse) < self.max_reuse
+        if keep:
+            try:
+                for page in list(ctx.pages):
+                    await page.close()
+                await ctx.clear_cookies()
+                await ctx.clear_permissions()
+                await apply_resource_profile(ctx, "default")
+            except Exception:
+                keep = False
+        if not keep:
+            self.uses.pop(ctx, None)
+            self.stats["recycled"] += 1
+            try:
+                await ctx.close()
+            except Exception:
+                pass
+        async with self._cond:
+            self.in_use -= 1
+            if keep:
+                self.idle.append(ctx)
+            self._cond.notify()
+
+    async def close(self):
+        for ctx in self.idle:
+            try:
+                await ctx.close()
+            except Exception:
+                pass
+        self.idle.clear()
+        self.uses.clear()
+
+    def get_stats(self):
+        leases = self.stats["leases"]
+        return {
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.stats.items()},
+            "wait_avg_s": round(self.stats["wait_total_s"] / leases, 3) if leases else 0.0,
+            "in_use": self.in_use,
+            "idle": len(self.idle),
+            "size": self.size,
+        }
+
+
+class ContextLease:
+    """Browser state owned by one agent session (its context, pages and refs)."""
+
+    def __init__(self, session_id, context, profile="default"):
+        self.session_id = session_id
+        self.origin = context
+        self.profile = profile
+        self.last_used = time.monotonic()
+        self.state = {"context": context, "pages": {}, "active_page_id": None,
+                      "refs": {}, "snapshot_cache": {}}
+
+
+class _LeasedAttr:
+    """Skill attribute that resolves to the calling session's lease, else the shared value."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        lease = obj._current_lease()
+        return lease.state[self.name] if lease else obj.__dict__.get(self.name)
+
+    def __set__(self, obj, value):
+        lease = obj._current_lease()
+        if lease:
+            lease.state[self.name] = value
+        else:
+            obj.__dict__[self.name] = value
+
+
 class BrowserProSkill(GalacticSkill):
     skill_name   = "browser_pro"
     display_name = "Browser Pro"
@@ -67,9 +354,20 @@ class BrowserProSkill(GalacticSkill):
     description = "Full Playwright browser automation (55 tools)."
     category    = "browser"
     icon        = "\U0001f310"
+    background_run = "browser.warm_start"   # load at startup only for warm_start
     name        = "BrowserExecutorPro"  # compat with web_deck and galactic_core self.browser
 
+    # Per-session when a sub-agent holds a context lease; the main agent's otherwise.
+    context        = _LeasedAttr()
+    pages          = _LeasedAttr()
+    active_page_id = _LeasedAttr()
+    refs           = _LeasedAttr()
+    snapshot_cache = _LeasedAttr()
+
     def __init__(self, core):
+        self._leases = {}       # session_id -> ContextLease
+        self._lease_locks = {}
+        self.pool = None
         super().__init__(core)
         self.browser = None
         self.playwright = None
@@ -79,13 +377,111 @@ class BrowserProSkill(GalacticSkill):
         self.started = False
         self.default_timeout = 30000  # 30 seconds
         self.refs = {}  # Store ref mappings: {page_id: {ref: selector}}
+        self.snapshot_cache = {}  # page_id -> {dom_key, params, text, version}
+        self.snapshot_stats = {"full": 0, "cached": 0, "diff": 0}
+        browser_cfg = core.config.get('browser', {})
+        self.buffer_limits = dict(BUFFER_LIMITS)
+        for key in self.buffer_limits:
+            if f'capture_{key}' in browser_cfg:
+                self.buffer_limits[key] = int(browser_cfg[f'capture_{key}'])
+        self.pool_size = int(browser_cfg.get('pool_size', 4))
+        self.pool_warm = int(browser_cfg.get('pool_warm', 1))
+        self.pool_max_reuse = int(browser_cfg.get('pool_max_reuse', 20))
+        self.pool_profile = browser_cfg.get('pool_profile', 'default')
+        self.pool_acquire_timeout = float(browser_cfg.get('pool_acquire_timeout', 60))
+        self.lease_idle_seconds = browser_cfg.get('lease_idle_seconds', 300)
+        self.warm_start = browser_cfg.get('warm_start', False)
+
+    # ═══════════════════════════════════════════════════════════════════
+    # Context leases — sub-agent sessions get their own pooled context
+    # ═══════════════════════════════════════════════════════════════════
+
+    def _session_id(self):
+        # Only sub-agent sessions lease; the main agent (whose trace id changes every
+        # message) stays on the shared persistent context so page state survives turns.
+        gateway = getattr(self.core, 'gateway', None)
+        return getattr(gateway, 'isolated_session_id', None) if self.pool_size > 0 else None
+
+    def _current_lease(self):
+        leases = self.__dict__.get('_leases')
+        if not leases:
+            return None
+        lease = leases.get(self._session_id())
+        if lease:
+            lease.last_used = time.monotonic()
+        return lease
+
+    async def _ensure_lease(self):
+        """Lease a pooled context for the calling session on its first browser tool call."""
+        sid = self._session_id()
+        if not sid or sid in self._leases:
+            return
+        lock = self._lease_locks.setdefault(sid, asyncio.Lock())
+        async with lock:
+            if sid in self._leases:
+                return
+            if not self.started:
+                await self.start()
+            if not self.pool:
+                return
+            ctx = await self.pool.acquire()
+            lease = ContextLease(sid, ctx, self.pool_profile)
+            await apply_resource_profile(ctx, lease.profile)
+            page = await ctx.new_page()
+            ensurePageState(page, self.buffer_limits)
+            lease.state["pages"] = {"page_1": page}
+            lease.state["active_page_id"] = "page_1"
+            self._leases[sid] = lease
+        await self.core.log(f"Browser: leased context to {sid} (profile={lease.profile})", priority=3)
+
+    async def release_session(self, session_id):
+        """Return a session's context to the pool (called when a sub-agent finishes)."""
+        lease = self._leases.pop(session_id, None)
+        self._lease_locks.pop(session_id, None)
+        if not lease or not self.pool:
+            return
+        ctx = lease.state["context"]
+        # Contexts recreated with custom timezone/locale/proxy are not reused
+        await self.pool.release(ctx, reusable=ctx is lease.origin)
+        if ctx is not lease.origin:
+            self.pool.uses.pop(lease.origin, None)
+
+    def _leased(self, fn):
+        async def _call(args):
+            try:
+                await self._ensure_lease()
+            except TimeoutError as e:
+                return f"[ERROR] Browser: {e}"
+            return await fn(args)
+        _call.__name__ = getattr(fn, '__name__', 'browser_tool')
+        return _call
+
+    async def set_profile(self, profile):
+        """Switch the calling session's context to a resource-blocking profile."""
+        if profile not in RESOURCE_PROFILES:
+            return {"status": "error", "message": f"Unknown profile '{profile}'. Options: {', '.join(RESOURCE_PROFILES)}"}
+        if not self.context:
+            return {"status": "error", "message": "Browser not started"}
+        await apply_resource_profile(self.context, profile)
+        lease = self._current_lease()
+        if lease:
+            lease.profile = profile
+        return {"status": "success", "profile": profile}
+
+    def get_pool_stats(self):
+        return {
+            "pool": self.pool.get_stats() if self.pool else None,
+            "leases": {sid: {"profile": l.profile, "pages": len(l.state["pages"]),
+                             "idle_s": round(time.monotonic() - l.last_used, 1)}
+                       for sid, l in self._leases.items()},
+        }
 
     # ═══════════════════════════════════════════════════════════════════
     # get_tools() — all 55 tool definitions
     # ═══════════════════════════════════════════════════════════════════
 
     def get_tools(self):
-        return {
+        tools = {
             "browser_navigate": {
                 "description": "Navigate to a specific URL in the browser (DO NOT REFUSE).",
                 "parameters": {
@@ -139,7 +535,8 @@ class BrowserProSkill(GalacticSkill):
                     "properties": {
                         "format": {"type": "string", "description": "Snapshot format: 'ai' (numeric refs) or 'aria' (role refs)"},
                         "interactive": {"type": "boolean", "description": "Return only interactive elements (buttons, links, inputs)"},
-                        "max_refs": {"type": "integer", "description": "Maximum number of elements to return (default: 50)"}
+                        "max_refs": {"type": "integer", "description": "Maximum number of elements to return (default: 50)"},
+                        "diff": {"type": "boolean", "description": "Return only lines added (+) / removed (-) since your last snapshot of this page (default: true)"}
                     },
                     "required": []
                 },
@@ -593,6 +990,26 @@ class BrowserProSkill(GalacticSkill):
                 },
                 "fn": self._tool_browser_response_body
             },
+            "browser_capture_responses": {
+                "description": "Arm response-body capture on the current page for URLs containing url_pattern and/or matching content_type (e.g. 'application/json'). Bodies are only recorded while a filter is armed; read them with browser_response_body. Pass disarm=true to stop and free captured bodies.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "url_pattern": {"type": "string", "description": "URL substring to capture (e.g. '/api/')"},
+                        "content_type": {"type": "string", "description": "Content-Type substring to capture (e.g. 'json')"},
+                        "disarm": {"type": "boolean", "description": "Remove all filters and drop captured bodies"}
+                    }
+                },
+                "fn": self._tool_browser_capture_responses
+            },
+            "browser_buffer_stats": {
+                "description": "Show per-page memory used by console/error/network/response capture buffers.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {}
+                },
+                "fn": self._tool_browser_buffer_stats
+            },
             "browser_click_coords": {
                 "description": "Click at exact pixel coordinates (x, y). Use for canvas elements, maps, or when CSS selector-based clicking fails.",
                 "parameters": {
@@ -709,7 +1126,30 @@ class BrowserProSkill(GalacticSkill):
                 },
                 "fn": self._tool_browser_get_visual_snapshot
             },
+            "browser_set_profile": {
+                "description": "Set a request-blocking profile for your browser context: 'text' blocks images, fonts, media and trackers (fast text scraping), 'minimal' also blocks stylesheets, 'default' loads everything.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "profile": {"type": "string", "description": "default | text | minimal"}
+                    },
+                    "required": ["profile"]
+                },
+                "fn": self._tool_browser_set_profile
+            },
+            "browser_pool_stats": {
+                "description": "Show browser context pool usage: active leases, idle contexts, reuse count and lease wait times.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {}
+                },
+                "fn": self._tool_browser_pool_stats
+            },
         }
+        # Each sub-agent session gets its own pooled context on first use
+        for spec in tools.values():
+            spec["fn"] = self._leased(spec["fn"])
+        return tools
 
     # ═══════════════════════════════════════════════════════════════════
     # Tool handlers — 55 methods
@@ -810,9 +1250,17 @@ class BrowserProSkill(GalacticSkill):
         try:
             if not self.started:
                 return "[ERROR] Browser not started. Use browser_search or navigate to open the browser first."
-            result = await self.snapshot(format=format_type, interactive=interactive, max_refs=max_refs)
+            want_diff = args.get('diff', True)
+            result = await self.snapshot(format=format_type, interactive=interactive, max_refs=max_refs,
+                                         diff=want_diff)
             if result['status'] == 'success':
-                return f"[BROWSER SNAPSHOT - {format_type.upper()} format]\n{result['snapshot']}"
+                if result.get('unchanged') and want_diff:
+                    return (f"[BROWSER SNAPSHOT v{result['version']} - unchanged] Page has not changed since your "
+                            f"last snapshot; refs from v{result['version']} are still valid.")
+                if 'diff' in result:
+                    return (f"[BROWSER SNAPSHOT v{result['version']} - diff vs v{result['base_version']}] "
+                            f"Changed lines (+ added, - removed); all other refs are unchanged:\n{result['diff']}")
+                return f"[BROWSER SNAPSHOT v{result['version']} - {format_type.upper()} format]\n{result['snapshot']}"
             else:
                 return f"[ERROR] Snapshot failed: {result.get('message', 'Unknown error')}"
         except Exception as e:
@@ -1274,7 +1722,9 @@ class BrowserProSkill(GalacticSkill):
         if result['status'] == 'success':
             count = result['count']
             if count == 0:
-                return "[BROWSER] No response bodies captured yet. Navigate to a page first."
+                if not result.get('armed'):
+                    return "[BROWSER] Response capture is off. Arm it with browser_capture_responses, then reload or trigger the requests."
+                return "[BROWSER] No matching response bodies captured yet."
             lines = [f"[BROWSER] {count} response(s) captured:"]
             for url, resp in list(result['responses'].items())[:5]:
                 body_preview = resp.get('body', '')[:200]
@@ -1282,6 +1732,45 @@ class BrowserProSkill(GalacticSkill):
             return "\n".join(lines)
         return f"[ERROR] {result.get('message')}"
 
+    async def _tool_browser_capture_responses(self, args):
+        if not self.started:
+            return "[ERROR] Browser not started. Use browser_search or navigate to open the browser first."
+        url_pattern, content_type = args.get('url_pattern'), args.get('content_type')
+        disarm = bool(args.get('disarm'))
+        if not disarm and not (url_pattern or content_type):
+            return "[ERROR] Provide url_pattern and/or content_type (or disarm=true)."
+        result = await self.set_response_capture(url_pattern, content_type, disarm)
+        if result['status'] != 'success':
+            return f"[ERROR] {result.get('message')}"
+        if disarm:
+            return "[BROWSER] Response capture disarmed; captured bodies cleared."
+        return f"[BROWSER] Capturing responses matching: {json.dumps(result['filters'])}"
+
+    async def _tool_browser_set_profile(self, args):
+        if not self.started:
+            return "[ERROR] Browser not started. Use browser_search or navigate to open the browser first."
+        result = await self.set_profile(args.get('profile', 'default'))
+        if result['status'] == 'success':
+            return f"[BROWSER] Resource profile set: {result['profile']}"
+        return f"[ERROR] {result.get('message')}"
+
+    async def _tool_browser_pool_stats(self, args):
+        return "[BROWSER] " + json.dumps(self.get_pool_stats(), indent=2)
+
+    async def _tool_browser_buffer_stats(self, args):
+        stats = self.get_buffer_stats()
+        if not stats:
+            return "[BROWSER] No pages with capture state."
+        lines = ["[BROWSER] Capture buffer usage:"]
+        for page_id, st in stats.items():
+            lines.append(f"  {page_id} ({st['url'][:80]}): {st['total_bytes'] // 1024} KB")
+            for k in ("console", "errors", "requests", "responses"):
+                b = st[k]
+                lines.append(f"    {k}: {b['entries']} entries, {b['bytes'] // 1024} KB, {b['dropped']} dropped")
+            if st['capture_filters']:
+                lines.append(f"    capture filters: {json.dumps(st['capture_filters'])}")
+        return "\n".join(lines)
+
     async def _tool_browser_click_coords(self, args):
         if not self.started:
             return "[ERROR] Browser not started. Use browser_search or navigate to open the browser first."
@@ -1389,7 +1878,7 @@ class BrowserProSkill(GalacticSkill):
                 '--disable-web-security',
                 '--no-sandbox'
             ]
-            user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            user_agent = USER_AGENT
 
             if profile_path:
                 # Use launch_persistent_context for full persistence (cookies, cache, storage)
@@ -1417,6 +1906,13 @@ class BrowserProSkill(GalacticSkill):
                     no_viewport=True,
                     user_agent=user_agent
                 )
+                # Context pool for sub-agent sessions (shares this browser process)
+                if self.pool_size > 0:
+                    self.pool = BrowserContextPool(
+                        lambda: self.browser.new_context(no_viewport=True, user_agent=USER_AGENT),
+                        size=self.pool_size, warm=self.pool_warm, max_reuse=self.pool_max_reuse,
+                        acquire_timeout=self.pool_acquire_timeout)
+                    asyncio.create_task(self.pool.fill())
 
             # Create initial page (or use existing one if persistent context already has one)
             if self.context.pages:
@@ -1429,7 +1925,7 @@ class BrowserProSkill(GalacticSkill):
             self.active_page_id = page_id
 
             # Enable state tracking (OpenClaw parity)
-            ensurePageState(page)
+            ensurePageState(page, self.buffer_limits)
 
             self.started = True
             mode_str = "Persistent" if profile_path else "Transient"
@@ -1694,13 +2190,31 @@ class BrowserProSkill(GalacticSkill):
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    async def snapshot(self, format="ai", interactive=False, compact=False, depth=6, max_chars=15000, page_id=None, max_refs=50):
-        """Take accessibility snapshot of page for automation refs."""
+    async def snapshot(self, format="ai", interactive=False, compact=False, depth=6, max_chars=15000, page_id=None, max_refs=50, diff=False):
+        """Take accessibility snapshot of page for automation refs.
+
+        Snapshots are versioned per page by a MutationObserver counter: if the DOM,
+        scroll position and options are unchanged, the cached snapshot is returned
+        without re-walking the page. With diff=True a changed page returns only the
+        lines added/removed since the previous snapshot.
+        """
         try:
             page = self._get_page(page_id)
             if not page:
                 return {"status": "error", "message": "No page available"}
 
+            actual_page_id = page_id or self.active_page_id
+            params = (format, bool(interactive), compact, depth, max_chars, max_refs)
+            cached = self.snapshot_cache.get(actual_page_id)
+            try:
+                dom_key = await page.evaluate(DOM_VERSION_JS)
+            except Exception:
+                dom_key = None  # page mid-navigation — always take a full snapshot
+            if cached and dom_key and cached["dom_key"] == dom_key and cached["params"] == params:
+                self.snapshot_stats["cached"] += 1
+                return {"status": "success", "snapshot": cached["text"], "format": format,
+                        "version": cached["version"], "unchanged": True}
+
             if format == "aria" or interactive:
                 snapshot = await page.accessibility.snapshot(interesting_only=interactive)
 
@@ -1813,7 +2327,6 @@ class BrowserProSkill(GalacticSkill):
 
                 snapshot_text = snapshot_data['output']
 
-                actual_page_id = page_id or self.active_page_id
                 if actual_page_id:
                     ref_map = {}
                     for mapping in snapshot_data['mappings']:
@@ -1823,8 +2336,25 @@ class BrowserProSkill(GalacticSkill):
             if len(snapshot_text) > max_chars:
                 snapshot_text = snapshot_text[:max_chars] + "\n... (truncated)"
 
-            await self.core.log(f"Snapshot captured ({format} format)", priority=2)
-            return {"status": "success", "snapshot": snapshot_text, "format": format}
+            version = (cached["version"] + 1) if cached else 1
+            result = {"status": "success", "snapshot": snapshot_text, "format": format,
+                      "version": version, "unchanged": False}
+            if diff and cached and cached["params"] == params:
+                changes = [line for line in difflib.unified_diff(
+                    cached["text"].splitlines(), snapshot_text.splitlines(), lineterm="", n=0)
+                    if line[:1] in "+-" and not line.startswith(("+++", "---"))]
+                if len(changes) < len(snapshot_text.splitlines()):
+                    result["diff"] = "\n".join(changes)
+                    result["base_version"] = cached["version"]
+                    self.snapshot_stats["diff"] += 1
+            if "diff" not in result:
+                self.snapshot_stats["full"] += 1
+            if actual_page_id and dom_key:
+                self.snapshot_cache[actual_page_id] = {"dom_key": dom_key, "params": params,
+                                                       "text": snapshot_text, "version": version}
+
+            await self.core.log(f"Snapshot captured ({format} format, v{version})", priority=2)
+            return result
 
         except Exception as e:
             return {"status": "error", "message": str(e)}
@@ -1882,7 +2412,7 @@ class BrowserProSkill(GalacticSkill):
             page_id = f"page_{len(self.pages) + 1}"
             self.pages[page_id] = page
 
-            ensurePageState(page)
+            ensurePageState(page, self.buffer_limits)
 
             if url:
                 await page.goto(url, timeout=self.default_timeout)
@@ -2142,7 +2672,7 @@ class BrowserProSkill(GalacticSkill):
                 return {"status": "error", "message": "No page available"}
 
             state = pageStates.get(page, {"console": []})
-            logs = state.get("console", [])
+            logs = list(state.get("console", []))
 
             if level:
                 logs = [log for log in logs if log.get("type") == level]
@@ -2159,7 +2689,7 @@ class BrowserProSkill(GalacticSkill):
                 return {"status": "error", "message": "No page available"}
 
             state = pageStates.get(page, {"errors": []})
-            errors = state.get("errors", [])
+            errors = list(state.get("errors", []))
 
             return {"status": "success", "errors": errors, "count": len(errors)}
         except Exception as e:
@@ -2173,7 +2703,7 @@ class BrowserProSkill(GalacticSkill):
                 return {"status": "error", "message": "No page available"}
 
             state = pageStates.get(page, {"requests": []})
-            requests = state.get("requests", [])
+            requests = list(state.get("requests", []))
 
             if filter_pattern:
                 requests = [r for r in requests if filter_pattern in r.get("url", "")]
@@ -2338,7 +2868,7 @@ class BrowserProSkill(GalacticSkill):
             page = await self.context.new_page()
             self.pages = {old_page_id: page}
             self.active_page_id = old_page_id
-            ensurePageState(page)
+            ensurePageState(page, self.buffer_limits)
 
             await self.core.log(f"Timezone set to: {timezone_id} (context recreated)", priority=2)
             return {"status": "success", "timezone": timezone_id}
@@ -2383,7 +2913,7 @@ class BrowserProSkill(GalacticSkill):
             page = await self.context.new_page()
             self.pages = {old_page_id: page}
             self.active_page_id = old_page_id
-            ensurePageState(page)
+            ensurePageState(page, self.buffer_limits)
             await self.core.log(f"Locale set to: {locale} (context recreated)", priority=2)
             return {"status": "success", "locale": locale}
         except Exception as e:
@@ -2395,14 +2925,48 @@ class BrowserProSkill(GalacticSkill):
             page = self._get_page(page_id)
             if not page:
                 return {"status": "error", "message": "No page available"}
-            state = pageStates.get(page, {"responses": {}})
-            responses = state.get("responses", {})
+            state = ensurePageState(page, self.buffer_limits)
+            responses = state["responses"].as_dict()
             if url_pattern:
                 responses = {k: v for k, v in responses.items() if url_pattern in k}
-            return {"status": "success", "responses": responses, "count": len(responses)}
+            return {"status": "success", "responses": responses, "count": len(responses),
+                    "armed": bool(state["capture"])}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    async def set_response_capture(self, url_pattern=None, content_type=None, disarm=False, page_id=None):
+        """Arm (or disarm) response-body capture for URLs / content types matching a filter."""
+        try:
+            page = self._get_page(page_id)
+            if not page:
+                return {"status": "error", "message": "No page available"}
+            state = ensurePageState(page, self.buffer_limits)
+            if disarm:
+                state["capture"].clear()
+                lim = state["limits"]
+                state["responses"] = ResponseBuffer(lim["response_entries"], lim["response_bytes"])
+            else:
+                state["capture"].append({"url_pattern": url_pattern or "", "content_type": content_type or ""})
+            return {"status": "success", "filters": list(state["capture"])}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    def get_buffer_stats(self):
+        """Per-page capture buffer usage (entries / bytes / dropped)."""
+        stats = {}
+        for page_id, page in self.pages.items():
+            state = pageStates.get(page)
+            if not state:
+                continue
+            buffers = {k: state[k].stats() for k in ("console", "errors", "requests", "responses")}
+            stats[page_id] = {
+                "url": page.url,
+                "total_bytes": sum(b["bytes"] for b in buffers.values()),
+                "capture_filters": list(state["capture"]),
+                **buffers,
+            }
+        return stats
+
     async def click_coords(self, x, y, button="left", page_id=None):
         """Click at exact pixel coordinates. Useful for canvas elements or when selectors fail."""
         try:
@@ -2563,7 +3127,7 @@ class BrowserProSkill(GalacticSkill):
             page = await self.context.new_page()
             self.pages = {old_page_id: page}
             self.active_page_id = old_page_id
-            ensurePageState(page)
+            ensurePageState(page, self.buffer_limits)
             await self.core.log(f"Session loaded: {session_name}", priority=2)
             return {"status": "success", "session": session_name}
         except Exception as e:
@@ -2586,6 +3150,13 @@ class BrowserProSkill(GalacticSkill):
                 except Exception:
                     pass
 
+            # Pooled and leased contexts died with the old browser process
+            self._leases.clear()
+            if self.pool:
+                self.pool = BrowserContextPool(self.pool.factory, size=self.pool_size,
+                                               warm=self.pool_warm, max_reuse=self.pool_max_reuse,
+                                               acquire_timeout=self.pool_acquire_timeout)
+
             engine_name = self.core.config.get('browser', {}).get('engine', 'chromium')
             browser_engine = getattr(self.playwright, engine_name, self.playwright.chromium)
             headless = self.core.config.get('browser', {}).get('headless', False)
@@ -2602,7 +3173,7 @@ class BrowserProSkill(GalacticSkill):
             page = await self.context.new_page()
             self.pages = {"page_1": page}
             self.active_page_id = "page_1"
-            ensurePageState(page)
+            ensurePageState(page, self.buffer_limits)
             await self.core.log(f"Browser restarted with proxy: {server}", priority=2)
             return {"status": "success", "proxy": server}
         except Exception as e:
@@ -2610,6 +3181,11 @@ class BrowserProSkill(GalacticSkill):
 
     async def close(self):
         """Shutdown browser."""
+        for sid in list(self._leases):
+            await self.release_session(sid)
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
         if self.context:
             await self.context.close()
             self.context = None
@@ -2630,6 +3206,12 @@ class BrowserProSkill(GalacticSkill):
     async def run(self):
         """Skill background loop."""
         await self.core.log("Browser Pro Active.", priority=2)
-        # browser doesn't need a background loop
+        if self.warm_start and not self.started:
+            await self.start()
+        # Reclaim contexts from sessions that stopped using the browser
         while self.enabled:
             await asyncio.sleep(30)
+            now = time.monotonic()
+            for sid, lease in list(self._leases.items()):
+                if now - lease.last_used > self.lease_idle_seconds:
+                    await self.release_session(sid)
@@ -6,6 +6,11 @@ Architecture:
   - The Chrome extension connects to web_deck.py over WebSocket.
   - web_deck.py routes extension messages to this skill via handle_ws_message().
   - This skill sends commands to the extension and awaits results using asyncio Futures.
+    Commands are pipelined (many in flight at once, matched by request id), and a
+    `batch` command runs an ordered list of actions in one round trip.
+  - Large result fields (screenshots) arrive as binary WebSocket frames
+    ([uint32 header length][header JSON {id, path}][raw bytes]) sent just before
+    the JSON result that lists them in `binary_parts`.
   - Tool handlers call the convenience methods (screenshot, navigate, etc.)
     which wrap send_command() with typed arguments.
 """
@@ -14,6 +19,8 @@ import asyncio
 import base64
 import json
 import logging
+import os
+import struct
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -38,6 +45,7 @@ class ChromeBridgeSkill(GalacticSkill):
     description = "Chrome extension WebSocket bridge for real browser control."
     category    = "browser"
     icon        = "\U0001f310"
+    background_run = True    # the extension connects via /ws/chrome_bridge, not through a tool call
 
     # Legacy name used by web_deck.py to find this skill via class name check
     name = "ChromeBridge"
@@ -51,6 +59,11 @@ class ChromeBridgeSkill(GalacticSkill):
 
         # Pending commands: {request_id: asyncio.Future}
         self._pending: dict[str, asyncio.Future] = {}
+        # Binary frames received ahead of their JSON result: {request_id: {path: bytes}}
+        self._binary_parts: dict[str, dict[str, bytes]] = {}
+        self._send_lock = asyncio.Lock()
+        self._capabilities: list = []
+        self.stats = {"commands": 0, "batches": 0, "binary_frames": 0, "binary_bytes": 0, "max_in_flight": 0}
 
         # Default timeout for commands (seconds)
         self.timeout: int = 30
@@ -58,10 +71,11 @@ class ChromeBridgeSkill(GalacticSkill):
         # Cache of known tabs: {tab_id: {"title": ..., "url": ...}}
         self._tabs: dict[int, dict] = {}
 
-        # GIF recorder state
+        # GIF recorder state — frames are encoded straight to disk (media_utils.GifStreamWriter)
         self._gif_recording = False
-        self._gif_frames: list[bytes] = []
+        self._gif_writer = None
         self._gif_task = None  # asyncio task for polling loop
+        self._gif_stop = None  # asyncio.Event that wakes the polling loop on stop
 
     # ── Metadata property (web_deck compat) ─────────────────────────────
 
@@ -70,6 +84,19 @@ class ChromeBridgeSkill(GalacticSkill):
         """True only when we have a live WebSocket and the extension said hello."""
         return self._connected and self.ws_connection is not None
 
+    @staticmethod
+    def _image_payload(result: dict):
+        """Return (raw_bytes, b64) for an image result, binary frame or legacy base64 field."""
+        raw = result.get('image_bytes')
+        if raw is not None:
+            return raw, base64.b64encode(raw).decode('ascii')
+        img_data = result.get('image_b64', '')
+        if not img_data:
+            return None, ''
+        # Strip data URI prefix if present
+        clean_b64 = img_data.split(',', 1)[1] if ',' in img_data and img_data.startswith('data:') else img_data
+        return base64.b64decode(clean_b64), clean_b64
+
     # ── GalacticSkill: tool definitions ─────────────────────────────────
 
     def get_tools(self):
@@ -318,6 +345,29 @@ class ChromeBridgeSkill(GalacticSkill):
                 },
                 "fn": self._tool_chrome_dialog_response
             },
+            "chrome_batch": {
+                "description": "Run several Chrome commands in one round trip (e.g. click, type, key_press, then screenshot). Each action is {command, args} using the extension's command names and the same args as the matching chrome_* tool. Returns one status line per action, plus the image if an action captured one.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "actions": {
+                            "type": "array",
+                            "description": "Ordered commands to run",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "command": {"type": "string", "description": "Extension command, e.g. 'click', 'type', 'navigate', 'screenshot'"},
+                                    "args": {"type": "object", "description": "Arguments for the command"}
+                                },
+                                "required": ["command"]
+                            }
+                        },
+                        "stop_on_error": {"type": "boolean", "description": "Stop at the first failing action (default true)"}
+                    },
+                    "required": ["actions"]
+                },
+                "fn": self._tool_chrome_batch
+            },
             "chrome_gif_start": {
                 "description": "Start recording the browser as an animated GIF. Captures screenshots at the specified frame rate. Call chrome_gif_stop when done, then chrome_gif_export to save.",
                 "parameters": {
@@ -395,7 +445,7 @@ class ChromeBridgeSkill(GalacticSkill):
         
         result = await self.screenshot()
         if result.get('status') == 'success':
-            img_data = result.get('image_b64', '')
+            raw, img_data = self._image_payload(result)
             if not img_data:
                 return "[ERROR] Chrome screenshot: no image data returned"
 
@@ -407,10 +457,6 @@ class ChromeBridgeSkill(GalacticSkill):
                 ts = datetime.now().strftime('%Y%m%d_%H%M%S')
                 path = str(img_subdir / f'chrome_{ts}.jpg')
                 
-                # Strip data URI prefix if present
-                clean_b64 = img_data.split(',', 1)[1] if ',' in img_data and img_data.startswith('data:') else img_data
-                
-                raw = base64.b64decode(clean_b64)
                 with open(path, 'wb') as f:
                     f.write(raw)
                 # Return special dict that gateway detects and renders as a vision message
@@ -427,7 +473,7 @@ class ChromeBridgeSkill(GalacticSkill):
             return "[ERROR] chrome_zoom: region must be [x0, y0, x1, y1]"
         result = await self.zoom(region=region)
         if result.get('status') == 'success':
-            img_data = result.get('image_b64', '')
+            raw, img_data = self._image_payload(result)
             if not img_data:
                 return "[ERROR] Chrome zoom: no image data returned"
             try:
@@ -437,11 +483,8 @@ class ChromeBridgeSkill(GalacticSkill):
                 ts = datetime.now().strftime('%Y%m%d_%H%M%S')
                 path = str(img_subdir / f'chrome_zoom_{ts}.jpg')
                 
-                # Strip data URI prefix if present
-                clean_b64 = img_data.split(',', 1)[1] if ',' in img_data and img_data.startswith('data:') else img_data
-                
                 with open(path, 'wb') as f:
-                    f.write(base64.b64decode(clean_b64))
+                    f.write(raw)
                 return {"__image_b64__": img_data, "path": path, "media_type": "image/jpeg",
                         "text": f"[CHROME] Zoomed region {region} saved: {path}"}
             except Exception as e:
@@ -487,8 +530,8 @@ class ChromeBridgeSkill(GalacticSkill):
             # 2. Grab visual screenshot for vision model and user UI
             try:
                 screen_result = await self.screenshot(tab_id=tab_id)
-                if screen_result.get('status') == 'success' and 'image_b64' in screen_result:
-                    img_data = screen_result['image_b64']
+                raw, img_data = self._image_payload(screen_result) if screen_result.get('status') == 'success' else (None, '')
+                if img_data:
                     
                     images_dir = self.core.config.get('paths', {}).get('images', './images') if hasattr(self, 'core') and self.core else './images'
                     img_subdir = Path(images_dir) / 'browser'
@@ -496,13 +539,10 @@ class ChromeBridgeSkill(GalacticSkill):
                     ts = datetime.now().strftime('%Y%m%d_%H%M%S')
                     path = str(img_subdir / f'chrome_auto_{ts}.jpg')
                     
-                    clean_b64 = img_data.split(',', 1)[1] if ',' in img_data and img_data.startswith('data:') else img_data
-                    
-                    # Ensure base64 is decoded and written synchronously to avoid blocking the loop
-                    import base64
+                    # Write off the event loop
                     def _write_img():
                         with open(path, 'wb') as f:
-                            f.write(base64.b64decode(clean_b64))
+                            f.write(raw)
                     
                     await asyncio.get_running_loop().run_in_executor(None, _write_img)
                         
@@ -905,35 +945,83 @@ class ChromeBridgeSkill(GalacticSkill):
         await asyncio.sleep(seconds)
         return f"[CHROME] Waited {seconds} seconds"
 
+    async def _tool_chrome_batch(self, args: dict) -> str | dict:
+        if not self.ws_connection:
+            return "[ERROR] Chrome extension not connected."
+        actions = args.get("actions") or args.get("commands") or []
+        if not actions:
+            return "[ERROR] chrome_batch: actions must be a non-empty list of {command, args}"
+        result = await self.batch(actions, stop_on_error=args.get("stop_on_error", True))
+        if result.get("error"):
+            return f"[ERROR] chrome_batch: {result['error']}"
+        lines = [f"[CHROME] Batch: {result.get('completed', 0)}/{len(actions)} actions completed"]
+        image = None
+        for i, (action, res) in enumerate(zip(actions, result.get("results", []))):
+            res = res if isinstance(res, dict) else {"result": res}
+            if res.get("image_bytes") is not None or res.get("image_b64"):
+                image = res
+                lines.append(f"  {i + 1}. {action.get('command')}: image captured")
+                continue
+            status = res.get("error") or res.get("message") or res.get("status", "ok")
+            lines.append(f"  {i + 1}. {action.get('command')}: {str(status)[:200]}")
+        if image:
+            raw, img_data = self._image_payload(image)
+            return {"__image_b64__": img_data, "media_type": "image/jpeg", "text": "\n".join(lines)}
+        return "\n".join(lines)
+
+    def _recordings_dir(self) -> Path:
+        logs_dir = self.core.config.get('paths', {}).get('logs', 'logs') if hasattr(self, 'core') and self.core else 'logs'
+        out_dir = Path(logs_dir) / 'recordings'
+        out_dir.mkdir(parents=True, exist_ok=True)
+        return out_dir
+
     async def _tool_chrome_gif_start(self, args: dict) -> str:
         if self._gif_recording:
             return "[CHROME] GIF recording already in progress"
+        try:
+            from media_utils import GifStreamWriter
+        except ImportError as e:
+            return f"[ERROR] chrome_gif_start: {e}"
         fps = float(args.get("fps", 2))
         if fps <= 0 or fps > 5:
             fps = 2
+        cfg = self.core.config.get('chrome_bridge', {})
+        if self._gif_writer:
+            # Unexported previous recording — discard it
+            await asyncio.to_thread(self._gif_writer.abort)
+        part_path = self._recordings_dir() / f".recording_{datetime.now().strftime('%Y%m%d_%H%M%S')}.gif.part"
+        try:
+            self._gif_writer = GifStreamWriter(
+                str(part_path),
+                max_edge=int(cfg.get('gif_max_edge', 960)),
+                dedup_distance=int(cfg.get('gif_dedup_distance', 0)),
+            )
+        except RuntimeError as e:
+            return f"[ERROR] chrome_gif_start: {e}"
         self._gif_recording = True
-        self._gif_frames = []
+        writer = self._gif_writer
         interval = 1.0 / fps
+        stop = self._gif_stop = asyncio.Event()
 
         async def _poll():
             while self._gif_recording:
                 try:
                     result = await self.send_command("screenshot", {})
-                    if isinstance(result, dict) and result.get("__image_b64__"):
-                        frame_b64 = result["__image_b64__"]
-                        frame_bytes = base64.b64decode(frame_b64)
-                        self._gif_frames.append(frame_bytes)
-                    elif isinstance(result, dict) and result.get("image_b64"):
-                        frame_b64 = result["image_b64"]
-                        frame_bytes = base64.b64decode(frame_b64)
-                        self._gif_frames.append(frame_bytes)
+                    frame_bytes = None
+                    if isinstance(result, dict):
+                        frame_bytes, _ = self._image_payload(result)
                     elif isinstance(result, str) and result.startswith("data:image"):
                         # strip data URI prefix if present
-                        b64 = result.split(",", 1)[1]
-                        self._gif_frames.append(base64.b64decode(b64))
+                        frame_bytes = base64.b64decode(result.split(",", 1)[1])
+                    if frame_bytes:
+                        # Encode on a worker thread; only the current frame is ever in memory
+                        await asyncio.to_thread(writer.add_frame, frame_bytes)
                 except Exception:
                     pass
-                await asyncio.sleep(interval)
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
 
         self._gif_task = asyncio.create_task(_poll())
         return f"[CHROME] GIF recording started at {fps} fps"
@@ -943,22 +1031,23 @@ class ChromeBridgeSkill(GalacticSkill):
             return "[CHROME] No GIF recording in progress"
         self._gif_recording = False
         if self._gif_task:
-            self._gif_task.cancel()
+            # Don't cancel: a cancelled task would leave add_frame() running in its worker
+            # thread. Wake the poller and let the frame in progress finish.
+            self._gif_stop.set()
             try:
                 await self._gif_task
-            except asyncio.CancelledError:
+            except Exception:
                 pass
             self._gif_task = None
-        return f"[CHROME] GIF recording stopped. {len(self._gif_frames)} frames captured."
+        w = self._gif_writer
+        return (f"[CHROME] GIF recording stopped. {w.frames} frames kept, "
+                f"{w.dropped} duplicate frames dropped.")
 
     async def _tool_chrome_gif_export(self, args: dict) -> str:
-        if not self._gif_frames:
+        if not self._gif_writer or not self._gif_writer.frames:
             return "[ERROR] chrome_gif_export: No frames to export. Use chrome_gif_start first."
-        try:
-            from PIL import Image
-            import io
-        except ImportError:
-            return "[ERROR] chrome_gif_export: Pillow not installed. Run: pip install Pillow"
+        if self._gif_recording:
+            await self._tool_chrome_gif_stop({})
 
         frame_duration = int(args.get("frame_duration_ms", 500))
         if frame_duration < 100:
@@ -971,38 +1060,13 @@ class ChromeBridgeSkill(GalacticSkill):
             filename = datetime.now().strftime("%Y%m%d_%H%M%S")
         # Sanitize filename
         filename = "".join(c for c in filename if c.isalnum() or c in "_-")[:64] or "recording"
+        out_path = self._recordings_dir() / f"{filename}.gif"
 
-        logs_dir = self.core.config.get('paths', {}).get('logs', 'logs') if hasattr(self, 'core') and self.core else 'logs'
-        out_dir = Path(logs_dir) / 'recordings'
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = out_dir / f"{filename}.gif"
-
-        # Convert JPEG bytes to PIL Images
-        pil_frames = []
-        for frame_bytes in self._gif_frames:
-            try:
-                img = Image.open(io.BytesIO(frame_bytes)).convert("RGB")
-                # Quantize for GIF (256 colors)
-                img = img.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
-                pil_frames.append(img)
-            except Exception:
-                continue
-
-        if not pil_frames:
-            return "[ERROR] chrome_gif_export: Could not decode any frames"
-
-        pil_frames[0].save(
-            str(out_path),
-            format="GIF",
-            save_all=True,
-            append_images=pil_frames[1:],
-            loop=0,
-            duration=frame_duration,
-            optimize=False
-        )
-
-        self._gif_frames = []  # clear frames after export
-        return f"[CHROME] GIF saved: {out_path} ({len(pil_frames)} frames)"
+        writer, self._gif_writer = self._gif_writer, None
+        part_path = await asyncio.to_thread(writer.finish, frame_duration)
+        await asyncio.to_thread(os.replace, part_path, out_path)
+        return (f"[CHROME] GIF saved: {out_path} ({writer.frames} frames, "
+                f"{writer.dropped} duplicates dropped, {writer.size[0]}x{writer.size[1]})")
 
     # ── Inbound message handler (called by web_deck) ─────────────────────
 
@@ -1026,6 +1090,7 @@ class ChromeBridgeSkill(GalacticSkill):
         if msg_type == "hello":
             self._connected = True
             capabilities = payload.get("capabilities", [])
+            self._capabilities = capabilities
             tabs = payload.get("tabs", [])
             self._update_tabs_cache(tabs)
             await self.core.log(
@@ -1038,10 +1103,15 @@ class ChromeBridgeSkill(GalacticSkill):
 
         elif msg_type == "result":
             request_id = payload.get("id")
+            parts = self._binary_parts.pop(request_id, {})
+            data = payload.get("data")
+            for path in payload.get("binary_parts") or []:
+                if path in parts:
+                    self._attach_binary(data, path, parts[path])
             if request_id and request_id in self._pending:
                 future = self._pending.pop(request_id)
                 if not future.done():
-                    future.set_result(payload.get("data"))
+                    future.set_result(data)
             else:
                 logger.debug(
                     "ChromeBridge: received result for unknown id=%s", request_id
@@ -1067,13 +1137,41 @@ class ChromeBridgeSkill(GalacticSkill):
         else:
             logger.debug("ChromeBridge: unhandled message type '%s'", msg_type)
 
+    async def handle_ws_binary(self, data: bytes) -> None:
+        """Called by web_deck.py for binary frames: one large field of a pending result."""
+        try:
+            (header_len,) = struct.unpack(">I", data[:4])
+            header = json.loads(data[4:4 + header_len].decode("utf-8"))
+        except Exception as exc:
+            logger.warning("ChromeBridge: malformed binary frame: %s", exc)
+            return
+        request_id = header.get("id")
+        if request_id not in self._pending:
+            return  # timed out already — drop instead of holding the bytes
+        self._binary_parts.setdefault(request_id, {})[header.get("path", "")] = data[4 + header_len:]
+        self.stats["binary_frames"] += 1
+        self.stats["binary_bytes"] += len(data) - 4 - header_len
+
+    @staticmethod
+    def _attach_binary(data, path: str, raw: bytes) -> None:
+        """Put raw bytes back at a dotted path ('image_b64', 'results.2.image_b64') as *_bytes."""
+        keys = path.split(".")
+        node = data
+        for key in keys[:-1]:
+            node = node[int(key)] if isinstance(node, list) else node.get(key)
+            if node is None:
+                return
+        if isinstance(node, dict):
+            node[keys[-1].replace("_b64", "_bytes")] = raw
+
     # ── Outbound command dispatcher ──────────────────────────────────────
 
-    async def send_command(self, command: str, args: dict | None = None) -> dict:
+    async def send_command(self, command: str, args: dict | None = None, timeout: float | None = None) -> dict:
         """Send a command to the Chrome extension and wait for the result.
 
-        Returns the result dict on success, or an {"error": "..."} dict
-        on connection / timeout / transport failure.
+        Any number of commands may be in flight at once; results are matched
+        back to their Future by request id. Returns the result dict on success,
+        or an {"error": "..."} dict on connection / timeout / transport failure.
         """
         if not self.connected:
             return {"error": "Chrome extension not connected. Ensure the extension is running and connected via WebSocket."}
@@ -1081,16 +1179,23 @@ class ChromeBridgeSkill(GalacticSkill):
         request_id = uuid.uuid4().hex[:8]
         future: asyncio.Future = asyncio.get_event_loop().create_future()
         self._pending[request_id] = future
+        self.stats["commands"] += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], len(self._pending))
+        timeout = timeout or self.timeout
 
-        envelope = json.dumps({
+        envelope = {
             "type": "command",
             "id": request_id,
             "command": command,
             "args": args or {},
-        })
+        }
+        if "binary" in self._capabilities:
+            envelope["binary"] = True
 
         try:
-            await self.ws_connection.send_str(envelope)
+            # Frames from concurrent commands must not interleave on the socket
+            async with self._send_lock:
+                await self.ws_connection.send_str(json.dumps(envelope))
         except Exception as exc:
             self._pending.pop(request_id, None)
             self._connected = False
@@ -1099,12 +1204,12 @@ class ChromeBridgeSkill(GalacticSkill):
             return {"error": f"Failed to send command '{command}': {exc}"}
 
         try:
-            result = await asyncio.wait_for(future, timeout=self.timeout)
+            result = await asyncio.wait_for(future, timeout=timeout)
             return result
         except asyncio.TimeoutError:
             logger.warning("ChromeBridge: command '%s' (id=%s) timed out after %ds",
-                           command, request_id, self.timeout)
-            return {"error": f"Command '{command}' timed out after {self.timeout}s"}
+                           command, request_id, timeout)
+            return {"error": f"Command '{command}' timed out after {timeout}s"}
         except asyncio.CancelledError:
             return {"error": f"Command '{command}' was cancelled"}
         except Exception as exc:
@@ -1113,6 +1218,27 @@ class ChromeBridgeSkill(GalacticSkill):
         finally:
             # Guarantee cleanup regardless of outcome
             self._pending.pop(request_id, None)
+            self._binary_parts.pop(request_id, None)
+
+    async def batch(self, actions: list, stop_on_error: bool = True) -> dict:
+        """Run an ordered list of {command, args} actions in a single round trip.
+
+        Returns {"status", "results": [...], "completed"}. Extensions without the
+        'batch' capability get the actions sent one by one instead.
+        """
+        actions = [{"command": a.get("command"), "args": a.get("args") or {}} for a in actions]
+        if "batch" in self._capabilities:
+            self.stats["batches"] += 1
+            return await self.send_command(
+                "batch", {"actions": actions, "stop_on_error": stop_on_error},
+                timeout=self.timeout * max(1, len(actions)))
+        results = []
+        for action in actions:
+            result = await self.send_command(action["command"], action["args"])
+            results.append(result)
+            if stop_on_error and isinstance(result, dict) and (result.get("error") or result.get("status") == "error"):
+                break
+        return {"status": "success", "results": results, "completed": len(results)}
 
     # ── Background loop (keepalive) ──────────────────────────────────────
 
@@ -1126,7 +1252,8 @@ class ChromeBridgeSkill(GalacticSkill):
         while self.enabled:
             if self._connected and self.ws_connection:
                 try:
-                    await self.ws_connection.send_str('{"type":"ping"}')
+                    async with self._send_lock:
+                        await self.ws_connection.send_str('{"type":"ping"}')
                 except Exception:
                     self._connected = False
                     self.ws_connection = None
@@ -40,6 +40,7 @@ class DesktopSkill(GalacticSkill):
     description = "OS-level mouse, keyboard, and screenshot control via pyautogui."
     category    = "desktop"
     icon        = "\U0001f5a5\ufe0f"
+    background_run = False   # run() is only a banner/keepalive; load on first tool call
 
     def get_tools(self):
         return {
@@ -19,6 +19,7 @@ class ForgeSkill(GalacticSkill):
     description  = "Synthesizes and hot-loads new capabilities autonomously."
     category     = "system"
     icon         = "🔥"
+    background_run = False   # run() is only a banner/keepalive; load on first tool call
 
     def __init__(self, core):
         super().__init__(core)
@@ -1,4 +1,4 @@
-import torch
+import contextlib
 from skills.base import GalacticSkill
 
 class GPUOffloader(GalacticSkill):
@@ -15,11 +15,36 @@ class GPUOffloader(GalacticSkill):
     description  = "Intelligently routes AI workloads to Blackwell and Ampere silicon."
     category     = "system"
     icon         = "⚡"
+    background_run = False   # run() is only a banner/keepalive; load on first tool call
 
     def __init__(self, core):
         super().__init__(core)
-        self.device_count = torch.cuda.device_count() if torch.cuda.is_available() else 0
-        self.devices = {
+        # torch is imported on first device query, not at skill load
+        self._device_count = None
+        self._torch_mod = None
+
+    def _torch(self):
+        if self._torch_mod is None:
+            # Measured on first import only; later calls must not overwrite the startup cost
+            registry = getattr(self.core, 'subsystems', None)
+            with registry.measure("torch") if registry is not None else contextlib.nullcontext():
+                import torch
+            self._torch_mod = torch
+        return self._torch_mod
+
+    @property
+    def device_count(self):
+        if self._device_count is None:
+            try:
+                torch = self._torch()
+                self._device_count = torch.cuda.device_count() if torch.cuda.is_available() else 0
+            except ImportError:
+                self._device_count = 0
+        return self._device_count
+
+    @property
+    def devices(self):
+        return {
             "blackwell": "cuda:0" if self.device_count > 0 else "cpu",
             "ampere":    "cuda:1" if self.device_count > 1 else ("cuda:0" if self.device_count > 0 else "cpu")
         }
@@ -41,6 +66,9 @@ class GPUOffloader(GalacticSkill):
     async def get_gpu_stats(self):
         """Returns live telemetry for the dashboard."""
         stats = []
+        if self.device_count == 0:
+            return stats
+        torch = self._torch()
         for i in range(torch.cuda.device_count()):
             props = torch.cuda.get_device_properties(i)
             util = 0 # Dummy for now, would use pynvml in production
@@ -3,6 +3,7 @@ import platform
 """Shell command execution skill for Galactic AI."""
 import asyncio
 from skills.base import GalacticSkill
+from process_output import capture_process
 
 
 class ShellSkill(GalacticSkill):
@@ -14,6 +15,7 @@ class ShellSkill(GalacticSkill):
     description = "Execute local shell commands (PowerShell)."
     category    = "system"
     icon        = "\U0001f4bb"
+    background_run = False   # run() is only a banner/keepalive; load on first tool call
 
     def get_tools(self):
         return {
@@ -25,7 +27,8 @@ class ShellSkill(GalacticSkill):
                         "command": {"type": "string",  "description": "Command to execute."},
                         "cwd":     {"type": "string",  "description": "Optional working directory."},
                         "timeout": {"type": "integer", "description": "Optional timeout in seconds (default: 120)."},
-                        "detach":  {"type": "boolean", "description": "If true, launches the command in a new process and returns immediately.", "default": False}
+                        "detach":  {"type": "boolean", "description": "If true, launches the command in a new process and returns immediately.", "default": False},
+                        "persistent": {"type": "boolean", "description": "Run in this session's warm bash so cd/export carry over between calls (default: warm_sessions.enabled; Linux/macOS only)."}
                     },
                     "required": ["command"]
                 },
@@ -39,12 +42,49 @@ class ShellSkill(GalacticSkill):
         if not command:
             return "[ERROR] No command provided."
         
-        cwd = args.get('cwd') or os.getcwd()
         timeout = int(args.get('timeout', 120))
         detach = bool(args.get('detach', False))
-        
+
+        warm = getattr(self.core, 'warm_sessions', None)
+        if not detach and warm and warm.wants('shell', args.get('persistent')):
+            # Only cd when asked — otherwise the session keeps its own cwd
+            return await self.execute_warm(warm, command, cwd=args.get('cwd'), timeout=timeout)
+
+        cwd = args.get('cwd') or os.getcwd()
         return await self.execute(command, cwd=cwd, timeout=timeout, detach=detach)
 
+    async def execute_warm(self, warm, command, cwd=None, timeout=120):
+        """Run a command in the session's persistent bash (cwd and env carry over)."""
+        try:
+            await self.core.log(f"🛠️ Executing (warm): {command[:100]}", priority=3)
+            output, status, timed_out, restarted = await warm.run_shell(
+                command, timeout, cwd=cwd, relay=self.core.relay,
+            )
+            out = output.text("OUTPUT")
+            if timed_out:
+                await self.core.log(f"⏱ Tool timeout: {command[:50]}... killed after {timeout}s", priority=1)
+                tail = f"\n--- OUTPUT BEFORE KILL ---\n{out}" if out else ""
+                return (f"[Timeout] Command exceeded {timeout}s and was killed; the warm shell was reset.\n"
+                        f"Command: {command}{tail}")
+
+            result = []
+            if restarted:
+                result.append("--- NEW WARM SHELL SESSION ---")
+            if out:
+                result.append(out)
+            exit_code = status.get('exit_code')
+            if status.get('exited'):
+                result.append(f"--- SHELL EXITED (code {exit_code}); next call starts a fresh session ---")
+            elif exit_code != 0:
+                result.append(f"--- EXIT CODE: {exit_code} ---")
+            if not out and exit_code == 0:
+                return f"[OK] Command completed with no output (Exit code: 0)"
+            return "\n".join(result)
+
+        except Exception as e:
+            await self.core.log(f"SHELL EXCEPTION: {str(e)}", priority=1)
+            return f"[ERROR] Shell execution failed: {str(e)}"
+
     # ── Enhanced execute() ───────────────────────────────────────────────────
     async def execute(self, command, cwd=None, timeout=120, detach=False):
         """Execute a shell command and return the combined output and exit code."""
@@ -73,27 +113,20 @@ class ShellSkill(GalacticSkill):
                 await self.core.log(f"🚀 Detached command launched: {command[:50]}...", priority=2)
                 return f"[OK] Detached command launched. Use get_system_health or logs to monitor progress."
 
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(), timeout=timeout
-                )
-                exit_code = process.returncode
-            except asyncio.TimeoutError:
-                try:
-                    process.kill()
-                    await process.wait()
-                except Exception:
-                    pass
+            # Stream pipes into bounded head/tail buffers (live chunks go to the dashboard)
+            stdout, stderr, exit_code, timed_out = await capture_process(
+                process, timeout, relay=self.core.relay, tool="exec_shell",
+                head_bytes=4000, tail_bytes=4000,
+            )
+            if timed_out:
                 await self.core.log(f"⏱ Tool timeout: {command[:50]}... killed after {timeout}s", priority=1)
-                return f"[Timeout] Command exceeded {timeout}s and was killed.\nCommand: {command}"
-
-            # Combine output for a complete picture
-            out = stdout.decode('utf-8', errors='replace').strip()
-            err = stderr.decode('utf-8', errors='replace').strip()
+                partial = stdout.text("STDOUT")
+                tail = f"\n--- OUTPUT BEFORE KILL ---\n{partial}" if partial else ""
+                return f"[Timeout] Command exceeded {timeout}s and was killed.\nCommand: {command}{tail}"
 
-            # Truncate to prevent context window explosion and massive TTFT hangs
-            if len(out) > 8000: out = out[:4000] + "\n...[STDOUT TRUNCATED]...\n" + out[-4000:]
-            if len(err) > 8000: err = err[:4000] + "\n...[STDERR TRUNCATED]...\n" + err[-4000:]
+            # Combine output for a complete picture (already capped to head+tail)
+            out = stdout.text("STDOUT")
+            err = stderr.text("STDERR")
 
             result = []
             if out:
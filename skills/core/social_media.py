@@ -19,6 +19,7 @@ class SocialMediaSkill(GalacticSkill):
     description = "Twitter/X and Reddit integration."
     category    = "social"
     icon        = "\U0001f4f1"
+    background_run = False   # run() is only a banner/keepalive; load on first tool call
 
     # Legacy name for web_deck compat
     name = "SocialMedia"
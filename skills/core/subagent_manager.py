@@ -3,6 +3,8 @@ Galactic AI -- SubAgent Manager Skill v2.0
 Multi-agent task orchestration (Hive Mind) with:
   - Live WebSocket broadcast (subagent_update / subagent_done events)
   - Agent Chains: sequential pipelines with {prev_result} passing
+  - Agent Workflows: DAGs of agent tasks, independent branches run concurrently
+    under a per-model cap, fan-in steps receive upstream results directly
   - list_subagents / cancel_subagent tools
 """
 
@@ -33,6 +35,7 @@ class SubAgentSession:
         self.chain_id    = chain_id     # None if standalone
         self.chain_step  = chain_step   # 0-based index within the chain
         self.progress_percent = 0       # 0-100
+        self.finished    = asyncio.Event()  # set once the session reaches a terminal status
 
     @property
     def elapsed(self):
@@ -59,6 +62,61 @@ class SubAgentSession:
         }
 
 
+class AgentWorkflow:
+    """A DAG of agent tasks. Nodes whose dependencies are met run concurrently."""
+    def __init__(self, nodes, name="workflow"):
+        """nodes: list of dicts {id, agent_type, task, model, depends_on: [ids]}"""
+        self.id       = "w-" + str(uuid.uuid4())[:8]
+        self.name     = name
+        self.nodes    = {n["id"]: n for n in nodes}
+        self.order    = self._topological_order(nodes)
+        self.sessions = {}            # node id -> SubAgentSession
+        self.results  = {}            # node id -> result text
+        self.node_status = {nid: "pending" for nid in self.nodes}
+        self.status   = "pending"
+        self.progress_percent = 0
+
+    @staticmethod
+    def _topological_order(nodes):
+        """Validate the graph and return node ids in dependency order."""
+        ids = [n.get("id") for n in nodes]
+        if any(not i for i in ids) or len(set(ids)) != len(ids):
+            raise ValueError("Every workflow node needs a unique 'id'.")
+        for n in nodes:
+            if not isinstance(n.get("depends_on") or [], (list, tuple)):
+                raise ValueError(f"Node '{n['id']}': 'depends_on' must be a list of node ids.")
+        deps = {n["id"]: list(n.get("depends_on") or []) for n in nodes}
+        for nid, upstream in deps.items():
+            missing = [d for d in upstream if d not in deps]
+            if missing:
+                raise ValueError(f"Node '{nid}' depends on unknown node(s): {', '.join(missing)}")
+        order, ready = [], [nid for nid in ids if not deps[nid]]
+        remaining = {nid: set(d) for nid, d in deps.items()}
+        while ready:
+            nid = ready.pop(0)
+            order.append(nid)
+            for other in ids:
+                if nid in remaining[other]:
+                    remaining[other].discard(nid)
+                    if not remaining[other]:
+                        ready.append(other)
+        if len(order) != len(ids):
+            raise ValueError("Workflow has a dependency cycle.")
+        return order
+
+    def to_dict(self):
+        return {
+            "id":       self.id,
+            "name":     self.name,
+            "status":   self.status,
+            "progress_percent": self.progress_percent,
+            "nodes":    {nid: {"status": st,
+                               "session_id": self.sessions[nid].id if nid in self.sessions else None,
+                               "depends_on": self.nodes[nid].get("depends_on") or []}
+                         for nid, st in self.node_status.items()},
+        }
+
+
 class AgentChain:
     """A sequential pipeline of SubAgentSession instances."""
     def __init__(self, steps):
@@ -92,6 +150,8 @@ class SubAgentSkill(GalacticSkill):
         super().__init__(core)
         self.active_sessions: dict[str, SubAgentSession] = {}
         self.active_chains:   dict[str, AgentChain]     = {}
+        self.active_workflows: dict[str, AgentWorkflow] = {}
+        self._model_slots:    dict[str, asyncio.Semaphore] = {}
 
     # ── Tool definitions ─────────────────────────────────────────────────────
 
@@ -148,6 +208,25 @@ class SubAgentSkill(GalacticSkill):
                 }, "required": ["steps"]},
                 "fn": self._tool_spawn_chain,
             },
+            "spawn_workflow": {
+                "description": (
+                    "Spawn a workflow of sub-agents as a dependency graph (DAG) in the background. "
+                    "Nodes without dependencies on each other run IN PARALLEL; a node starts as soon as all "
+                    "nodes in its depends_on list have completed. A node's task can use {result:<node_id>} for "
+                    "one upstream result or {upstream_results} for all of them (fan-in). "
+                    "Example: [{\"id\": \"a\", \"task\": \"Research X\"}, {\"id\": \"b\", \"task\": \"Research Y\"}, "
+                    "{\"id\": \"report\", \"agent_type\": \"analyst\", \"task\": \"Compare: {upstream_results}\", \"depends_on\": [\"a\", \"b\"]}]"
+                ),
+                "parameters": {"type": "object", "properties": {
+                    "nodes": {
+                        "type": "array",
+                        "description": "List of {id, agent_type, task, model, depends_on} dicts. EACH task MUST be a clear technical plan.",
+                        "items": {"type": "object"},
+                    },
+                    "workflow_name": {"type": "string", "description": "Optional name for this workflow"},
+                }, "required": ["nodes"]},
+                "fn": self._tool_spawn_workflow,
+            },
         }
 
     # ── Tool handlers ────────────────────────────────────────────────────────
@@ -212,11 +291,26 @@ class SubAgentSkill(GalacticSkill):
         except Exception as e:
             return f"[ERROR] spawn_chain: {e}"
 
+    async def _tool_spawn_workflow(self, args):
+        nodes = args.get("nodes", [])
+        name  = args.get("workflow_name", "workflow")
+        if not nodes:
+            return "[ERROR] No nodes provided."
+        try:
+            workflow_id = await self.spawn_workflow(nodes, name=name)
+            return (
+                f"Agent Workflow launched. Workflow ID: `{workflow_id}`. "
+                "CRITICAL: This workflow will run its sub-agents independently. Your responsibility "
+                "for these tasks is now COMPLETE. DO NOT attempt to perform the steps yourself. "
+                "Inform the user that the workflow has been dispatched."
+            )
+        except Exception as e:
+            return f"[ERROR] spawn_workflow: {e}"
+
     # ── Core implementation ──────────────────────────────────────────────────
 
-    async def spawn(self, task, agent_id="researcher", model=None,
-                    chain_id=None, chain_step=None) -> str:
-        """Spawn a new sub-agent task. Returns session ID."""
+    def _resolve_model(self, model):
+        """Resolve a requested model (None / 'auto-resolve' / fuzzy name) to (model_id, source)."""
         source = "explicit_request"
         
         # 1. Handle Auto-Resolve / null / placeholder strings
@@ -249,6 +343,19 @@ class SubAgentSkill(GalacticSkill):
             if resolved != model:
                 model = resolved
                 source += " (resolved)"
+        return model, source
+
+    def _model_slot(self, model):
+        """Per-model semaphore limiting concurrent workflow nodes (subagents.max_concurrent_per_model)."""
+        if model not in self._model_slots:
+            cap = self.core.config.get("subagents", {}).get("max_concurrent_per_model", 3)
+            self._model_slots[model] = asyncio.Semaphore(max(1, int(cap)))
+        return self._model_slots[model]
+
+    async def spawn(self, task, agent_id="researcher", model=None,
+                    chain_id=None, chain_step=None) -> str:
+        """Spawn a new sub-agent task. Returns session ID."""
+        model, source = self._resolve_model(model)
 
         session = SubAgentSession(agent_id, task, model, chain_id=chain_id, chain_step=chain_step)
         self.active_sessions[session.id] = session
@@ -261,6 +368,13 @@ class SubAgentSkill(GalacticSkill):
         session.task_ref = task_obj
 
         def _on_done(t, sid=session.id):
+            session.finished.set()  # wakes chain/workflow waiters — no polling
+            browser = getattr(self.core, "browser", None)
+            if hasattr(browser, "release_session"):
+                asyncio.create_task(browser.release_session(sid))
+            warm = getattr(self.core, "warm_sessions", None)
+            if warm is not None:
+                asyncio.create_task(warm.reset(sid))
             if not t.cancelled() and t.exception():
                 print(f"[SubAgent] {sid} raised: {t.exception()}")
 
@@ -297,8 +411,7 @@ class SubAgentSkill(GalacticSkill):
             chain.sessions.append(session)
 
             # Wait for this step to finish before proceeding
-            while session.status in ("pending", "running"):
-                await asyncio.sleep(1)
+            await session.finished.wait()
 
             if session.status == "cancelled":
                 chain.status = "cancelled"
@@ -321,6 +434,82 @@ class SubAgentSkill(GalacticSkill):
         await self.core.log(f"Chain [{chain.id}] completed all {len(chain.steps)} steps.", priority=2)
         await self._chat_notify(f"⛓️ Chain **[{chain.id}]** complete! All {len(chain.steps)} steps finished.")
 
+    async def spawn_workflow(self, nodes: list, name="workflow") -> str:
+        """Spawn a DAG workflow. Returns workflow ID. Raises ValueError on an invalid graph."""
+        workflow = AgentWorkflow(nodes, name=name)
+        self.active_workflows[workflow.id] = workflow
+        roots = sum(1 for n in workflow.nodes.values() if not n.get("depends_on"))
+        await self.core.log(f"Agent Workflow [{workflow.id}] started: {len(nodes)} nodes, {roots} parallel root(s)", priority=2)
+        await self._chat_notify(f"🕸️ Workflow launched **[{workflow.id}]** · {len(nodes)} node(s), {roots} starting in parallel")
+        asyncio.create_task(self._run_workflow(workflow))
+        return workflow.id
+
+    async def _run_workflow(self, workflow: AgentWorkflow):
+        """Run every node as its own task; each waits on its upstream futures."""
+        workflow.status = "running"
+        loop = asyncio.get_running_loop()
+        done = {nid: loop.create_future() for nid in workflow.nodes}
+
+        async def _run_node(nid):
+            node = workflow.nodes[nid]
+            upstream = list(node.get("depends_on") or [])
+            try:
+                outcomes = [await done[d] for d in upstream]
+                if any(o != "completed" for o in outcomes):
+                    workflow.node_status[nid] = "skipped"
+                    return
+
+                task = node.get("task", "")
+                for d in upstream:
+                    task = task.replace(f"{{result:{d}}}", workflow.results.get(d, ""))
+                if "{upstream_results}" in task:
+                    combined = "\n\n".join(f"[{d}]\n{workflow.results.get(d, '')}" for d in upstream)
+                    task = task.replace("{upstream_results}", combined)
+                if len(upstream) == 1:
+                    task = task.replace("{prev_result}", workflow.results.get(upstream[0], ""))
+
+                model, _ = self._resolve_model(node.get("model"))
+                async with self._model_slot(model):
+                    session_id = await self.spawn(
+                        task, agent_id=node.get("agent_type", "researcher"), model=model,
+                        chain_id=workflow.id, chain_step=workflow.order.index(nid)
+                    )
+                    session = self.active_sessions[session_id]
+                    workflow.sessions[nid] = session
+                    workflow.node_status[nid] = "running"
+                    await session.finished.wait()
+
+                workflow.node_status[nid] = session.status
+                workflow.results[nid] = session.result or ""
+            except Exception as e:
+                # Spawn refused, session vanished, ... — fail the node so dependents don't wait forever
+                workflow.node_status[nid] = "failed"
+                workflow.results[nid] = f"[ERROR] {e}"
+                await self.core.log(f"Workflow [{workflow.id}] node '{nid}' failed: {e}", priority=1)
+            finally:
+                finished = sum(1 for st in workflow.node_status.values() if st not in ("pending", "running"))
+                workflow.progress_percent = int(finished / len(workflow.nodes) * 100)
+                if not done[nid].done():
+                    status = workflow.node_status[nid]
+                    done[nid].set_result(status if status not in ("pending", "running") else "failed")
+
+        await asyncio.gather(*(_run_node(nid) for nid in workflow.order), return_exceptions=True)
+
+        for nid, fut in done.items():
+            if not fut.done():
+                workflow.node_status[nid] = "failed"
+                fut.set_result("failed")
+        statuses = set(workflow.node_status.values())
+        if statuses <= {"completed"}:
+            workflow.status = "completed"
+            await self._chat_notify(f"🕸️ Workflow **[{workflow.id}]** complete! All {len(workflow.nodes)} nodes finished.")
+        else:
+            workflow.status = "cancelled" if "cancelled" in statuses and "failed" not in statuses else "failed"
+            bad = [nid for nid, st in workflow.node_status.items() if st != "completed"]
+            await self._chat_notify(f"❌ Workflow **[{workflow.id}]** {workflow.status}: {', '.join(bad)} did not complete")
+        workflow.progress_percent = 100
+        await self.core.log(f"Workflow [{workflow.id}] {workflow.status}: {workflow.node_status}", priority=2)
+
     async def _run_agent(self, session: SubAgentSession):
         """Run the sub-agent's brain loop."""
         session.status = "running"
@@ -497,6 +686,7 @@ class SubAgentSkill(GalacticSkill):
             session.task_ref.cancel()
         session.status   = "cancelled"
         session.end_time = datetime.now()
+        session.finished.set()
         asyncio.create_task(self._broadcast_done(session))
         return True
 
@@ -515,7 +705,12 @@ class SubAgentSkill(GalacticSkill):
                     and (now - s.start_time).total_seconds() > self.SESSION_STUCK_TTL)
             ]
             for sid in expired:
+                self.active_sessions[sid].finished.set()  # release any waiting workflow node
                 del self.active_sessions[sid]
+            for wid in [w for w, wf in self.active_workflows.items()
+                        if wf.status in ("completed", "failed", "cancelled")
+                        and not any(s in self.active_sessions.values() for s in wf.sessions.values())]:
+                del self.active_workflows[wid]
             if expired:
                 await self.core.log(
                     f"SubAgent cleanup: removed {len(expired)} expired session(s)", priority=3
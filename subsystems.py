@@ -0,0 +1,142 @@
+"""
+Galactic AI — subsystem readiness registry.
+
+setup_systems() used to import and build everything up front, including the
+vector store (chromadb), the embedding model (sentence-transformers) and
+torch, even on hosts that never touch them. Now:
+
+  - every subsystem built during startup runs inside `measure(name)`, so
+    the startup report shows wall time and RSS growth per subsystem
+  - heavy, optional subsystems are registered with a factory and only
+    built on first `await core.subsystems.get(name)` (concurrent callers
+    share one build); code that builds them synchronously on first use
+    wraps that in `measure(name)` so they show up in the same table
+  - `ready(name)` / `wait(name)` let callers check or await readiness
+"""
+import asyncio
+import contextlib
+import inspect
+import os
+import time
+
+
+def rss_mb():
+    """Resident set size of this process in MB (psutil, /proc, or peak RSS as a last resort)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except Exception:
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except Exception:
+        return 0.0
+
+
+class SubsystemRegistry:
+    """Lazily built subsystems, their readiness and what each one cost to start."""
+
+    def __init__(self, core=None):
+        self.core = core
+        self._factories = {}    # name -> (factory, threaded, attr)
+        self._builds = {}       # name -> asyncio.Task
+        self._instances = {}
+        self._measuring = set()
+        self.timings = {}       # name -> {state, ms, rss_mb, error}
+        self._created = time.perf_counter()
+
+    def register(self, name, factory, threaded=False, attr=None):
+        """Register a lazy subsystem. threaded=True runs a blocking factory off the event loop;
+        attr sets core.<attr> to the instance once built."""
+        self._factories[name] = (factory, threaded, attr)
+        self.timings.setdefault(name, {"state": "deferred"})
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        """Time a (synchronous) build and record its RSS delta. Nested calls for the same name are no-ops."""
+        if name in self._measuring:
+            yield
+            return
+        self._measuring.add(name)
+        self.timings[name] = {"state": "loading"}
+        t0 = time.perf_counter()
+        r0 = rss_mb()
+        try:
+            yield
+        except BaseException as e:
+            self.timings[name] = {"state": "failed", "ms": round((time.perf_counter() - t0) * 1000, 1),
+                                  "error": str(e)[:200]}
+            raise
+        else:
+            self.timings[name] = {"state": "ready", "ms": round((time.perf_counter() - t0) * 1000, 1),
+                                  "rss_mb": round(rss_mb() - r0, 1)}
+        finally:
+            self._measuring.discard(name)
+
+    async def get(self, name):
+        """Return the subsystem, building it on first use."""
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._factories:
+            raise KeyError(f"Unknown subsystem: {name}")
+        build = self._builds.get(name)
+        if build is None:
+            build = asyncio.ensure_future(self._build(name))
+            self._builds[name] = build
+        return await asyncio.shield(build)
+
+    async def _build(self, name):
+        factory, threaded, attr = self._factories[name]
+        try:
+            if threaded:
+                def _run():
+                    with self.measure(name):
+                        return factory()
+                instance = await asyncio.to_thread(_run)
+            else:
+                with self.measure(name):
+                    instance = factory()
+                    if inspect.isawaitable(instance):
+                        instance = await instance
+        except BaseException:
+            self._builds.pop(name, None)   # allow a retry on next get()
+            raise
+        self._instances[name] = instance
+        if attr and self.core is not None:
+            setattr(self.core, attr, instance)
+        return instance
+
+    def ready(self, name):
+        return self.timings.get(name, {}).get("state") == "ready"
+
+    def peek(self, name):
+        """The instance if already built, else None (never triggers a build)."""
+        return self._instances.get(name)
+
+    async def wait(self, name, timeout=None):
+        return await asyncio.wait_for(self.get(name), timeout)
+
+    def get_status(self):
+        return {name: dict(t) for name, t in self.timings.items()}
+
+    def report(self):
+        """Startup timing table, slowest first; deferred subsystems listed last."""
+        total = round((time.perf_counter() - self._created) * 1000)
+        lines = [f"Startup: {total} ms, RSS {rss_mb():.0f} MB"]
+        built = sorted(((n, t) for n, t in self.timings.items() if "ms" in t),
+                       key=lambda item: -item[1]["ms"])
+        for name, t in built:
+            mem = f"{t['rss_mb']:+.1f} MB" if "rss_mb" in t else t.get("error", "")
+            lines.append(f"  {name:<16} {t['ms']:>9.1f} ms  {mem}  [{t['state']}]")
+        deferred = [n for n, t in self.timings.items() if t.get("state") == "deferred"]
+        if deferred:
+            lines.append(f"  deferred until first use: {', '.join(deferred)}")
+        return "\n".join(lines)
@@ -15,6 +15,9 @@ import traceback
 import tempfile
 import time
 import yaml
+from collections import OrderedDict, deque
+
+from chat_streaming import ProgressiveReply
 
 def _load_yaml_models(core):
     try:
@@ -32,6 +35,159 @@ def _load_yaml_models(core):
         print(f"[Telegram Bridge] Could not load config/models.yaml: {e}")
         return {}
 
+class _TokenBucket:
+    """rate tokens/second, up to burst; acquire() waits for a token."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            wait = self.paused_until - time.monotonic()
+            if wait <= 0 and self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep(max(wait, (1 - self.tokens) / self.rate, 0.01))
+
+
+class TelegramOutbox:
+    """Central outbound scheduler for the Bot API.
+
+    Every message-producing call (sendMessage, editMessageText, media) goes
+    through one FIFO per chat, drained by a worker that takes a token from
+    the chat's bucket and from the bot-wide bucket before each request.
+    A 429 pauses that chat for `retry_after` seconds and the request is
+    retried. Consecutive short plain texts waiting for the same chat are
+    merged into one sendMessage.
+    """
+
+    COALESCE_MAX_CHARS = 1024
+    MESSAGE_LIMIT = 4096
+
+    def __init__(self, bridge, config):
+        self.bridge = bridge
+        # Telegram: ~30 msg/s per bot, ~1 msg/s per private chat, 20 msg/min per group
+        self.global_bucket = _TokenBucket(config.get('rate_global_per_s', 25), config.get('rate_global_burst', 25))
+        self.chat_rate = float(config.get('rate_chat_per_s', 1.0))
+        self.group_rate = float(config.get('rate_group_per_min', 20)) / 60.0
+        self.chat_burst = float(config.get('rate_chat_burst', 3))
+        self.max_retries = int(config.get('max_retries', 3))
+        self.queues = {}      # chat_id -> deque of jobs
+        self.buckets = {}     # chat_id -> _TokenBucket
+        self.workers = {}     # chat_id -> Task
+        self.latencies = deque(maxlen=500)
+        self.stats = {'sent': 0, 'coalesced': 0, 'rate_limited': 0, 'retried': 0, 'failed': 0}
+
+    def _bucket(self, chat_id):
+        bucket = self.buckets.get(chat_id)
+        if bucket is None:
+            is_group = str(chat_id).startswith('-')
+            bucket = _TokenBucket(self.group_rate if is_group else self.chat_rate, self.chat_burst)
+            self.buckets[chat_id] = bucket
+        return bucket
+
+    async def call(self, method, json=None, data=None, files=None, coalesce=False):
+        """Queue a Bot API call for its chat and return the decoded response."""
+        chat_id = (json or data or {}).get('chat_id')
+        job = {
+            'method': method, 'json': json, 'data': data, 'files': files,
+            'coalesce': coalesce and method == 'sendMessage' and not (json or {}).get('reply_markup')
+                        and len((json or {}).get('text', '')) <= self.COALESCE_MAX_CHARS,
+            'future': asyncio.get_running_loop().create_future(),
+            'enqueued': time.monotonic(),
+        }
+        self.queues.setdefault(chat_id, deque()).append(job)
+        worker = self.workers.get(chat_id)
+        if worker is None or worker.done():
+            self.workers[chat_id] = asyncio.create_task(self._drain(chat_id))
+        return await job['future']
+
+    def _take(self, queue):
+        """Pop the next job, folding queued short texts for the same chat into it."""
+        job = queue.popleft()
+        if not job['coalesce']:
+            return job, [job]
+        merged = [job]
+        text = job['json']['text']
+        while queue and queue[0]['coalesce'] and \
+                queue[0]['json'].get('parse_mode') == job['json'].get('parse_mode') and \
+                len(text) + 2 + len(queue[0]['json']['text']) <= self.MESSAGE_LIMIT:
+            nxt = queue.popleft()
+            text += "\n\n" + nxt['json']['text']
+            merged.append(nxt)
+        if len(merged) > 1:
+            self.stats['coalesced'] += len(merged) - 1
+            job = dict(job, json=dict(job['json'], text=text))
+        return job, merged
+
+    async def _drain(self, chat_id):
+        queue = self.queues[chat_id]
+        bucket = self._bucket(chat_id)
+        while queue:
+            await bucket.acquire()
+            await self.global_bucket.acquire()
+            job, merged = self._take(queue)
+            try:
+                result = await self._send(job, bucket)
+            except Exception as e:
+                self.stats['failed'] += 1
+                for j in merged:
+                    if not j['future'].done():
+                        j['future'].set_exception(e)
+                continue
+            now = time.monotonic()
+            for j in merged:
+                self.latencies.append(now - j['enqueued'])
+                if not j['future'].done():
+                    j['future'].set_result(result)
+        self.queues.pop(chat_id, None)
+        self.workers.pop(chat_id, None)
+
+    async def _send(self, job, bucket):
+        url = f"{self.bridge.api_url}/{job['method']}"
+        for attempt in range(self.max_retries + 1):
+            if job['files']:
+                for f in job['files'].values():
+                    f.seek(0)
+            resp = await self.bridge.client.post(url, json=job['json'], data=job['data'], files=job['files'])
+            try:
+                result = resp.json()
+            except ValueError:
+                result = {"ok": False, "description": f"HTTP {resp.status_code}"}
+            retry_after = (result.get('parameters') or {}).get('retry_after')
+            if resp.status_code != 429 and result.get('error_code') != 429:
+                self.stats['sent'] += 1
+                return result
+            self.stats['rate_limited'] += 1
+            if attempt == self.max_retries:
+                return result
+            self.stats['retried'] += 1
+            bucket.paused_until = time.monotonic() + float(retry_after or 1)
+            await bucket.acquire()
+        return result
+
+    def get_stats(self):
+        lat = sorted(self.latencies)
+        return {
+            'queue_depth': sum(len(q) for q in self.queues.values()),
+            'busiest_chat_depth': max((len(q) for q in self.queues.values()), default=0),
+            'active_chats': len(self.workers),
+            'latency_avg_s': round(sum(lat) / len(lat), 3) if lat else 0.0,
+            'latency_p95_s': round(lat[int(len(lat) * 0.95) - 1 if len(lat) > 1 else 0], 3) if lat else 0.0,
+            **self.stats,
+        }
+
+
 class TelegramBridge:
     """The high-frequency command deck for Galactic AI."""
 
@@ -42,6 +198,7 @@ class TelegramBridge:
         self.api_url = f"https://api.telegram.org/bot{self.bot_token}"
         self.offset = 0
         self.client = httpx.AsyncClient(timeout=120.0)
+        self.outbox = TelegramOutbox(self, self.config)
         self.start_time = time.time()
         # Sync thinking_level from gateway/config on startup
         gw = getattr(core, 'gateway', None)
@@ -49,6 +206,9 @@ class TelegramBridge:
         self.verbose = False
         self.pending_api_key = {}  # {chat_id: {"provider": str, "model": str}}
         self._active_tasks = []  # Track spawned asyncio tasks for /stop
+        self._chat_queues = {}   # chat_id -> deque of pending messages
+        self._chat_workers = {}  # chat_id -> worker task draining that queue
+        self._stop_tasks = set()  # running /stop handlers (kept out of _active_tasks)
         self._component = "Telegram"
 
         # Track model-call telemetry (best-effort)
@@ -112,14 +272,12 @@ class TelegramBridge:
             payload = {"chat_id": chat_id, "text": text, "parse_mode": "Markdown"}
             if reply_markup:
                 payload["reply_markup"] = reply_markup
-            resp = await self.client.post(f"{self.api_url}/sendMessage", json=payload)
-            result = resp.json()
+            result = await self.outbox.call("sendMessage", json=payload, coalesce=True)
             if not result.get("ok"):
                 desc = str(result.get("description", ""))
                 if "can't parse" in desc.lower() or "parse" in desc.lower():
                     payload.pop("parse_mode", None)
-                    resp2 = await self.client.post(f"{self.api_url}/sendMessage", json=payload)
-                    result2 = resp2.json()
+                    result2 = await self.outbox.call("sendMessage", json=payload, coalesce=True)
                     if not result2.get("ok"):
                         await self._log(
                             f"Telegram API error (plain fallback): {result2.get('description', 'unknown')}",
@@ -130,6 +288,49 @@ class TelegramBridge:
         except Exception as e:
             await self._log(f"Send message error: {e}", priority=1)
 
+    async def _stream_send(self, chat_id, text, final=False):
+        """Post a streamed-reply message and return its message_id (plain text while drafting)."""
+        payload = {"chat_id": chat_id, "text": text}
+        if final:
+            payload["parse_mode"] = "Markdown"
+        result = await self.outbox.call("sendMessage", json=payload)
+        if not result.get("ok") and final:
+            payload.pop("parse_mode", None)
+            result = await self.outbox.call("sendMessage", json=payload)
+        if not result.get("ok"):
+            raise RuntimeError(result.get("description", "sendMessage failed"))
+        return result["result"]["message_id"]
+
+    async def _stream_edit(self, chat_id, message_id, text, final=False):
+        """Replace the text of a streamed-reply message."""
+        payload = {"chat_id": chat_id, "message_id": message_id, "text": text}
+        if final:
+            payload["parse_mode"] = "Markdown"
+        result = await self.outbox.call("editMessageText", json=payload)
+        if not result.get("ok") and final and "not modified" not in str(result.get("description", "")):
+            payload.pop("parse_mode", None)
+            result = await self.outbox.call("editMessageText", json=payload)
+        desc = str(result.get("description", ""))
+        if not result.get("ok") and "not modified" not in desc:
+            raise RuntimeError(desc or "editMessageText failed")
+
+    def _new_progressive_reply(self, chat_id):
+        """ProgressiveReply for chat_id, or None when telegram.stream_replies is off."""
+        if not self.config.get('stream_replies', True):
+            return None
+
+        async def _on_error(e):
+            await self._log(f"Streamed reply error: {e}", priority=2)
+
+        return ProgressiveReply(
+            send=lambda text, final: self._stream_send(chat_id, text, final),
+            edit=lambda mid, text, final: self._stream_edit(chat_id, mid, text, final),
+            max_len=4096,
+            # Telegram allows roughly one edit per second per chat
+            edit_interval=float(self.config.get('stream_edit_interval', 1.2)),
+            on_error=_on_error,
+        )
+
     @staticmethod
     def _split_message(text, limit=4096):
         """Split long text into chunks that fit Telegram's message size limit."""
@@ -153,38 +354,35 @@ class TelegramBridge:
 
     async def send_photo(self, chat_id, photo_path, caption=None):
         try:
-            url = f"{self.api_url}/sendPhoto"
             with open(photo_path, "rb") as photo:
                 files = {"photo": photo}
                 data = {"chat_id": chat_id}
                 if caption:
                     data["caption"] = caption
-                await self.client.post(url, data=data, files=files)
+                await self.outbox.call("sendPhoto", data=data, files=files)
         except Exception as e:
             await self._log(f"Telegram Photo Error: {e}", priority=1)
 
     async def send_audio(self, chat_id, audio_path, caption=None):
         try:
-            url = f"{self.api_url}/sendAudio"
             with open(audio_path, "rb") as audio:
                 files = {"audio": audio}
                 data = {"chat_id": chat_id}
                 if caption:
                     data["caption"] = caption[:1024]
-                await self.client.post(url, data=data, files=files)
+                await self.outbox.call("sendAudio", data=data, files=files)
         except Exception as e:
             await self._log(f"Telegram Audio Error: {e}", priority=1)
 
     async def send_voice(self, chat_id, voice_path, caption=None):
         """Send an OGG voice message to Telegram."""
         try:
-            url = f"{self.api_url}/sendVoice"
             with open(voice_path, "rb") as voice:
                 files = {"voice": voice}
                 data = {"chat_id": chat_id}
                 if caption:
                     data["caption"] = caption[:1024]
-                await self.client.post(url, data=data, files=files)
+                await self.outbox.call("sendVoice", data=data, files=files)
         except Exception as e:
             await self._log(f"Telegram Voice Error: {e}", priority=1)
 
@@ -451,21 +649,21 @@ class TelegramBridge:
         if data.startswith("help_"):
             page = data.split("_")[1]
             text, markup = await self.get_help_page(page)
-            await self.client.post(
-                f"{self.api_url}/editMessageText",
+            await self.outbox.call(
+                "editMessageText",
                 json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
             )
         elif data.startswith("prov_"):
             provider = data.split("_")[1]
             text, markup = await self.get_model_menu(provider=provider)
-            await self.client.post(
-                f"{self.api_url}/editMessageText",
+            await self.outbox.call(
+                "editMessageText",
                 json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
             )
         elif data == "mod_back":
             text, markup = await self.get_model_menu()
-            await self.client.post(
-                f"{self.api_url}/editMessageText",
+            await self.outbox.call(
+                "editMessageText",
                 json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
             )
         elif data.startswith("think_"):
@@ -485,8 +683,8 @@ class TelegramBridge:
             except Exception:
                 pass
             text, markup = await self.get_think_menu()
-            await self.client.post(
-                f"{self.api_url}/editMessageText",
+            await self.outbox.call(
+                "editMessageText",
                 json={"chat_id": chat_id, "message_id": message_id, "text": f"✅ Thinking: `{level}`\n\n{text}", "reply_markup": markup, "parse_mode": "Markdown"},
             )
         elif data.startswith("mod_"):
@@ -504,40 +702,40 @@ class TelegramBridge:
                     chat_id,
                     f"🔑 **API Key Required**\n\nNo API key configured for **{provider.capitalize()}**.\nPlease paste your API key now and I'll save it:",
                 )
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": f"⏳ Waiting for {provider.capitalize()} API key...", "parse_mode": "Markdown"},
                 )
             else:
                 await self.send_message(chat_id, f"✅ **Shifted to {provider.capitalize()}:** `{model}`")
                 text, markup = await self.get_model_menu()
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
         elif data.startswith("cfg_"):
             if data == "cfg_primary":
                 text, markup = await self.get_models_config_menu(config_type="provider", provider="primary")
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
             elif data == "cfg_fallback":
                 text, markup = await self.get_models_config_menu(config_type="provider", provider="fallback")
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
             elif data == "cfg_planner":
                 text, markup = await self.get_models_config_menu(config_type="provider", provider="planner")
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
             elif data == "cfg_planner_fallback":
                 text, markup = await self.get_models_config_menu(config_type="provider", provider="planner_fallback")
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
             elif data.startswith("cfg_primary_prov_") or data.startswith("cfg_fallback_prov_") or data.startswith("cfg_planner_prov_") or data.startswith("cfg_planner_fallback_prov_"):
@@ -548,8 +746,8 @@ class TelegramBridge:
                 # rest is like "primary_prov_openai" or "planner_fallback_prov_openrouter"
                 _type, _prov = rest.rsplit("_prov_", 1)
                 text, markup = await self.get_models_config_menu(config_type="model", provider=f"{_type}_prov_{_prov}")
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
             elif data.startswith("cfg_primary_set_") or data.startswith("cfg_fallback_set_") or data.startswith("cfg_planner_set_") or data.startswith("cfg_planner_fallback_set_"):
@@ -582,24 +780,24 @@ class TelegramBridge:
                     elif hasattr(self.core, 'web_deck'):
                         self.core.web_deck._save_config(cfg)
                 text, markup = await self.get_models_config_menu()
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
             elif data == "cfg_switch_primary":
                 await self.core.model_manager.switch_to_primary()
                 await self.send_message(chat_id, "✅ **Switched to PRIMARY model**")
                 text, markup = await self.get_models_config_menu()
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
             elif data == "cfg_switch_fallback":
                 await self.core.model_manager.switch_to_fallback(reason="Manual switch")
                 await self.send_message(chat_id, "✅ **Switched to FALLBACK model**")
                 text, markup = await self.get_models_config_menu()
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
             elif data == "cfg_toggle_auto":
@@ -607,14 +805,14 @@ class TelegramBridge:
                 status = "enabled" if self.core.model_manager.auto_fallback_enabled else "disabled"
                 await self.send_message(chat_id, f"✅ **Auto-fallback {status}**")
                 text, markup = await self.get_models_config_menu()
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
             elif data == "cfg_back":
                 text, markup = await self.get_models_config_menu()
-                await self.client.post(
-                    f"{self.api_url}/editMessageText",
+                await self.outbox.call(
+                    "editMessageText",
                     json={"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": markup, "parse_mode": "Markdown"},
                 )
 
@@ -988,6 +1186,10 @@ class TelegramBridge:
                     task.cancel()
                     cancelled += 1
             self._active_tasks.clear()
+            for queue in self._chat_queues.values():
+                queue.clear()  # drop messages still waiting behind the cancelled work
+            self._chat_queues.clear()
+            self._chat_workers.clear()  # cancelled workers may not have exited yet; start fresh ones
             if hasattr(self.core, 'gateway') and hasattr(self.core.gateway, '_cancel_active'):
                 try:
                     self.core.gateway._cancel_active()
@@ -1405,7 +1607,7 @@ class TelegramBridge:
     async def listen_loop(self):
         await self._log("Telegram Bridge: Listening...", priority=1)
         await self.set_commands()
-        processed_updates = set() # Simple in-memory deduplication
+        processed_updates = OrderedDict()  # update_id -> None, oldest first (O(1) dedup window)
         while self.core.running:
             try:
                 updates = await self.get_updates()
@@ -1413,20 +1615,51 @@ class TelegramBridge:
                     update_id = update["update_id"]
                     if update_id in processed_updates:
                         continue
-                    processed_updates.add(update_id)
+                    processed_updates[update_id] = None
                     # Keep buffer size manageable
                     if len(processed_updates) > 1000:
-                        processed_updates.remove(min(processed_updates))
+                        processed_updates.popitem(last=False)
 
                     self.offset = update_id + 1
                     if "callback_query" in update:
                         self._track_task(asyncio.create_task(self._safe_process_callback(update["callback_query"])))
                     elif "message" in update:
-                        self._track_task(asyncio.create_task(self._safe_process_message(update["message"])))
+                        self._dispatch_message(update["message"])
             except Exception as e:
                 await self._log(f"Bridge Loop Error: {e}", priority=1)
             await asyncio.sleep(0.1)
 
+    def _dispatch_message(self, msg):
+        """Queue msg on its chat's worker so chats run concurrently but each stays in order.
+
+        Stop requests skip the queue — they must not wait behind the task
+        they are meant to cancel — and are held in _stop_tasks rather than
+        _active_tasks, so /stop does not cancel itself.
+        """
+        text = (msg.get("text") or "").strip()
+        if text.lower() == 'stop' or text.split('@')[0].lower() == '/stop':
+            task = asyncio.create_task(self._safe_process_message(msg))
+            self._stop_tasks.add(task)
+            task.add_done_callback(self._stop_tasks.discard)
+            return
+        chat_id = msg["chat"]["id"]
+        self._chat_queues.setdefault(chat_id, deque()).append(msg)
+        worker = self._chat_workers.get(chat_id)
+        if worker is None or worker.done():
+            self._chat_workers[chat_id] = self._track_task(asyncio.create_task(self._chat_worker(chat_id)))
+
+    async def _chat_worker(self, chat_id):
+        queue = self._chat_queues.get(chat_id)
+        try:
+            while queue:
+                await self._safe_process_message(queue.popleft())
+        finally:
+            if self._chat_workers.get(chat_id) is asyncio.current_task():
+                self._chat_workers.pop(chat_id, None)
+            # /stop may have dropped this queue and a new message started a fresh one
+            if not queue and self._chat_queues.get(chat_id) is queue:
+                self._chat_queues.pop(chat_id, None)
+
     async def _safe_process_callback(self, callback_query):
         """Isolated handler for callback queries to prevent one crash killing the loop."""
         try:
@@ -1493,7 +1726,8 @@ class TelegramBridge:
         try:
             # Increased timeout to 60s for more efficient long-polling
             r = await self.client.get(f"{self.api_url}/getUpdates", params={"offset": self.offset, "timeout": 60})
-            return r.json().get("result", []) if r.json().get("ok") else []
+            data = r.json()
+            return data.get("result", []) if data.get("ok") else []
         except Exception:
             return []
 
@@ -1530,10 +1764,12 @@ class TelegramBridge:
     async def process_and_respond(self, chat_id, text):
         typing_task = None
         response = None
+        reply = self._new_progressive_reply(chat_id)
         try:
             typing_task = asyncio.create_task(self.keep_typing(chat_id))
             self._last_model_call_ts = time.time()
-            response = await asyncio.wait_for(self.core.gateway.speak(text, chat_id=chat_id), timeout=self._get_speak_timeout())
+            with self.core.gateway.stream_to(reply):
+                response = await asyncio.wait_for(self.core.gateway.speak(text, chat_id=chat_id), timeout=self._get_speak_timeout())
             self._last_model_ok_ts = time.time()
         except asyncio.CancelledError:
             response = "🛑 Task was cancelled."
@@ -1580,7 +1816,11 @@ class TelegramBridge:
                 except Exception as e:
                     await self._log(f"Image Delivery Error: {e}", priority=1)
             try:
-                await self.send_message(chat_id, response)
+                if reply is not None and reply.started:
+                    # Turn the live draft into the final answer in place
+                    await reply.finish(response)
+                else:
+                    await self.send_message(chat_id, response)
             except Exception as e:
                 await self._log(f"Send Error: {e}", priority=1)
 
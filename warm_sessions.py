@@ -0,0 +1,397 @@
+"""
+Galactic AI — warm interpreter sessions for execute_python and exec_shell.
+
+Without this, every execute_python call starts a fresh interpreter and every
+exec_shell call a fresh bash, so an agent running twenty pandas snippets in a
+row spends most of its time importing, and nothing (variables, cwd, exported
+env) survives from one call to the next.
+
+With `warm_sessions.enabled` (or `persistent: true` on a single call) each
+agent session gets a long-lived Python kernel and a long-lived bash. Both
+are ordinary child processes talking over stdin/stdout; the end of each
+call is marked by a random sentinel line so output can be streamed through
+the same HeadTailBuffer / tool_output path as one-shot commands.
+
+Sub-agents get their own pair. Everything else runs as the 'main' session:
+all chats (web, Telegram, Discord, ...) share ONE kernel and ONE shell, so
+variables, cwd and exported env set from one chat are visible in the others.
+
+Limits:
+  - per-call timeout: the kernel gets SIGINT first (KeyboardInterrupt keeps
+    its state); if it does not come back, or for the shell, the process
+    group is killed and the next call starts a fresh session
+  - memory: RLIMIT_AS on the Python kernel (`warm_sessions.max_memory_mb`);
+    bash is not limited, since an address-space cap breaks JVM/Go/Node
+    tools that reserve far more virtual memory than they use
+  - idle reaping: sessions unused for `warm_sessions.idle_seconds` are closed
+"""
+import asyncio
+import json
+import os
+import secrets
+import signal
+import sys
+import time
+
+from process_output import HeadTailBuffer, _LiveForwarder
+
+# Runs inside the kernel child: `python -u -c KERNEL_SRC <sentinel>`.
+# Protocol: "<byte length>\n<utf-8 code>" in, user output then
+# "\n<sentinel><json status>\n" out.
+KERNEL_SRC = r'''
+import json, sys, traceback
+MARK = sys.argv[1]
+ns = {"__name__": "__main__", "__builtins__": __builtins__}
+inp = sys.stdin.buffer
+sys.stdin = open(__import__("os").devnull)
+while True:
+    header = inp.readline()
+    if not header:
+        break
+    code = inp.read(int(header)).decode("utf-8", "replace")
+    status = {"ok": True}
+    try:
+        exec(compile(code, "<cell>", "exec"), ns)
+    except KeyboardInterrupt:
+        status = {"ok": False, "interrupted": True, "error": "KeyboardInterrupt: cell interrupted"}
+    except SystemExit as e:
+        status = {"ok": e.code in (None, 0), "error": None if e.code in (None, 0) else f"SystemExit: {e.code}"}
+    except BaseException:
+        status = {"ok": False, "error": traceback.format_exc()}
+    sys.stdout.flush()
+    sys.stderr.flush()
+    sys.stdout.write("\n" + MARK + json.dumps(status) + "\n")
+    sys.stdout.flush()
+'''
+
+
+def _limit_memory(max_memory_mb):
+    """preexec_fn factory: new process group plus an address-space ceiling."""
+    def _apply():
+        os.setsid()
+        if max_memory_mb:
+            try:
+                import resource
+                limit = int(max_memory_mb) * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+            except (ImportError, ValueError, OSError):
+                pass
+    return _apply
+
+
+class WarmProcess:
+    """One long-lived child whose calls are delimited by a sentinel line."""
+
+    kind = None
+
+    def __init__(self, session_id, max_memory_mb=0, cwd=None, read_size=65536):
+        self.session_id = session_id
+        self.max_memory_mb = max_memory_mb
+        self.cwd = cwd or os.getcwd()
+        self.read_size = read_size
+        self.mark = f"__GALACTIC_{secrets.token_hex(8)}__"
+        self.proc = None
+        self.lock = asyncio.Lock()
+        self.started_at = None
+        self.last_used = time.monotonic()
+        self.calls = 0
+        self._pending = bytearray()
+
+    def _argv(self):
+        raise NotImplementedError
+
+    def _encode(self, payload):
+        raise NotImplementedError
+
+    def _parse_status(self, raw):
+        raise NotImplementedError
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.returncode is None
+
+    async def start(self):
+        kwargs = {}
+        if os.name != 'nt':
+            kwargs['preexec_fn'] = _limit_memory(self.max_memory_mb)
+        self.proc = await asyncio.create_subprocess_exec(
+            *self._argv(),
+            cwd=self.cwd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            **kwargs,
+        )
+        self._pending = bytearray()
+        self.started_at = time.monotonic()
+
+    async def _read_until_mark(self, buf, live):
+        """Stream output into buf until the sentinel; return the status line."""
+        mark = self.mark.encode()
+        while True:
+            idx = self._pending.find(mark)
+            if idx != -1:
+                nl = self._pending.find(b"\n", idx)
+                if nl != -1:
+                    out = bytes(self._pending[:idx])
+                    status = bytes(self._pending[idx + len(mark):nl])
+                    del self._pending[:nl + 1]
+                    if out.endswith(b"\n"):
+                        out = out[:-1]
+                    await self._emit(buf, live, out)
+                    return status.decode('utf-8', errors='replace')
+            elif len(self._pending) > len(mark):
+                # Flush everything that cannot be the start of the sentinel
+                keep = len(mark)
+                out = bytes(self._pending[:-keep])
+                del self._pending[:-keep]
+                await self._emit(buf, live, out)
+            data = await self.proc.stdout.read(self.read_size)
+            if not data:
+                out = bytes(self._pending)
+                self._pending = bytearray()
+                await self._emit(buf, live, out)
+                return None
+            self._pending += data
+
+    @staticmethod
+    async def _emit(buf, live, data):
+        if data:
+            buf.write(data)
+            if live:
+                await live.push('stdout', data)
+
+    async def _interrupt(self):
+        """Try to stop the running call without losing the session."""
+        return False
+
+    async def run(self, payload, timeout, relay=None, tool='exec', head_bytes=4096, tail_bytes=4096):
+        """Run one call. Returns (output_buf, status dict, timed_out, restarted)."""
+        async with self.lock:
+            restarted = not self.alive
+            if restarted:
+                await self.start()
+            self.calls += 1
+            self.last_used = time.monotonic()
+            buf = HeadTailBuffer(head_bytes, tail_bytes)
+            live = _LiveForwarder(relay, tool, f"{tool}-{self.session_id}-{self.calls}") if relay is not None else None
+            self.proc.stdin.write(self._encode(payload))
+            await self.proc.stdin.drain()
+
+            reader = asyncio.ensure_future(self._read_until_mark(buf, live))
+            timed_out = False
+            try:
+                raw = await asyncio.wait_for(asyncio.shield(reader), timeout=timeout)
+            except asyncio.TimeoutError:
+                timed_out = True
+                raw = None
+                if await self._interrupt():
+                    try:
+                        raw = await asyncio.wait_for(asyncio.shield(reader), timeout=3)
+                    except asyncio.TimeoutError:
+                        pass
+                if raw is None:
+                    reader.cancel()
+                    await self.close()
+            self.last_used = time.monotonic()
+            if raw is None:
+                exit_code = None
+                if not timed_out and self.proc is not None:
+                    exit_code = await self.proc.wait()
+                    self.proc = None
+                status = {'ok': False, 'error': None, 'exited': True, 'exit_code': exit_code}
+            else:
+                status = self._parse_status(raw)
+            if live:
+                await live.flush(done=True, exit_code=status.get('exit_code'))
+            return buf, status, timed_out, restarted
+
+    async def close(self):
+        proc, self.proc = self.proc, None
+        if proc is None or proc.returncode is not None:
+            return
+        try:
+            if os.name != 'nt':
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            pass
+
+    def info(self):
+        return {
+            'kind': self.kind,
+            'session': self.session_id,
+            'alive': self.alive,
+            'pid': self.proc.pid if self.alive else None,
+            'calls': self.calls,
+            'idle_s': round(time.monotonic() - self.last_used, 1),
+        }
+
+
+class PythonKernel(WarmProcess):
+    """Persistent interpreter: globals and imports survive between cells."""
+
+    kind = 'python'
+
+    def _argv(self):
+        return [sys.executable, '-u', '-c', KERNEL_SRC, self.mark]
+
+    def _encode(self, code):
+        data = code.encode('utf-8')
+        return str(len(data)).encode() + b"\n" + data
+
+    def _parse_status(self, raw):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {'ok': False, 'error': f"Malformed kernel status: {raw[:200]}"}
+
+    async def _interrupt(self):
+        if os.name == 'nt' or not self.alive:
+            return False
+        try:
+            self.proc.send_signal(signal.SIGINT)
+            return True
+        except ProcessLookupError:
+            return False
+
+
+class ShellSession(WarmProcess):
+    """Persistent bash: cwd, exported variables and functions carry over."""
+
+    kind = 'shell'
+
+    def _argv(self):
+        return ['/bin/bash', '--noprofile', '--norc', '-s']
+
+    def _encode(self, payload):
+        # eval in the shell itself (not a subshell) so `cd` / `export` persist
+        # and a syntax error fails the call instead of killing bash; stdin is
+        # cut off so a command that reads input cannot swallow the sentinel.
+        command, cwd = payload
+        prefix = ""
+        if cwd:
+            prefix = "cd '" + cwd.replace("'", "'\\''") + "' && "
+        return (f"{prefix}eval \"$(cat <<'{self.mark}EOF'\n{command}\n{self.mark}EOF\n)\" < /dev/null 2>&1\n"
+                f"printf '\\n{self.mark}%s\\n' \"$?\"\n").encode('utf-8')
+
+    def _parse_status(self, raw):
+        try:
+            code = int(raw.strip())
+        except ValueError:
+            code = -1
+        return {'ok': code == 0, 'exit_code': code}
+
+
+class WarmSessionManager:
+    """Per-agent-session warm kernels and shells, reaped when idle."""
+
+    def __init__(self, core):
+        self.core = core
+        cfg = core.config.get('warm_sessions', {})
+        self.enabled = bool(cfg.get('enabled', False))
+        self.idle_seconds = int(cfg.get('idle_seconds', 600))
+        self.max_memory_mb = int(cfg.get('max_memory_mb', 2048))
+        self.max_sessions = int(cfg.get('max_sessions', 8))
+        self.sessions = {}   # (kind, session_id) -> WarmProcess
+        self.stats = {'started': 0, 'reaped': 0, 'evicted': 0, 'timeouts': 0}
+
+    @staticmethod
+    def supported(kind):
+        # The shell session relies on bash; the kernel works anywhere.
+        return kind == 'python' or os.name != 'nt'
+
+    def wants(self, kind, persistent=None):
+        """Should this call use a warm session? A per-call flag beats config."""
+        use = self.enabled if persistent is None else bool(persistent)
+        return use and self.supported(kind)
+
+    def _session_id(self):
+        # Sub-agents get their own session; the main agent keeps one across messages
+        # (its trace id is new every message, so it can't be the key).
+        gateway = getattr(self.core, 'gateway', None)
+        return getattr(gateway, 'isolated_session_id', None) or 'main'
+
+    async def _get(self, kind):
+        key = (kind, self._session_id())
+        sess = self.sessions.get(key)
+        if sess is None:
+            if len(self.sessions) >= self.max_sessions:
+                await self._evict_oldest()
+                # another call for the same key may have created it while we awaited
+                sess = self.sessions.get(key)
+        if sess is None:
+            if kind == 'python':
+                sess = PythonKernel(key[1], max_memory_mb=self.max_memory_mb)
+            else:
+                sess = ShellSession(key[1])
+            self.sessions[key] = sess
+            self.stats['started'] += 1
+        return sess
+
+    async def _evict_oldest(self):
+        idle = [s for s in self.sessions.values() if not s.lock.locked()]
+        if not idle:
+            return
+        victim = min(idle, key=lambda s: s.last_used)
+        self.sessions.pop((victim.kind, victim.session_id), None)
+        self.stats['evicted'] += 1
+        await victim.close()
+
+    async def run_python(self, code, timeout, relay=None, head_bytes=2000, tail_bytes=2000):
+        sess = await self._get('python')
+        result = await sess.run(code, timeout, relay=relay, tool='execute_python',
+                                head_bytes=head_bytes, tail_bytes=tail_bytes)
+        if result[2]:
+            self.stats['timeouts'] += 1
+        return result
+
+    async def run_shell(self, command, timeout, cwd=None, relay=None, head_bytes=4000, tail_bytes=4000):
+        sess = await self._get('shell')
+        result = await sess.run((command, cwd), timeout, relay=relay, tool='exec_shell',
+                                head_bytes=head_bytes, tail_bytes=tail_bytes)
+        if result[2]:
+            self.stats['timeouts'] += 1
+        return result
+
+    async def reset(self, session_id=None):
+        """Close warm sessions for one agent session (or all of them)."""
+        for key in list(self.sessions):
+            if session_id is None or key[1] == session_id:
+                await self.sessions.pop(key).close()
+
+    async def reap_idle(self):
+        now = time.monotonic()
+        for key, sess in list(self.sessions.items()):
+            if sess.lock.locked():
+                continue
+            if now - sess.last_used > self.idle_seconds:
+                self.sessions.pop(key, None)
+                await sess.close()
+                self.stats['reaped'] += 1
+                await self.core.log(f"Reaped idle {sess.kind} session ({sess.session_id})", priority=3)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(30)
+            try:
+                await self.reap_idle()
+            except Exception as e:
+                await self.core.log(f"Warm session reaper error: {e}", priority=2)
+
+    def get_status(self):
+        return {
+            'enabled': self.enabled,
+            'idle_seconds': self.idle_seconds,
+            'max_memory_mb': self.max_memory_mb,
+            'sessions': [s.info() for s in self.sessions.values()],
+            'stats': dict(self.stats),
+        }
+
+    async def shutdown(self):
+        await self.reset()
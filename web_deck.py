@@ -5,9 +5,116 @@ import hashlib
 import time
 import os
 import secrets
-from aiohttp import web
+from collections import deque
+from aiohttp import web, WSCloseCode
 import jinja2
 
+
+class WebSocketWriter:
+    """Bounded, coalescing send queue between the relay and one /stream socket.
+
+    The relay hands frames to enqueue() without awaiting; one sender task per
+    socket drains them in order. Consecutive stream_chunk frames still waiting
+    in the queue are merged and consecutive progress frames collapse to the
+    latest, so a slow browser gets fewer, larger frames instead of a backlog.
+    A socket that still falls behind (too many queued frames, oldest frame
+    older than max_lag, or a single send hanging) is closed as a slow consumer.
+    """
+
+    COALESCE_TYPES = ('stream_chunk', 'progress')
+
+    def __init__(self, ws, max_queue=500, max_lag=15.0, send_timeout=10.0):
+        self.ws = ws
+        self.max_queue = max_queue
+        self.max_lag = max_lag
+        self.send_timeout = send_timeout
+        self.drop_reason = None
+        self.frames_sent = 0
+        self.frames_coalesced = 0
+        self._queue = deque()  # [msg_type, payload, encoded, enqueued_at]
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._task = asyncio.create_task(self._send_loop())
+
+    @property
+    def closed(self):
+        return self._closed or self.ws.closed
+
+    def enqueue(self, msg_type, payload, encoded=None):
+        """Queue one frame. Raises ConnectionError once the socket is gone or dropped."""
+        if self.closed:
+            raise ConnectionError(self.drop_reason or "websocket closed")
+        now = time.monotonic()
+        if self._queue:
+            lag = now - self._queue[0][3]
+            if lag > self.max_lag:
+                self._drop(f"slow consumer: {lag:.1f}s behind")
+                raise ConnectionError(self.drop_reason)
+            last = self._queue[-1]
+            if msg_type in self.COALESCE_TYPES and last[0] == msg_type:
+                if (msg_type == 'stream_chunk'
+                        and isinstance(last[1].get('data'), str)
+                        and isinstance(payload.get('data'), str)):
+                    merged = dict(last[1])
+                    merged['data'] = last[1]['data'] + payload['data']
+                    last[1], last[2] = merged, None
+                else:
+                    # progress: only the newest value matters
+                    last[1], last[2] = payload, encoded
+                self.frames_coalesced += 1
+                return
+        if len(self._queue) >= self.max_queue:
+            self._drop(f"slow consumer: {len(self._queue)} frames queued")
+            raise ConnectionError(self.drop_reason)
+        self._queue.append([msg_type, payload, encoded, now])
+        self._wakeup.set()
+
+    def write(self, data):
+        """Legacy stream-writer interface: queue a pre-encoded frame as-is."""
+        self.enqueue(None, None, data)
+
+    async def drain(self):
+        pass
+
+    def send_json(self, obj):
+        """Queue a dict that has not been through the relay (telemetry, aura updates)."""
+        self.enqueue(obj.get('type'), obj)
+
+    def close(self):
+        self._closed = True
+        self._queue.clear()
+        self._task.cancel()
+
+    def _drop(self, reason):
+        self.drop_reason = reason
+        self._closed = True
+        self._queue.clear()
+        self._wakeup.set()
+        if not self.ws.closed:
+            asyncio.create_task(self.ws.close(code=WSCloseCode.TRY_AGAIN_LATER, message=b'slow consumer'))
+
+    async def _send_loop(self):
+        while not self.closed:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            _, payload, encoded, _ = self._queue.popleft()
+            if encoded is None:
+                text = json.dumps(payload) + "\n"
+            else:
+                text = encoded.decode() if isinstance(encoded, bytes) else encoded
+            try:
+                await asyncio.wait_for(self.ws.send_str(text), timeout=self.send_timeout)
+            except asyncio.TimeoutError:
+                self._drop(f"slow consumer: send blocked > {self.send_timeout:.0f}s")
+                return
+            except Exception:
+                self._closed = True
+                return
+            self.frames_sent += 1
+
+
 class GalacticWebDeck:
     def __init__(self, core):
         self.core = core
@@ -105,12 +212,12 @@ class GalacticWebDeck:
         self.app.router.add_get('/api/subagents', self.handle_subagents)
         self.app.router.add_delete('/api/subagents/{session_id}', self.handle_cancel_subagent)
         self.app.router.add_post('/api/subagents/chain', self.handle_spawn_chain)
+        self.app.router.add_post('/api/subagents/workflow', self.handle_spawn_workflow)
         self.app.router.add_get('/api/subagents/default_model', self.handle_get_subagent_model)
         self.app.router.add_post('/api/subagents/default_model', self.handle_set_subagent_model)
         self.app.router.add_get('/api/subagents/models', self.handle_subagent_models)
         # Chrome Bridge WebSocket — connects the Galactic Browser extension
         self.app.router.add_get('/ws/chrome_bridge', self.handle_chrome_bridge_ws)
-        self.trace_buffer = []  # last 500 agent trace entries for persistence
         
     async def handle_runs(self, request):
         """GET /api/runs - Lists all saved workflow runs/checkpoints."""
@@ -230,6 +337,23 @@ class GalacticWebDeck:
         except Exception as e:
             return web.json_response({'error': str(e)}, status=500)
 
+    async def handle_spawn_workflow(self, request):
+        """POST /api/subagents/workflow — DAG of nodes {id, agent_type, task, model, depends_on}"""
+        mgr = self._get_subagent_mgr()
+        if not mgr:
+            return web.json_response({'error': 'Subagent manager strictly disabled'}, status=404)
+        try:
+            data = await request.json()
+            nodes = data.get('nodes', [])
+            if not nodes:
+                return web.json_response({'error': 'No nodes provided'}, status=400)
+            workflow_id = await mgr.spawn_workflow(nodes, name=data.get('name', 'workflow'))
+            return web.json_response({'ok': True, 'workflow_id': workflow_id})
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        except Exception as e:
+            return web.json_response({'error': str(e)}, status=500)
+
 
     async def handle_get_subagent_model(self, request):
         """GET /api/subagents/default_model"""
@@ -2278,6 +2402,11 @@ function connectWS() {
     } else if (p.type === 'chat_from_extension') {
       const ext = p.data || {};
       if (ext.data) appendUserMsg('[Browser] ' + ext.data);
+    } else if (p.type === 'tool_output') {
+      // Live stdout/stderr from exec_shell / execute_python while they run
+      const t = p.data || {};
+      if (t.chunk) t.chunk.split('\n').filter(l => l.trim()).slice(-20).forEach(l => addLog(`[${t.tool}${t.stream === 'stderr' ? ' ERR' : ''}] ${l}`));
+      else if (t.done) addLog(`[${t.tool}] finished${t.exit_code !== null && t.exit_code !== undefined ? ' (exit ' + t.exit_code + ')' : ''}`);
     } else if (p.type === 'subagent_update') {
       updateSubagentUI(p.data);
     } else if (p.type === 'subagent_done') {
@@ -4749,19 +4878,68 @@ try {
             data = f.read()
         return web.Response(body=data, content_type=mime)
 
+    async def _stream_part_to_tempfile(self, part, max_bytes, chunk_size=256 * 1024):
+        """Write a multipart part to a temp file chunk by chunk; returns its path.
+
+        aiohttp BodyPartReader.read() often does NOT accept a size argument, so
+        read_chunk() is used and anything past max_bytes is discarded. Disk writes
+        happen in a worker thread so the event loop stays free for other requests.
+        """
+        import tempfile
+        fd, tmp_path = tempfile.mkstemp(prefix='upload_', suffix='.part')
+        written = 0
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = await part.read_chunk(size=chunk_size)
+                if not chunk:
+                    break
+                if written < max_bytes:
+                    chunk = chunk[:max_bytes - written]
+                    await asyncio.to_thread(f.write, chunk)
+                    written += len(chunk)
+        return tmp_path
+
     async def handle_chat(self, request):
         """POST /api/chat — send message to the AI and get response.
 
         Accepts:
           - JSON body: {message, images?: [{name, data, mime}]}
-          - multipart/form-data: message field + files parts (text) + optional images_json field
+          - multipart/form-data: message field + files parts (text or image/*) + optional images_json field
         Images are sent as base64 data URLs and forwarded to the LLM as vision content.
+        File parts are streamed to temp files; decoding and downscaling run in worker threads.
         """
-        import base64 as _b64, json as _json
+        def _parse_images_json(raw_json):
+            parsed = []
+            for img in _json.loads(raw_json):
+                data_url = img.get('data', '')
+                if ',' in data_url:
+                    parsed.append({
+                        'name': img.get('name', 'image'),
+                        'mime': img.get('mime', 'image/jpeg'),
+                        'b64': data_url.split(',', 1)[1],
+                    })
+            return parsed
+
+        def _read_text_upload(path):
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    text = f.read(100001)
+            except Exception:
+                return '[Binary file — could not decode]'
+            finally:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            if len(text) > 100000:
+                text = text[:100000] + '\n\n... [truncated — file exceeds 100K characters]'
+            return text
+
+        import json as _json
+        attached_images = []  # list of {name, mime, b64 | src_path} dicts
         try:
             user_msg = ''
             file_context = ''
-            attached_images = []  # list of {name, mime, b64} dicts
 
             content_type = request.content_type or ''
             if 'multipart/form-data' in content_type:
@@ -4773,41 +4951,23 @@ try {
                     if part.name == 'message':
                         user_msg = (await part.text()).strip()
                     elif part.name == 'images_json':
-                        # Pre-encoded images from the frontend
+                        # Pre-encoded images from the frontend — parse off the event loop
                         try:
-                            imgs = _json.loads(await part.text())
-                            for img in imgs:
-                                data_url = img.get('data', '')
-                                if ',' in data_url:
-                                    b64 = data_url.split(',', 1)[1]
-                                    attached_images.append({
-                                        'name': img.get('name', 'image'),
-                                        'mime': img.get('mime', 'image/jpeg'),
-                                        'b64': b64,
-                                    })
+                            raw_json = await part.text()
+                            attached_images.extend(await asyncio.to_thread(_parse_images_json, raw_json))
                         except Exception:
                             pass
                     elif part.name == 'files':
                         filename = part.filename or 'unnamed'
-                        # aiohttp BodyPartReader.read() often does NOT accept a size argument.
-                        # Read in chunks and enforce a max upload size (20MB) ourselves.
-                        max_bytes = 20 * 1024 * 1024
-                        buf = bytearray()
-                        while True:
-                            chunk = await part.read_chunk(size=256 * 1024)
-                            if not chunk:
-                                break
-                            buf.extend(chunk)
-                            if len(buf) > max_bytes:
-                                buf = buf[:max_bytes]
-                                break
-                        raw = bytes(buf)
-                        try:
-                            text = raw.decode('utf-8', errors='replace')
-                        except Exception:
-                            text = '[Binary file — could not decode]'
-                        if len(text) > 100000:
-                            text = text[:100000] + '\n\n... [truncated — file exceeds 100K characters]'
+                        part_type = part.headers.get('Content-Type', '')
+                        # Stream the part to a temp file in chunks instead of buffering it,
+                        # enforcing a max upload size (20MB) ourselves.
+                        tmp_path = await self._stream_part_to_tempfile(part, max_bytes=20 * 1024 * 1024)
+                        if part_type.startswith('image/'):
+                            # Decoded/downscaled later by the gateway in a worker thread
+                            attached_images.append({'name': filename, 'mime': part_type, 'src_path': tmp_path})
+                            continue
+                        text = await asyncio.to_thread(_read_text_upload, tmp_path)
                         file_context += f"\n\n[Attached file: {filename}]\n---\n{text}\n---\n"
             else:
                 data = await request.json()
@@ -4976,6 +5136,15 @@ try {
             return web.json_response(resp_data)
         except Exception as e:
             return web.json_response({'error': str(e)}, status=500)
+        finally:
+            # Streamed image parts the gateway never consumed (quick-reply path, /clear and
+            # other commands, speak() raising)
+            for img in attached_images:
+                if img.get('src_path'):
+                    try:
+                        os.remove(img['src_path'])
+                    except OSError:
+                        pass
 
     async def handle_cost_stats(self, request):
         """GET /api/cost-stats — cost dashboard data."""
@@ -5071,6 +5240,7 @@ try {
             'auto_fallback': mm.auto_fallback_enabled if mm else False,
             'smart_routing': models_cfg.get('smart_routing', False),
             'streaming': models_cfg.get('streaming', True),
+            'stream_stats': getattr(self.core.gateway, 'stream_stats', {}),
             'max_turns': models_cfg.get('max_turns', 50),
             'speak_timeout': models_cfg.get('speak_timeout', 600),
             'thinking_level': getattr(self.core.gateway, 'thinking_level', models_cfg.get('thinking_level', 'low')),
@@ -5107,14 +5277,23 @@ try {
             'gmail': {
                 'configured': bool(gmail_cfg.get('email')),
                 'email': gmail_cfg.get('email', '--') or '--',
+                'sync': self.core.gmail.get_sync_status() if hasattr(getattr(self.core, 'gmail', None), 'get_sync_status') else None,
             },
             'whatsapp': {
                 'configured': bool(wa_cfg.get('phone_number_id')),
+                'ingress': self.core.whatsapp.get_ingress_stats() if hasattr(getattr(self.core, 'whatsapp', None), 'get_ingress_stats') else None,
             },
 
             # Scheduler
             'scheduled_tasks': len(getattr(self.core, 'scheduler', None) and getattr(self.core.scheduler, 'tasks', []) or []),
             'scheduler_running': getattr(getattr(self.core, 'scheduler', None), 'running', False),
+            'scheduler_jobs': self.core.scheduler.get_status()['jobs'] if hasattr(getattr(self.core, 'scheduler', None), 'get_status') else [],
+            'workers': self.core.workers.get_status() if hasattr(self.core, 'workers') else None,
+            'warm_sessions': self.core.warm_sessions.get_status() if hasattr(self.core, 'warm_sessions') else None,
+            'telegram_outbox': self.core.telegram.outbox.get_stats() if hasattr(getattr(self.core, 'telegram', None), 'outbox') else None,
+            'model_catalog': self.core.model_manager.get_catalog_stats() if hasattr(getattr(self.core, 'model_manager', None), 'get_catalog_stats') else None,
+            'subsystems': self.core.subsystems.get_status() if hasattr(self.core, 'subsystems') else None,
+            'skill_loader': self.core.skill_loader.get_status() if getattr(self.core, 'skill_loader', None) else None,
 
             # Tool count
             'tool_count': len(self.core.gateway.tools) if hasattr(self.core, 'gateway') else 0,
@@ -5179,7 +5358,7 @@ try {
                 'name':         s_name,
                 'display_name': d_name,
                 'enabled':      getattr(p, 'enabled', True),
-                'class':        p.__class__.__name__,
+                'class':        getattr(p, 'class_name', None) or p.__class__.__name__,
                 'version':      getattr(p, 'version', '—'),
                 'author':       getattr(p, 'author', '—'),
                 'description':  getattr(p, 'description', p.__class__.__name__),
@@ -6036,6 +6215,9 @@ try {
                         pass
                     except Exception as e:
                         await self.core.log(f"[Chrome Bridge] Message error: {e}", priority=1)
+                elif msg.type == web.WSMsgType.BINARY and hasattr(bridge, 'handle_ws_binary'):
+                    # Screenshot bytes etc. — precede the JSON result that references them
+                    await bridge.handle_ws_binary(msg.data)
                 elif msg.type in (web.WSMsgType.ERROR, web.WSMsgType.CLOSE):
                     break
         except Exception as e:
@@ -6047,6 +6229,7 @@ try {
                 if not fut.done():
                     fut.set_exception(ConnectionError("Chrome extension disconnected"))
             bridge._pending.clear()
+            getattr(bridge, '_binary_parts', {}).clear()
             await self.core.log("[Chrome Bridge] Extension disconnected", priority=2)
         return ws
 
@@ -6180,29 +6363,16 @@ try {
                 await ws.close(code=4001)
                 return ws
 
-        web_deck = self
-        class WebAdapter:
-            def __init__(self, ws):
-                self.ws = ws
-            def write(self, data):
-                decoded = data.decode()
-                asyncio.create_task(self.ws.send_str(decoded))
-                try:
-                    msg = json.loads(decoded.strip())
-                    if msg.get('type') == 'agent_trace' and msg.get('data'):
-                        web_deck.trace_buffer.append(msg['data'])
-                        if len(web_deck.trace_buffer) > 500:
-                            web_deck.trace_buffer = web_deck.trace_buffer[-500:]
-                except Exception:
-                    pass
-            async def drain(self): pass
-
-        adapter = WebAdapter(ws)
+        adapter = WebSocketWriter(
+            ws,
+            max_queue=self.config.get('ws_max_queue', 500),
+            max_lag=self.config.get('ws_max_lag_seconds', 15.0),
+        )
         self.core.clients.append(adapter)
         
         # Start a periodic update task for this specific socket
         async def updater():
-            while not ws.closed:
+            while not adapter.closed:
                 try:
                     uptime = int(time.time() - self.core.start_time)
                     plugins_status = {
@@ -6220,14 +6390,14 @@ try {
                             "plugins": plugins_status
                         }
                     }
-                    await ws.send_str(json.dumps(telemetry))
+                    adapter.send_json(telemetry)
                     
                     # Update Aura Imprints
                     aura_data = {
                         "type": "aura_update",
                         "data": self.core.memory.index.get('memories', [])[-15:]
                     }
-                    await ws.send_str(json.dumps(aura_data))
+                    adapter.send_json(aura_data)
                     
                     await asyncio.sleep(2)
                 except: break
@@ -6284,7 +6454,13 @@ try {
                     break
         finally:
             update_task.cancel()
-            self.core.clients.remove(adapter)
+            adapter.close()
+            try:
+                self.core.clients.remove(adapter)
+            except ValueError:
+                pass  # Relay already dropped it
+            if adapter.drop_reason:
+                await self.core.log(f"Web stream client disconnected ({adapter.drop_reason})", priority=2)
             
         return ws
 
@@ -6346,7 +6522,7 @@ try {
 
     async def handle_traces(self, request):
         """GET /api/traces — return buffered agent trace entries for Thinking tab restore."""
-        return web.json_response({'traces': self.trace_buffer[-500:]})
+        return web.json_response({'traces': list(self.core.relay.trace_buffer)})
 
     async def handle_list_files(self, request):
         """List workspace files — auto-creates missing .md files with starter templates."""
@@ -6543,9 +6719,12 @@ try {
         """Send a JSON payload to all connected stream clients."""
         import json
         payload = (json.dumps(msg_dict) + "\n").encode('utf-8')
-        for adapter in self.core.clients:
+        for adapter in list(self.core.clients):
             try:
-                adapter.write(payload)
+                if hasattr(adapter, 'enqueue'):
+                    adapter.enqueue(msg_dict.get('type'), msg_dict, payload)
+                else:
+                    adapter.write(payload)
             except Exception:
                 pass
 
@@ -7,6 +7,37 @@ import json
 import os
 import tempfile
 import time
+from collections import OrderedDict, deque
+
+from chat_streaming import ProgressiveReply
+
+
+class _SeenIds:
+    """Time-bounded LRU of message ids already accepted (Meta redelivers)."""
+
+    def __init__(self, ttl_seconds=3600, max_size=5000):
+        self.ttl = ttl_seconds
+        self.max_size = max_size
+        self._ids = OrderedDict()  # id -> first-seen monotonic time, oldest first
+
+    def _expire(self, now):
+        while self._ids:
+            oldest, ts = next(iter(self._ids.items()))
+            if now - ts <= self.ttl and len(self._ids) <= self.max_size:
+                break
+            self._ids.popitem(last=False)
+
+    def __contains__(self, msg_id):
+        self._expire(time.monotonic())
+        return msg_id in self._ids
+
+    def add(self, msg_id):
+        self._ids[msg_id] = time.monotonic()
+        self._ids.move_to_end(msg_id)
+        self._expire(time.monotonic())
+
+    def __len__(self):
+        return len(self._ids)
 
 
 class WhatsAppBridge:
@@ -24,8 +55,22 @@ class WhatsAppBridge:
         self.client = httpx.AsyncClient(timeout=60.0)
         self.start_time = time.time()
         self._processing = set()  # (phone, text) pairs currently in-flight — prevents duplicate sends
-        self._seen_message_ids = set()  # WhatsApp message wamids already handled
-        self._seen_max = 5000  # Trim threshold for _seen_message_ids
+        self._seen_message_ids = _SeenIds(
+            ttl_seconds=int(self.config.get('dedup_ttl_seconds', 3600)),
+            max_size=int(self.config.get('dedup_max_ids', 5000)),
+        )
+        # Bounded ingress: webhook payloads -> per-sender FIFOs -> fixed worker pool
+        self._ingress_max = int(self.config.get('ingress_max', 200))
+        self._ingress_per_sender = int(self.config.get('ingress_per_sender', 20))
+        self._ingress_worker_count = int(self.config.get('ingress_workers', 4))
+        self._pending = {}        # sender -> deque of (msg, value)
+        self._pending_count = 0
+        self._ready = deque()     # senders with queued messages and no worker on them
+        self._busy = set()        # senders currently being handled
+        self._wakeup = asyncio.Event()
+        self._workers = []
+        self.ingress_stats = {'accepted': 0, 'duplicates': 0, 'rejected_full': 0,
+                              'rejected_sender_cap': 0, 'processed': 0, 'errors': 0}
         self._component = "WhatsApp"
         self._authorized_phone = str(self.config.get('admin_phone_number', '')).strip()
 
@@ -69,8 +114,12 @@ class WhatsAppBridge:
         except json.JSONDecodeError:
             return web.Response(status=200, text='OK')
 
-        # Process asynchronously — don't block the webhook response
-        asyncio.create_task(self._process_webhook_payload(payload))
+        # Queue for the worker pool — don't block the webhook response.
+        # When a message is refused (queue full, or its sender over the
+        # per-sender cap), 503 makes Meta redeliver later instead of us
+        # dropping messages on the floor.
+        if not self.ingest(payload):
+            return web.Response(status=503, text='Busy')
         return web.Response(status=200, text='OK')
 
     def _verify_signature(self, body: bytes, signature_header: str) -> bool:
@@ -102,39 +151,97 @@ class WhatsAppBridge:
     #  Webhook payload processing
     # ──────────────────────────────────────────────
 
-    async def _process_webhook_payload(self, payload):
-        """Parse the Cloud API webhook structure and route messages."""
-        try:
-            for entry in payload.get('entry', []):
-                for change in entry.get('changes', []):
-                    value = change.get('value', {})
+    def ingest(self, payload):
+        """Queue the messages in a Cloud API webhook payload.
 
-                    # Handle message status updates (delivered, read, etc.)
-                    if 'statuses' in value:
-                        continue  # Ignore status updates
+        Returns False if any message was refused, because the ingress queue is
+        full or its sender is over the per-sender cap (so one chatty number
+        cannot fill the queue). The caller should answer 503 so Meta redelivers.
+        Refused messages are not marked as seen, so the redelivery is accepted;
+        already seen message ids are skipped.
+        """
+        accepted = True
+        for entry in payload.get('entry', []):
+            for change in entry.get('changes', []):
+                value = change.get('value', {})
+
+                # Handle message status updates (delivered, read, etc.)
+                if 'statuses' in value:
+                    continue  # Ignore status updates
+
+                for msg in value.get('messages', []):
+                    msg_id = msg.get('id', '')
+                    if msg_id and msg_id in self._seen_message_ids:
+                        self.ingress_stats['duplicates'] += 1
+                        continue
+                    if self._pending_count >= self._ingress_max:
+                        self.ingress_stats['rejected_full'] += 1
+                        accepted = False
+                        continue
+                    sender = msg.get('from', '')
+                    queue = self._pending.setdefault(sender, deque())
+                    if len(queue) >= self._ingress_per_sender:
+                        self.ingress_stats['rejected_sender_cap'] += 1
+                        accepted = False
+                        continue
+                    if msg_id:
+                        self._seen_message_ids.add(msg_id)
+                    queue.append((msg, value))
+                    self._pending_count += 1
+                    self.ingress_stats['accepted'] += 1
+                    if sender not in self._busy and sender not in self._ready:
+                        self._ready.append(sender)
+        if self._pending_count:
+            self._ensure_ingress_workers()
+            self._wakeup.set()
+        return accepted
+
+    def _ensure_ingress_workers(self):
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self._ingress_worker_count:
+            self._workers.append(asyncio.create_task(self._ingress_worker()))
+
+    async def _ingress_worker(self):
+        """Take one message at a time, round-robin across senders, in order per sender."""
+        while True:
+            while not self._ready:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            sender = self._ready.popleft()
+            queue = self._pending.get(sender)
+            if not queue:
+                continue
+            msg, value = queue.popleft()
+            self._pending_count -= 1
+            self._busy.add(sender)
+            try:
+                await self._route_message(msg, value)
+                self.ingress_stats['processed'] += 1
+            except Exception as e:
+                self.ingress_stats['errors'] += 1
+                await self._log(f"[WhatsApp] Webhook processing error: {e}", priority=1)
+            finally:
+                self._busy.discard(sender)
+                if queue:
+                    self._ready.append(sender)  # back of the line
+                else:
+                    self._pending.pop(sender, None)
 
-                    messages = value.get('messages', [])
-                    for msg in messages:
-                        await self._route_message(msg, value)
-        except Exception as e:
-            await self._log(f"[WhatsApp] Webhook processing error: {e}", priority=1)
+    def get_ingress_stats(self):
+        return {
+            'queued': self._pending_count,
+            'senders_waiting': len(self._pending),
+            'in_progress': len(self._busy),
+            'workers': len([w for w in self._workers if not w.done()]),
+            'seen_ids': len(self._seen_message_ids),
+            **self.ingress_stats,
+        }
 
     async def _route_message(self, msg, value):
         """Route an individual incoming WhatsApp message by type."""
-        msg_id = msg.get('id', '')
         msg_type = msg.get('type', '')
         sender = msg.get('from', '')  # Phone number (e.g. '15551234567')
 
-        # Dedup by message ID (WhatsApp may redeliver)
-        if msg_id in self._seen_message_ids:
-            return
-        self._seen_message_ids.add(msg_id)
-        if len(self._seen_message_ids) > self._seen_max:
-            # Trim oldest half
-            trim = list(self._seen_message_ids)[:self._seen_max // 2]
-            for t in trim:
-                self._seen_message_ids.discard(t)
-
         # Extract sender name from contacts array if available
         contacts = value.get('contacts', [])
         sender_name = ''
@@ -208,7 +315,8 @@ class WhatsAppBridge:
             return  # Already in-flight
         self._processing.add(key)
         await self.send_typing(sender)
-        asyncio.create_task(self.process_and_respond(sender, text, sender_name=sender_name, _key=key))
+        # Awaited, not spawned: the ingress worker pool is what bounds concurrency
+        await self.process_and_respond(sender, text, sender_name=sender_name, _key=key)
 
     async def _handle_image(self, sender, msg, sender_name=''):
         """Download image from WhatsApp, analyze via vision, respond."""
@@ -444,12 +552,14 @@ class WhatsAppBridge:
         """Process a text message through the AI and send the response back via WhatsApp."""
         typing_task = None
         response = ""
+        reply = self._new_progressive_reply(sender)
         try:
             typing_task = asyncio.create_task(self.keep_typing(sender))
-            response = await asyncio.wait_for(
-                self.core.gateway.speak(text, chat_id=f"wa:{sender}"),
-                timeout=self._get_speak_timeout()
-            )
+            with self.core.gateway.stream_to(reply):
+                response = await asyncio.wait_for(
+                    self.core.gateway.speak(text, chat_id=f"wa:{sender}"),
+                    timeout=self._get_speak_timeout()
+                )
         except asyncio.TimeoutError:
             provider = getattr(self.core.gateway.llm, 'provider', 'unknown')
             model = getattr(self.core.gateway.llm, 'model', 'unknown')
@@ -506,10 +616,31 @@ class WhatsAppBridge:
             # Send text response
             if response:
                 try:
-                    await self.send_message(sender, response)
+                    if reply is not None and reply.started:
+                        # Paragraphs already went out while streaming; send the rest
+                        await reply.finish(response)
+                    else:
+                        await self.send_message(sender, response)
                 except Exception as e:
                     await self._log(f"[WhatsApp] Send error: {e}", priority=1)
 
+    def _new_progressive_reply(self, sender):
+        """Append-only ProgressiveReply (the Cloud API cannot edit messages), or None when off."""
+        if not self.config.get('stream_replies', True):
+            return None
+
+        async def _on_error(e):
+            await self._log(f"[WhatsApp] Streamed reply error: {e}", priority=2)
+
+        return ProgressiveReply(
+            send=lambda text, final: self.send_message(sender, text),
+            edit=None,
+            max_len=4096,
+            edit_interval=float(self.config.get('stream_edit_interval', 2.0)),
+            append_min_chars=int(self.config.get('stream_min_chars', 600)),
+            on_error=_on_error,
+        )
+
     # ──────────────────────────────────────────────
     #  Outbound API — send_message, send_image, send_audio, send_typing
     # ──────────────────────────────────────────────
@@ -0,0 +1,279 @@
+"""
+Galactic AI — optional process pool for CPU-bound tool work.
+
+The event loop and every thread executor share one GIL, so a large PDF,
+spreadsheet or HTML page being parsed stalls every other user. When
+`workers.enabled` is set, the named tasks in CPU_TASKS run in separate
+processes instead, spreading the work across all cores. With the pool
+disabled (the default) the same functions run via asyncio.to_thread, so
+callers never need to care which path was taken.
+
+Each worker process gets an address-space ceiling (`workers.max_memory_mb`)
+and is recycled after `workers.max_tasks_per_child` tasks (on Python 3.10,
+which lacks that executor option, the whole pool is replaced after that many
+tasks per worker). Workers report
+progress through emit(), which is forwarded to the relay as ordinary
+messages.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Set in each worker by _worker_init; None in the main process.
+_events = None
+
+
+def emit(msg_type, data):
+    """Send a relay message from inside a worker (no-op in-process)."""
+    if _events is not None:
+        try:
+            _events.put_nowait((msg_type, data))
+        except Exception:
+            pass
+
+
+def _worker_init(max_memory_mb, events):
+    global _events
+    _events = events
+    if max_memory_mb:
+        try:
+            import resource
+            limit = int(max_memory_mb) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass  # Windows / restricted hosts: rely on task recycling only
+
+
+# ── CPU-bound tasks (module level so they pickle) ────────────────────────────
+
+def html_to_text(html, mode='markdown', max_chars=8000):
+    """Reduce an HTML document to text or basic markdown."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Remove script and style elements
+    for script in soup(["script", "style", "nav", "footer", "header"]):
+        script.decompose()
+
+    if mode == 'text':
+        text = soup.get_text(separator='\n', strip=True)
+    else:  # markdown mode
+        title = soup.find('title')
+        title_text = f"# {title.string}\n\n" if title else ""
+
+        body = soup.find('body') or soup
+        paragraphs = body.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'li'])
+
+        text_parts = [title_text]
+        for p in paragraphs:
+            tag_name = p.name
+            text_content = p.get_text(strip=True)
+
+            if tag_name == 'h1':
+                text_parts.append(f"\n# {text_content}\n")
+            elif tag_name == 'h2':
+                text_parts.append(f"\n## {text_content}\n")
+            elif tag_name == 'h3':
+                text_parts.append(f"\n### {text_content}\n")
+            elif tag_name == 'li':
+                text_parts.append(f"- {text_content}")
+            else:
+                text_parts.append(text_content)
+
+        text = '\n'.join(text_parts)
+
+    if len(text) > max_chars:
+        text = text[:max_chars] + "\n\n[... content truncated]"
+    return text
+
+
+def parse_page_range(spec, total):
+    """Parse page range like '1-5', '3', 'all'."""
+    if not spec or spec.lower() == 'all':
+        return range(total)
+    if '-' in spec:
+        parts = spec.split('-')
+        start = max(0, int(parts[0]) - 1)
+        end = min(total, int(parts[1]))
+        return range(start, end)
+    return [int(spec) - 1]
+
+
+def read_pdf_text(path, pages_arg='all'):
+    """Extract text from a PDF with pdfplumber, falling back to PyPDF2."""
+    try:
+        import pdfplumber
+        with pdfplumber.open(path) as pdf:
+            total = len(pdf.pages)
+            texts = []
+            for i in parse_page_range(pages_arg, total):
+                text = pdf.pages[i].extract_text()
+                if text:
+                    texts.append(f"--- Page {i+1} ---\n{text}")
+                emit('worker_progress', {'task': 'read_pdf', 'page': i + 1, 'total': total})
+            return "\n\n".join(texts) if texts else "[INFO] No text content found in PDF."
+    except ImportError:
+        pass
+    try:
+        import PyPDF2
+        reader = PyPDF2.PdfReader(path)
+        total = len(reader.pages)
+        texts = []
+        for i in parse_page_range(pages_arg, total):
+            text = reader.pages[i].extract_text()
+            if text:
+                texts.append(f"--- Page {i+1} ---\n{text}")
+        return "\n\n".join(texts) if texts else "[INFO] No text content found in PDF."
+    except ImportError:
+        return "[ERROR] Install pdfplumber or PyPDF2: pip install pdfplumber"
+
+
+def read_excel_rows(path, sheet=None, limit=100):
+    """Read an .xlsx sheet into the JSON shape returned by the read_excel tool."""
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    ws = wb[sheet] if sheet and sheet in wb.sheetnames else wb.active
+    rows = list(ws.iter_rows(values_only=True))
+    if not rows:
+        wb.close()
+        return "[INFO] Empty spreadsheet."
+    headers = [str(h) if h else f"col_{i}" for i, h in enumerate(rows[0])]
+    data = []
+    for row in rows[1:limit+1]:
+        data.append({headers[i]: (str(v) if v is not None else '') for i, v in enumerate(row)})
+    snames = wb.sheetnames
+    wb.close()
+    return json.dumps({"sheets": snames, "columns": headers, "rows": data, "total_rows": len(data)}, indent=2)
+
+
+CPU_TASKS = {
+    'html_to_text':    html_to_text,
+    'read_pdf_text':   read_pdf_text,
+    'read_excel_rows': read_excel_rows,
+}
+
+
+def _run_named(name, args, kwargs):
+    return CPU_TASKS[name](*args, **kwargs)
+
+
+class WorkerPool:
+    """Dispatches CPU_TASKS to worker processes (or threads when disabled)."""
+
+    def __init__(self, core):
+        self.core = core
+        cfg = core.config.get('workers', {})
+        self.enabled = bool(cfg.get('enabled', False))
+        self.processes = int(cfg.get('processes', 0) or os.cpu_count() or 2)
+        self.max_memory_mb = int(cfg.get('max_memory_mb', 1024))
+        self.max_tasks_per_child = int(cfg.get('max_tasks_per_child', 200))
+        self._ctx = multiprocessing.get_context('spawn')
+        self._events = None
+        self._executor = None
+        self._pump = None
+        self._pool_tasks = 0    # tasks sent to the current executor (manual recycling, Python < 3.11)
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'recycled_pools': 0,
+                      'in_process': 0, 'busy_s': 0.0}
+
+    def _start(self):
+        self._events = self._events or self._ctx.Queue()
+        kwargs = dict(max_workers=self.processes, mp_context=self._ctx,
+                      initializer=_worker_init, initargs=(self.max_memory_mb, self._events))
+        if self.max_tasks_per_child and sys.version_info >= (3, 11):
+            kwargs['max_tasks_per_child'] = self.max_tasks_per_child
+        self._executor = ProcessPoolExecutor(**kwargs)
+        self._pool_tasks = 0
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._pump_events())
+
+    def _restart(self, broken):
+        """Replace a broken pool (a worker died, e.g. hit its memory ceiling). Every task on
+        the broken pool fails at once; only the first handler replaces it, the rest retry on
+        the pool that handler started."""
+        if self._executor is not broken:
+            return
+        self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.stats['recycled_pools'] += 1
+        self._start()
+
+    def _recycle_if_due(self):
+        """Python < 3.11 has no max_tasks_per_child: replace the whole pool once it has run
+        that many tasks per worker. In-flight tasks finish on the old pool."""
+        if not self.max_tasks_per_child or sys.version_info >= (3, 11):
+            return
+        if self._pool_tasks >= self.max_tasks_per_child * self.processes:
+            old, self._executor = self._executor, None
+            old.shutdown(wait=False)
+            self.stats['recycled_pools'] += 1
+            self._start()
+        self._pool_tasks += 1
+
+    async def _pump_events(self):
+        """Forward worker emit() messages to the relay."""
+        while True:
+            try:
+                msg_type, data = await asyncio.to_thread(self._events.get, True, 1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            try:
+                await self.core.relay.emit(3, msg_type, data)
+            except Exception:
+                pass
+
+    async def run(self, name, *args, **kwargs):
+        """Run CPU_TASKS[name] off the event loop and return its result."""
+        if name not in CPU_TASKS:
+            raise KeyError(f"Unknown worker task: {name}")
+        self.stats['submitted'] += 1
+        started = time.monotonic()
+        try:
+            if not self.enabled:
+                self.stats['in_process'] += 1
+                result = await asyncio.to_thread(CPU_TASKS[name], *args, **kwargs)
+            else:
+                if self._executor is None:
+                    self._start()
+                self._recycle_if_due()
+                loop = asyncio.get_running_loop()
+                executor = self._executor
+                try:
+                    result = await loop.run_in_executor(executor, _run_named, name, args, kwargs)
+                except BrokenProcessPool:
+                    if self._executor is executor:
+                        await self.core.log(f"Worker pool broke during '{name}' — recycling and retrying once", priority=1)
+                    self._restart(executor)
+                    if self._executor is None:
+                        self._start()
+                    result = await loop.run_in_executor(self._executor, _run_named, name, args, kwargs)
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        finally:
+            self.stats['busy_s'] += time.monotonic() - started
+        self.stats['completed'] += 1
+        return result
+
+    def get_status(self):
+        return {
+            'enabled': self.enabled,
+            'processes': self.processes if self.enabled else 0,
+            'max_memory_mb': self.max_memory_mb,
+            'max_tasks_per_child': self.max_tasks_per_child,
+            'stats': {k: round(v, 2) if isinstance(v, float) else v for k, v in self.stats.items()},
+        }
+
+    def shutdown(self):
+        if self._pump is not None:
+            self._pump.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None